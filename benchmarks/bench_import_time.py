@@ -0,0 +1,72 @@
+"""
+Startup time of `import phub`, `import phub.phub` (what the `phub` CLI loads) and the first soup.
+
+    python benchmarks/bench_import_time.py [--runs 5] [--top 15] [--check]
+
+Every run is a fresh interpreter with `-X importtime`, the times are the cumulative ones of the import.
+--check fails if the best run is over the budget (BUDGETS). They are generous, but still depend on the
+machine (and on whether bytecode is cached), that's why they aren't part of the tests.
+"""
+import os
+import re
+import sys
+import argparse
+import subprocess
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+STATEMENTS = {
+    "import phub": "import phub",
+    "import phub.phub": "import phub.phub",
+    "first soup": "import phub.phub; from phub.modules.backends import html_parser; "
+                  "from bs4 import BeautifulSoup; BeautifulSoup('<p></p>', html_parser())",
+}
+LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|\s*(\S+)")
+
+# Statement, module whose cumulative time is checked, budget in µs. base_api and curl_cffi take most of the time of
+# `import phub.phub` and are out of our hands, so they are imported first and only what phub.phub adds is measured.
+BUDGETS = [
+    ("import phub", "phub", 100_000),
+    ("import asyncio, logging, curl_cffi, base_api.base; import phub.phub", "phub.phub", 60_000), # About 20 ms today
+]
+
+
+def import_times(statement: str) -> list[tuple[int, int, str]]:
+    """(self µs, cumulative µs, module) of every module the statement imported"""
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", statement], cwd=ROOT, env=env,
+                            capture_output=True, text=True, check=True)
+    return [(int(own), int(cumulative), module) for own, cumulative, module in LINE.findall(result.stderr)]
+
+
+def main():
+    arguments = argparse.ArgumentParser()
+    arguments.add_argument("--runs", type=int, default=5)
+    arguments.add_argument("--top", type=int, default=15)
+    arguments.add_argument("--check", action="store_true", help="Exit with an error if an import is over its budget")
+    args = arguments.parse_args()
+
+    for name, statement in STATEMENTS.items():
+        runs = [import_times(statement) for _ in range(args.runs)]
+        totals = sorted(sum(own for own, _, _ in times) for times in runs)
+        print(f"{name}: median {totals[len(totals) // 2] / 1000:.1f} ms, best {totals[0] / 1000:.1f} ms, "
+              f"{len(runs[0])} modules")
+
+    print("\nSlowest modules of `import phub.phub` (self time):")
+    for own, cumulative, module in sorted(import_times("import phub.phub"), reverse=True)[:args.top]:
+        print(f"  {own / 1000:8.1f} ms  (cumulative {cumulative / 1000:8.1f} ms)  {module}")
+
+    if args.check:
+        over = False
+        print()
+        for statement, module, budget in BUDGETS:
+            best = min(next(cumulative for _, cumulative, name in import_times(statement) if name == module)
+                       for _ in range(args.runs))
+            over = over or best >= budget
+            print(f"{module}: {best / 1000:.1f} ms (budget {budget / 1000:.0f} ms){'  OVER BUDGET' if best >= budget else ''}")
+
+        if over:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
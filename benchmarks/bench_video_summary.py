@@ -0,0 +1,69 @@
+"""
+Memory and construction time of listing results: Video objects vs. VideoSummary records.
+
+    python benchmarks/bench_video_summary.py [--count 100000]
+
+Both are built from the same extractor_videos-like dicts, the way the listing iterators do it.
+"""
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from base_api.base import BaseCore
+from phub.phub import Video, VideoSummary
+
+
+def items(count: int) -> list[dict]:
+    return [{
+        "url": f"https://www.pornhub.com/view_video.php?viewkey=64f0c0d0e{i:06x}",
+        "title": f"Some video title number {i}",
+        "duration": f"{i % 60}:{i % 60:02d}",
+        "thumb": f"https://ei.phncdn.com/videos/202309/26/{i}/original/(m=eaAaGwObaaaa)1.jpg",
+        "from_search": True,
+    } for i in range(count)]
+
+
+def build_videos(data: list[dict], core: BaseCore) -> list:
+    videos = []
+    for item in data:
+        item = dict(item)
+        videos.append(Video(item.pop("url"), core=core, api_data=item))
+
+    return videos
+
+
+def build_summaries(data: list[dict], core: BaseCore) -> list:
+    return [VideoSummary.from_item(item) for item in data]
+
+
+def measure(build, data: list[dict], core: BaseCore) -> tuple[float, int]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build(data, core)
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return elapsed, size
+
+
+def main():
+    args = argparse.ArgumentParser(description="Video vs. VideoSummary benchmark")
+    args.add_argument("--count", type=int, default=100_000)
+    args = args.parse_args()
+
+    core = BaseCore()
+    data = items(args.count)
+    results = {name: measure(build, data, core) for name, build in [("Video", build_videos), ("VideoSummary", build_summaries)]}
+
+    print(f"{args.count} listing results")
+    for name, (elapsed, size) in results.items():
+        print(f"{name:>12}: {elapsed * 1000:9.1f} ms, {size / 1024 / 1024:8.1f} MB, {size / args.count:7.0f} bytes / item")
+
+
+if __name__ == "__main__":
+    main()
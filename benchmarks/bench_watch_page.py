@@ -0,0 +1,96 @@
+"""
+Micro-benchmark of the watch page fast path against the old full-page path.
+
+    python benchmarks/bench_watch_page.py [--rounds 20] [--size 1000000]
+
+The watch page fixture is padded with unrelated markup (like the real page, which is ~1 MB) and both paths
+extract the flashvars and all the fields used by the Video object.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from bs4 import BeautifulSoup
+from phub.modules.backends import parser
+from phub.modules.consts import REGEX_VIDEO_FLASHVARS
+from phub.modules.watch_page import WatchPage, parse_flashvars, fast_loads
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "..", "phub", "tests", "fixtures", "watch_page.html")
+FILLER = '<li class="pcVideoListItem"><a href="/view_video.php?viewkey={0}" title="Filler {0}"><img src="x.jpg"></a></li>\n'
+
+
+def load_page(size: int) -> str:
+    with open(FIXTURE, "r", encoding="utf-8") as file:
+        html_content = file.read()
+
+    filler, i = [], 0
+    while sum(map(len, filler)) < size - len(html_content):
+        filler.append(FILLER.format(i))
+        i += 1
+
+    # Related videos and such follow the player, so the padding goes in front of the closing body tag
+    return html_content.replace("</body>", f"<ul>{''.join(filler)}</ul></body>")
+
+
+def old_path(html_content: str) -> tuple:
+    flashvars = json.loads(REGEX_VIDEO_FLASHVARS.search(html_content).group(1))
+    soup = BeautifulSoup(html_content, parser)
+    menu = soup.find("div", class_="video-actions-menu ctasActionMenu")
+    avatar = soup.find("div", class_="userAvatar")
+    return (
+        flashvars,
+        menu.find("div", class_="views").find("span").text,
+        menu.find("div", class_="videoInfo").text,
+        soup.find("span", class_="votesUp").text,
+        {a.text: a.get("href") for a in soup.find("div", class_="categoriesWrapper").find_all("a", class_="gtm-event-video-underplayer item")},
+        {a.text: a.get("href") for a in soup.find("div", class_="tagsWrapper").find_all("a", class_="video_underplayer")},
+        f"https://www.pornhub.com{avatar.find('a').get('href')}",
+        avatar.find("img").get("src"),
+    )
+
+
+def new_path(html_content: str) -> tuple:
+    page = WatchPage(html_content)
+    return (
+        parse_flashvars(html_content),
+        page.views,
+        page.publish_date,
+        page.likes,
+        page.categories,
+        page.tags,
+        page.author_url,
+        page.author_thumbnail,
+    )
+
+
+def timed(func, html_content: str, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func(html_content)
+
+    return (time.perf_counter() - start) / rounds
+
+
+def main():
+    args = argparse.ArgumentParser(description="Watch page micro-benchmark")
+    args.add_argument("--rounds", type=int, default=20)
+    args.add_argument("--size", type=int, default=1_000_000, help="Size of the padded page in bytes")
+    args = args.parse_args()
+
+    html_content = load_page(args.size)
+    assert old_path(html_content) == new_path(html_content), "Both paths must return the same results"
+
+    old = timed(old_path, html_content, args.rounds)
+    new = timed(new_path, html_content, args.rounds)
+    print(f"Page size: {len(html_content) / 1e6:.2f} MB, parser: {parser}, "
+          f"JSON: {getattr(fast_loads, '__module__', None) or 'json'}")
+    print(f"regex + json + full soup: {old * 1000:8.2f} ms")
+    print(f"watch page fast path:     {new * 1000:8.2f} ms ({old / new:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,22 @@
+from typing import TYPE_CHECKING
+
 __all__ = ["Client", "Video", "User", "Pornstar", "Model", "Channel", "Account", "Album",
-           "Playlist", "GIF", "Short", "BaseCore"]
+           "Playlist", "GIF", "Short", "BaseCore", "ParseExecutor", "HTTPCache", "IdentityMap", "VideoSummary", "TrimPolicy", "RateLimiter", "HostLimit", "CrawlRunner", "crawl", "WorkQueue", "crawl_queue", "SessionPool", "SessionStore", "RetryPolicy", "CircuitBreaker", "export", "open_sink", "Catalog"]
+
+if TYPE_CHECKING:
+    from phub.phub import Client, Video, User, Pornstar, Model, Channel, Account, Album, Playlist, GIF, Short, BaseCore, ParseExecutor, HTTPCache, IdentityMap, VideoSummary, TrimPolicy, RateLimiter, HostLimit, CrawlRunner, crawl, WorkQueue, crawl_queue, SessionPool, SessionStore, RetryPolicy, CircuitBreaker, export, open_sink, Catalog
+
+
+def __getattr__(name: str):
+    # phub.phub (curl_cffi, base_api, ...) is only imported on first use, so `import phub` stays cheap (PEP 562)
+    if name not in __all__:
+        raise AttributeError(f"module 'phub' has no attribute {name!r}")
+
+    import importlib
+    value = getattr(importlib.import_module("phub.phub"), name)
+    globals()[name] = value
+    return value
 
 
-from phub.phub import Client, Video, User, Pornstar, Model, Channel, Account, Album, Playlist, GIF, Short, BaseCore
\ No newline at end of file
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
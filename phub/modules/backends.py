@@ -0,0 +1,378 @@
+"""
+HTML backends used by the listing extractors in consts.py
+
+All backends return exactly the same results (in page order, without duplicates), they only differ in how much
+of the page they parse:
+
+- bs4:        Builds the full BeautifulSoup tree (the original implementation, always available)
+- strainer:   BeautifulSoup restricted with a SoupStrainer, so only the interesting tags get built
+- selectolax: Uses the lexbor engine of selectolax (only if selectolax is installed)
+
+"auto" (or None) picks selectolax if it is installed and falls back to strainer otherwise.
+"""
+from __future__ import annotations
+
+import re
+import functools
+from typing import TYPE_CHECKING
+from .listing import listing_key
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup, SoupStrainer
+
+# The parsers are only imported when the first page gets parsed, so "import phub" stays cheap
+
+
+@functools.cache
+def html_parser() -> str:
+    """The parser BeautifulSoup uses"""
+    try:
+        import lxml
+        return "lxml" # Faster speeds, but more dependencies
+
+    except (ModuleNotFoundError, ImportError):
+        return "html.parser" # Fallback to classic HTML parser (will work fine)
+
+
+@functools.cache
+def selectolax_parser() -> type | None:
+    """The selectolax parser class, None if selectolax isn't installed"""
+    try:
+        from selectolax.lexbor import LexborHTMLParser
+        return LexborHTMLParser
+
+    except (ModuleNotFoundError, ImportError):
+        try:
+            from selectolax.parser import HTMLParser # Older selectolax versions (modest engine)
+            return HTMLParser
+
+        except (ModuleNotFoundError, ImportError):
+            return None
+
+
+def __getattr__(name: str):
+    # Module level `parser` used to be a constant, it's still there for code that imports it (PEP 562)
+    if name == "parser":
+        return html_parser()
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _strainer(*args, **kwargs) -> SoupStrainer:
+    from bs4 import SoupStrainer
+    return SoupStrainer(*args, **kwargs)
+
+PORNHUB_URL = "https://www.pornhub.com"
+REGEX_VIDEO_BLOCK = re.compile(r"pcVideoListItem|videoBox")
+REGEX_VIEW_VIDEO = re.compile(r"/view_video")
+REGEX_VIEW_VIDEO_LINK = re.compile(r"/view_video\.php\?viewkey=")
+# While straining, bs4 sees the raw class attribute ("userLink clearfix"), so a plain string would not match
+REGEX_USER_LINK = re.compile(r"(^|\s)userLink(\s|$)")
+
+
+def _is_gif_link(href: str) -> bool:
+    # Ensure it's a GIF link (usually /gif/ followed by digits)
+    return href.startswith("/gif/") and any(char.isdigit() for char in href)
+
+
+def _absolute(href: str) -> str:
+    if not href.startswith(PORNHUB_URL):
+        return f"{PORNHUB_URL}{href}"
+
+    return href
+
+
+class Bs4Backend:
+    """The original extractors, building the full BeautifulSoup tree for every page"""
+    name = "bs4"
+
+    def _soup(self, html_content: str, only: SoupStrainer | None = None) -> BeautifulSoup:
+        from bs4 import BeautifulSoup
+        return BeautifulSoup(html_content, html_parser())
+
+    def _resoup(self, soup: BeautifulSoup, html_content: str, only: SoupStrainer) -> BeautifulSoup:
+        # The full tree already contains everything, a restricted tree needs to be parsed again
+        return soup
+
+    def gifs(self, html_content: str) -> list:
+        soup = self._soup(html_content)
+
+        # Try multiple possible containers for GIFs
+        containers = [
+            soup.find("div", class_="gifsWrapperProfile"),
+            soup.find("div", class_="gifsWrapper hideLastItemLarge"),
+            soup.find("div", class_="gifsWrapper"),
+            soup.find("ul", class_="gifs"),
+            soup.find("div", id="gifSearchListing"),
+        ]
+
+        # Find the first non-None container
+        main_div = next((c for c in containers if c is not None), soup)
+        return self._gif_links(main_div)
+
+    @staticmethod
+    def _gif_links(main_div) -> list:
+        links = {}
+        for a_tag in main_div.find_all("a", href=True):
+            href = a_tag.get("href")
+            if _is_gif_link(href):
+                full_url = f"{PORNHUB_URL}{href}"
+                links.setdefault(listing_key(full_url), full_url)
+
+        return list(links.values())
+
+    def videos(self, html_content: str) -> list:
+        soup = self._soup(html_content, _strainer(["li", "div"], class_=REGEX_VIDEO_BLOCK))
+
+        # Try different sections
+        video_blocks = soup.find_all(["li", "div"], class_=REGEX_VIDEO_BLOCK)
+
+        if not video_blocks:
+            # Fallback to finding all link tags if blocks aren't found
+            soup = self._resoup(soup, html_content, _strainer("a", href=REGEX_VIEW_VIDEO_LINK))
+            results = {}
+            for a_tag in soup.find_all("a", href=REGEX_VIEW_VIDEO_LINK):
+                url = f"{PORNHUB_URL}{a_tag.get('href')}"
+                results.setdefault(listing_key(url), {"url": url, "from_search": True})
+            return list(results.values())
+
+        results = []
+        seen = set()
+        for block in video_blocks:
+            try:
+                # Find the link tag which contains the URL and title
+                a_tag = block.find("a", href=REGEX_VIEW_VIDEO)
+                if not a_tag:
+                    continue
+
+                href = a_tag.get("href")
+                if not href:
+                    continue
+
+                url = f"{PORNHUB_URL}{href}"
+                key = listing_key(url)
+                if key in seen:
+                    continue
+                seen.add(key)
+
+                title = a_tag.get("title") or (a_tag.find("img").get("alt") if a_tag.find("img") else "")
+                if not title:
+                    # Try finding title in a separate link or span
+                    title_link = block.find("a", class_="title") or block.find("span", class_="title")
+                    title = title_link.text.strip() if title_link else ""
+
+                # Extract duration if available
+                duration_var = block.find("var", class_="duration")
+                duration = duration_var.text.strip() if duration_var else None
+
+                # Extract thumbnail
+                img_tag = block.find("img")
+                thumb = (img_tag.get("data-src") or img_tag.get("src")) if img_tag else None
+
+                results.append({
+                    "url": url,
+                    "title": title,
+                    "duration": duration,
+                    "thumb": thumb,
+                    "from_search": True
+                })
+            except Exception:
+                continue
+
+        return results
+
+    def video_links(self, html_content: str) -> list:
+        links = {}
+        soup = self._soup(html_content, _strainer("a", href=REGEX_VIEW_VIDEO_LINK))
+
+        # Search for all 'a' tags with an href containing "/view_video.php?viewkey="
+        for a_tag in soup.find_all("a", href=REGEX_VIEW_VIDEO_LINK):
+            href = a_tag.get("href")
+            if href:
+                url = _absolute(href)
+                links.setdefault(listing_key(url), url)
+
+        return list(links.values())
+
+    def users(self, html_content: str) -> list:
+        soup = self._soup(html_content, _strainer("a", class_=REGEX_USER_LINK, href=True))
+        users = {}
+        # Matches the user links in the subscriptions/followers pages
+        for a_tag in soup.find_all("a", class_="userLink", href=True):
+            href = a_tag.get("href")
+            if href.startswith("/"):
+                url = f"{PORNHUB_URL}{href}"
+                users.setdefault(listing_key(url), url)
+
+        return list(users.values())
+
+
+class StrainerBackend(Bs4Backend):
+    """Same as the bs4 backend, but only the tags matching a SoupStrainer are turned into a tree"""
+    name = "strainer"
+
+    def _soup(self, html_content: str, only: SoupStrainer | None = None) -> BeautifulSoup:
+        from bs4 import BeautifulSoup
+        return BeautifulSoup(html_content, html_parser(), parse_only=only)
+
+    def _resoup(self, soup: BeautifulSoup, html_content: str, only: SoupStrainer) -> BeautifulSoup:
+        return self._soup(html_content, only)
+
+    def gifs(self, html_content: str) -> list:
+        # The containers are looked up in the same order as the bs4 backend. The first pass only builds
+        # elements that could be one of the class based containers, the rarer cases need another pass.
+        soup = self._soup(html_content, _strainer(["div", "ul"], class_=re.compile(r"gifs")))
+        main_div = (
+            soup.find("div", class_="gifsWrapperProfile")
+            or soup.find("div", class_="gifsWrapper hideLastItemLarge")
+            or soup.find("div", class_="gifsWrapper")
+            or soup.find("ul", class_="gifs")
+        )
+
+        if main_div is None:
+            main_div = self._soup(html_content, _strainer("div", id="gifSearchListing")).find("div", id="gifSearchListing")
+
+        if main_div is None:
+            main_div = self._soup(html_content, _strainer("a", href=True))
+
+        return self._gif_links(main_div)
+
+
+class SelectolaxBackend:
+    """Uses selectolax (lexbor) and CSS selectors instead of BeautifulSoup"""
+    name = "selectolax"
+
+    def __init__(self):
+        if selectolax_parser() is None:
+            raise ImportError("The selectolax backend needs selectolax: pip install selectolax")
+
+    @staticmethod
+    def _attr(node, name: str) -> str | None:
+        # selectolax returns None for attributes without a value, BeautifulSoup returns an empty string
+        attributes = node.attributes
+        if name not in attributes:
+            return None
+
+        return attributes[name] or ""
+
+    def gifs(self, html_content: str) -> list:
+        tree = selectolax_parser()(html_content)
+        main_div = tree.css_first("div.gifsWrapperProfile")
+
+        if main_div is None:
+            main_div = next((node for node in tree.css("div.gifsWrapper")
+                             if " ".join((self._attr(node, "class") or "").split()) == "gifsWrapper hideLastItemLarge"), None)
+
+        if main_div is None:
+            main_div = (tree.css_first("div.gifsWrapper") or tree.css_first("ul.gifs")
+                        or tree.css_first('div[id="gifSearchListing"]') or tree.root)
+
+        links = {}
+        for a_tag in main_div.css("a[href]"):
+            href = self._attr(a_tag, "href")
+            if _is_gif_link(href):
+                full_url = f"{PORNHUB_URL}{href}"
+                links.setdefault(listing_key(full_url), full_url)
+
+        return list(links.values())
+
+    def videos(self, html_content: str) -> list:
+        tree = selectolax_parser()(html_content)
+        video_blocks = tree.css('li[class*="pcVideoListItem"], li[class*="videoBox"], '
+                                'div[class*="pcVideoListItem"], div[class*="videoBox"]')
+
+        if not video_blocks:
+            results = {}
+            for a_tag in tree.css('a[href*="/view_video.php?viewkey="]'):
+                url = f"{PORNHUB_URL}{self._attr(a_tag, 'href')}"
+                results.setdefault(listing_key(url), {"url": url, "from_search": True})
+            return list(results.values())
+
+        results = []
+        seen = set()
+        for block in video_blocks:
+            a_tag = block.css_first('a[href*="/view_video"]')
+            if a_tag is None:
+                continue
+
+            href = self._attr(a_tag, "href")
+            if not href:
+                continue
+
+            url = f"{PORNHUB_URL}{href}"
+            key = listing_key(url)
+            if key in seen:
+                continue
+            seen.add(key)
+
+            a_img = a_tag.css_first("img")
+            title = self._attr(a_tag, "title") or (self._attr(a_img, "alt") if a_img is not None else "")
+            if not title:
+                title_link = block.css_first("a.title") or block.css_first("span.title")
+                title = title_link.text().strip() if title_link is not None else ""
+
+            duration_var = block.css_first("var.duration")
+            duration = duration_var.text().strip() if duration_var is not None else None
+
+            img_tag = block.css_first("img")
+            thumb = (self._attr(img_tag, "data-src") or self._attr(img_tag, "src")) if img_tag is not None else None
+
+            results.append({
+                "url": url,
+                "title": title,
+                "duration": duration,
+                "thumb": thumb,
+                "from_search": True
+            })
+
+        return results
+
+    def video_links(self, html_content: str) -> list:
+        links = {}
+        for a_tag in selectolax_parser()(html_content).css('a[href*="/view_video.php?viewkey="]'):
+            href = self._attr(a_tag, "href")
+            if href:
+                url = _absolute(href)
+                links.setdefault(listing_key(url), url)
+
+        return list(links.values())
+
+    def users(self, html_content: str) -> list:
+        users = {}
+        for a_tag in selectolax_parser()(html_content).css("a.userLink[href]"):
+            href = self._attr(a_tag, "href")
+            if href.startswith("/"):
+                url = f"{PORNHUB_URL}{href}"
+                users.setdefault(listing_key(url), url)
+
+        return list(users.values())
+
+
+BACKENDS = {
+    "bs4": Bs4Backend,
+    "strainer": StrainerBackend,
+    "selectolax": SelectolaxBackend,
+}
+_instances = {}
+
+
+def available_backends() -> list[str]:
+    """Names of all backends that can be used with the installed packages"""
+    return [name for name in BACKENDS if name != "selectolax" or selectolax_parser() is not None]
+
+
+def get_backend(name: str | None = None) -> Bs4Backend | SelectolaxBackend:
+    """
+    :param name: bs4, strainer, selectolax or auto / None (selectolax if installed, otherwise strainer)
+    :return: The (shared) backend instance
+    """
+    if name is None or name == "auto":
+        name = "selectolax" if selectolax_parser() is not None else "strainer"
+
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown extractor backend: {name}, use one of: {', '.join(BACKENDS)} or auto")
+
+    if name not in _instances:
+        _instances[name] = BACKENDS[name]()
+
+    return _instances[name]
@@ -0,0 +1,405 @@
+"""
+A local SQLite catalog of everything a crawl has seen, so "what's new" and "what changed" are answered
+from disk instead of scraping the same creators again:
+
+    catalog = Catalog("catalog.sqlite")
+    model = await client.get_model("https://www.pornhub.com/model/x")
+    report = await catalog.sync(model.get_videos(pages="all", summaries=True), creator=model)
+    catalog.videos(creator="model/x", since=yesterday) # New videos
+    catalog.changed(since=yesterday) # Videos whose views / rating / likes moved
+
+Videos are keyed on their viewkey, GIFs on their ID and creators on kind/slug (e.g. "model/x"), so the same
+thing found through a search, a listing or a playlist is one row. Every row keeps first_seen and last_seen.
+Videos also keep the difference of views, rating and likes to the previous sync. Values an item doesn't
+have (e.g. the likes of a VideoSummary) never overwrite the ones that are known.
+
+Rows are upserted in batches of `batch_size`, one transaction per batch, on a worker thread.
+"""
+import re
+import json
+import time
+import asyncio
+import threading
+from typing import Any, AsyncIterable, AsyncGenerator, Iterable, TYPE_CHECKING
+
+from .export import export_row
+from .listing import listing_key
+
+if TYPE_CHECKING:
+    import sqlite3
+
+REGEX_PROFILE = re.compile(r"pornhub\.[a-z]+/(model|pornstar|channels|users)/([^/?#]+)")
+CREATOR_KINDS = {"channels": "channel", "users": "user", "model": "model", "pornstar": "pornstar"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS videos (
+    id TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    title TEXT,
+    creator TEXT,
+    duration INTEGER,
+    views INTEGER,
+    likes INTEGER,
+    rating REAL,
+    publish_date TEXT,
+    thumbnail TEXT,
+    categories TEXT,
+    views_delta INTEGER,
+    likes_delta INTEGER,
+    rating_delta REAL,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    changed_at REAL
+);
+CREATE INDEX IF NOT EXISTS videos_creator ON videos (creator);
+CREATE INDEX IF NOT EXISTS videos_publish_date ON videos (publish_date);
+CREATE INDEX IF NOT EXISTS videos_duration ON videos (duration);
+CREATE INDEX IF NOT EXISTS videos_first_seen ON videos (first_seen);
+CREATE INDEX IF NOT EXISTS videos_changed_at ON videos (changed_at);
+
+CREATE TABLE IF NOT EXISTS video_tags (
+    video_id TEXT NOT NULL,
+    tag TEXT NOT NULL,
+    PRIMARY KEY (video_id, tag)
+);
+CREATE INDEX IF NOT EXISTS video_tags_tag ON video_tags (tag);
+
+CREATE TABLE IF NOT EXISTS creators (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    url TEXT NOT NULL,
+    name TEXT,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS collections (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    url TEXT NOT NULL,
+    title TEXT,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS collection_items (
+    collection_id TEXT NOT NULL,
+    item_id TEXT NOT NULL,
+    position INTEGER,
+    PRIMARY KEY (collection_id, item_id)
+);
+
+CREATE TABLE IF NOT EXISTS gifs (
+    id TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    title TEXT,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL
+);
+"""
+
+# New numbers win, missing ones keep the old value. Deltas only move when there is a new number.
+UPSERT_VIDEO = """
+INSERT INTO videos (id, url, title, creator, duration, views, likes, rating, publish_date, thumbnail, categories,
+                    first_seen, last_seen)
+VALUES (:id, :url, :title, :creator, :duration, :views, :likes, :rating, :publish_date, :thumbnail, :categories, :seen, :seen)
+ON CONFLICT (id) DO UPDATE SET
+    url = excluded.url,
+    title = COALESCE(excluded.title, title),
+    creator = COALESCE(excluded.creator, creator),
+    duration = COALESCE(excluded.duration, duration),
+    views_delta = CASE WHEN excluded.views IS NOT NULL AND views IS NOT NULL THEN excluded.views - views ELSE views_delta END,
+    likes_delta = CASE WHEN excluded.likes IS NOT NULL AND likes IS NOT NULL THEN excluded.likes - likes ELSE likes_delta END,
+    rating_delta = CASE WHEN excluded.rating IS NOT NULL AND rating IS NOT NULL THEN excluded.rating - rating ELSE rating_delta END,
+    changed_at = CASE WHEN (excluded.views IS NOT NULL AND excluded.views IS NOT views)
+                        OR (excluded.likes IS NOT NULL AND excluded.likes IS NOT likes)
+                        OR (excluded.rating IS NOT NULL AND excluded.rating IS NOT rating)
+                      THEN excluded.last_seen ELSE changed_at END,
+    views = COALESCE(excluded.views, views),
+    likes = COALESCE(excluded.likes, likes),
+    rating = COALESCE(excluded.rating, rating),
+    publish_date = COALESCE(excluded.publish_date, publish_date),
+    thumbnail = COALESCE(excluded.thumbnail, thumbnail),
+    categories = COALESCE(excluded.categories, categories),
+    last_seen = excluded.last_seen
+"""
+
+UPSERT_SEEN = """
+INSERT INTO {table} (id, {columns}, first_seen, last_seen) VALUES (:id, {values}, :seen, :seen)
+ON CONFLICT (id) DO UPDATE SET {updates}, last_seen = excluded.last_seen
+"""
+
+
+def _upsert_seen(table: str, columns: tuple[str, ...]) -> str:
+    return UPSERT_SEEN.format(table=table, columns=", ".join(columns), values=", ".join(f":{column}" for column in columns),
+                              updates=", ".join(f"{column} = COALESCE(excluded.{column}, {column})" for column in columns))
+
+
+def creator_key(creator: Any) -> tuple[str, str] | None:
+    """(id, kind) of a creator URL (or an object with a url), e.g. ("model/x", "model")"""
+    url = creator if isinstance(creator, str) else getattr(creator, "url", "")
+    match = REGEX_PROFILE.search(url or "")
+    if not match:
+        return None
+
+    kind = CREATOR_KINDS[match.group(1)]
+    return f"{kind}/{match.group(2)}", kind
+
+
+def item_kind(url: str) -> str:
+    """video, gif, album, playlist or creator (by the URL)"""
+    if "viewkey=" in url:
+        return "video"
+
+    if "/gif/" in url:
+        return "gif"
+
+    if "/album/" in url:
+        return "album"
+
+    if "/playlist/" in url:
+        return "playlist"
+
+    return "creator" if REGEX_PROFILE.search(url) else "other"
+
+
+def _attribute(item: Any, *names: str) -> Any:
+    for name in names:
+        try:
+            value = getattr(item, name)
+
+        except Exception:
+            continue
+
+        if isinstance(value, str):
+            return value
+
+    return None
+
+
+class Catalog:
+    def __init__(self, path: str = "phub_catalog.sqlite", batch_size: int = 500):
+        """
+        :param path: The SQLite file (":memory:" for one that only lives as long as the object)
+        :param batch_size: Items per transaction when syncing
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self.clock = time.time
+        self.lock = threading.Lock()
+
+        import sqlite3 # Only loaded once a catalog is opened
+
+        self.connection = sqlite3.connect(path, check_same_thread=False, timeout=30, isolation_level=None)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript(SCHEMA)
+
+    def upsert(self, items: Iterable[Any], creator: Any = None, collection: Any = None, seen: float | None = None) -> dict[str, int]:
+        """
+        Stores a batch of items (Video, VideoSummary, GIF, Model, ... or export rows) in one transaction.
+        :param creator: The creator all the videos belong to (URL or object)
+        :param collection: The playlist / album the items are in, their order is kept as the position
+        :return: {"seen": ..., "new": ...}
+        """
+        seen = seen if seen is not None else self.clock()
+        owner = creator_key(creator) if creator is not None else None
+        group = self._collection(collection) if collection is not None else None
+        videos, tags, gifs, creators, positions = [], [], [], [], []
+        for item in items:
+            url = item.get("url") if isinstance(item, dict) else getattr(item, "url", None)
+            if not url:
+                continue
+
+            kind = item_kind(url)
+            if kind == "video":
+                row = export_row(item)
+                row["id"] = row.pop("video_id") or listing_key(url)
+                row["creator"] = owner[0] if owner else None
+                row["categories"] = json.dumps(row["categories"]) if row["categories"] else None
+                row["seen"] = seen
+                videos.append(row)
+                tags.extend((row["id"], tag) for tag in row.pop("tags"))
+                item_id = row["id"]
+
+            elif kind == "gif":
+                item_id = listing_key(url)
+                gifs.append({"id": item_id, "url": url, "title": _attribute(item, "title"), "seen": seen})
+
+            elif kind == "creator":
+                item_id, creator_kind = creator_key(url)
+                creators.append({"id": item_id, "kind": creator_kind, "url": url, "name": _attribute(item, "name", "title"), "seen": seen})
+
+            else:
+                continue
+
+            if group is not None:
+                positions.append((group["id"], item_id, len(positions)))
+
+        with self.lock:
+            before = self._count()
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                if owner is not None:
+                    url = creator if isinstance(creator, str) else creator.url
+                    self.connection.execute(_upsert_seen("creators", ("kind", "url", "name")),
+                                            {"id": owner[0], "kind": owner[1], "url": url, "name": _attribute(creator, "name"), "seen": seen})
+
+                if group is not None:
+                    self.connection.execute(_upsert_seen("collections", ("kind", "url", "title")), {**group, "seen": seen})
+                    self.connection.execute("DELETE FROM collection_items WHERE collection_id = ?", (group["id"],))
+
+                self.connection.executemany(UPSERT_VIDEO, videos)
+                # A listing without tags (summaries) keeps the ones that are known
+                tagged = list({video_id for video_id, _ in tags})
+                self.connection.executemany("DELETE FROM video_tags WHERE video_id = ?", [(video_id,) for video_id in tagged])
+                self.connection.executemany("INSERT OR IGNORE INTO video_tags (video_id, tag) VALUES (?, ?)", tags)
+                self.connection.executemany(_upsert_seen("gifs", ("url", "title")), gifs)
+                self.connection.executemany(_upsert_seen("creators", ("kind", "url", "name")), creators)
+                self.connection.executemany("INSERT OR REPLACE INTO collection_items (collection_id, item_id, position) VALUES (?, ?, ?)", positions)
+                self.connection.execute("COMMIT")
+
+            except BaseException:
+                self.connection.execute("ROLLBACK")
+                raise
+
+            return {"seen": len(videos) + len(gifs) + len(creators), "new": self._count() - before}
+
+    def _count(self) -> int:
+        return self.connection.execute("SELECT (SELECT COUNT(*) FROM videos) + (SELECT COUNT(*) FROM gifs) + "
+                                       "(SELECT COUNT(*) FROM creators)").fetchone()[0]
+
+    @staticmethod
+    def _collection(collection: Any) -> dict:
+        url = collection if isinstance(collection, str) else collection.url
+        kind = item_kind(url)
+        match = re.search(r"/(?:playlist|album)/(\d+)", url)
+        return {"id": f"{kind}/{match.group(1) if match else url.rstrip('/')}", "kind": kind, "url": url,
+                "title": None if isinstance(collection, str) else _attribute(collection, "title")}
+
+    async def track(self, items: AsyncIterable, creator: Any = None, collection: Any = None) -> AsyncGenerator[Any, None]:
+        """
+        Yields the items of a listing and stores them on the way (in batches, on a worker thread).
+        Items that were yielded before the listing is closed are stored too.
+        """
+        batch: list[Any] = []
+        seen = self.clock()
+        complete = False
+        try:
+            async for item in items:
+                # The items of a collection are replaced as a whole, so they're stored at the end
+                if collection is None and len(batch) >= self.batch_size:
+                    await asyncio.to_thread(self.upsert, batch, creator, None, seen)
+                    batch = []
+
+                batch.append(item)
+                yield item
+
+            complete = True
+
+        finally:
+            # A collection that wasn't listed to the end keeps its old items, the new ones are stored anyway
+            group = collection if complete else None
+            if batch or group is not None:
+                await asyncio.to_thread(self.upsert, batch, creator, group, seen)
+
+    async def sync(self, items: AsyncIterable, creator: Any = None, collection: Any = None) -> dict[str, int]:
+        """
+        Stores every item of a listing, returns {"seen": ..., "new": ..., "changed": ...}.
+        :param creator: The creator the listing belongs to (e.g. the Model of model.get_videos())
+        :param collection: The playlist / album of the listing
+        """
+        started = self.clock()
+        with self.lock:
+            before = self._count()
+
+        seen = 0
+        async for _ in self.track(items, creator=creator, collection=collection):
+            seen += 1
+
+        with self.lock:
+            new = self._count() - before
+
+        return {"seen": seen, "new": new, "changed": len(self.changed(since=started))}
+
+    def video(self, id: str) -> dict | None:
+        with self.lock:
+            row = self.connection.execute("SELECT * FROM videos WHERE id = ?", (id,)).fetchone()
+            tags = [tag for tag, in self.connection.execute("SELECT tag FROM video_tags WHERE video_id = ? ORDER BY tag", (id,))]
+
+        return self._video(row, tags) if row else None
+
+    @staticmethod
+    def _video(row: "sqlite3.Row", tags: list[str] | None = None) -> dict:
+        video = dict(row)
+        video["categories"] = json.loads(video["categories"]) if video["categories"] else []
+        if tags is not None:
+            video["tags"] = tags
+
+        return video
+
+    def videos(self, creator: str | None = None, tag: str | None = None, since: float | None = None,
+               published_after: str | None = None, min_duration: int | None = None, max_duration: int | None = None,
+               order_by: str = "publish_date", descending: bool = True, limit: int | None = None) -> list[dict]:
+        """
+        Videos from the catalog, all filters are optional.
+        :param creator: Creator ID, e.g. "model/x"
+        :param since: Only videos first seen after this timestamp (what's new)
+        :param published_after: publish_date >= this (same format as stored, e.g. "2024-01-31")
+        :param order_by: A column of the videos table
+        """
+        columns = {"publish_date", "duration", "views", "likes", "rating", "first_seen", "last_seen", "changed_at", "views_delta", "title"}
+        if order_by not in columns:
+            raise ValueError(f"Can't order by {order_by!r}, use one of {', '.join(sorted(columns))}")
+
+        conditions, parameters = [], []
+        for condition, value in (("creator = ?", creator), ("first_seen >= ?", since), ("publish_date >= ?", published_after),
+                                 ("duration >= ?", min_duration), ("duration <= ?", max_duration),
+                                 ("id IN (SELECT video_id FROM video_tags WHERE tag = ?)", tag)):
+            if value is not None:
+                conditions.append(condition)
+                parameters.append(value)
+
+        query = "SELECT * FROM videos" + (" WHERE " + " AND ".join(conditions) if conditions else "")
+        query += f" ORDER BY {order_by} {'DESC' if descending else 'ASC'}, id"
+        if limit is not None:
+            query += " LIMIT ?"
+            parameters.append(limit)
+
+        with self.lock:
+            return [self._video(row) for row in self.connection.execute(query, parameters)]
+
+    def changed(self, since: float, limit: int | None = None) -> list[dict]:
+        """Videos whose views, likes or rating changed since the timestamp, the biggest view jumps first"""
+        query = "SELECT * FROM videos WHERE changed_at >= ? ORDER BY views_delta DESC, id" + (" LIMIT ?" if limit is not None else "")
+        with self.lock:
+            return [self._video(row) for row in self.connection.execute(query, (since, *([limit] if limit is not None else [])))]
+
+    def tags(self, limit: int = 50) -> list[tuple[str, int]]:
+        """The most used tags and their number of videos"""
+        with self.lock:
+            return [(tag, count) for tag, count in self.connection.execute(
+                "SELECT tag, COUNT(*) AS count FROM video_tags GROUP BY tag ORDER BY count DESC, tag LIMIT ?", (limit,))]
+
+    def creators(self) -> list[dict]:
+        with self.lock:
+            return [dict(row) for row in self.connection.execute(
+                "SELECT creators.*, (SELECT COUNT(*) FROM videos WHERE videos.creator = creators.id) AS videos FROM creators ORDER BY id")]
+
+    def collection(self, collection: Any) -> list[str]:
+        """The item IDs of a playlist / album (URL or object), in order"""
+        key = self._collection(collection)["id"]
+        with self.lock:
+            return [item for item, in self.connection.execute(
+                "SELECT item_id FROM collection_items WHERE collection_id = ? ORDER BY position", (key,))]
+
+    def counts(self) -> dict[str, int]:
+        with self.lock:
+            return {table: self.connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                    for table in ("videos", "gifs", "creators", "collections")}
+
+    def close(self):
+        self.connection.close()
+
+    def __repr__(self) -> str:
+        return f"Catalog(path={self.path!r})"
@@ -0,0 +1,164 @@
+"""
+Adaptive (AIMD) concurrency control for all requests of a Client.
+
+Instead of a fixed videos_concurrency / pages_concurrency, the number of requests in flight follows the link:
+
+- Additive increase: every successful request adds increase / limit, so the limit grows by `increase` per
+  full window of requests, as long as the latency stays below the latency target.
+- Multiplicative decrease: a 429, a 5xx or the bot protection multiplies the limit with `decrease`. Only one cut
+  happens per round trip (failures of requests that started before the last cut are ignored), so a burst
+  of errors from the same window doesn't collapse the limit to the minimum.
+
+    client = Client(concurrency=AIMDController(initial=5, max_limit=40))
+    client.concurrency.metrics()
+"""
+import time
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Literal
+from .registry import CoreRegistry
+
+Outcome = Literal["success", "overload", "error"]
+
+
+class AIMDController:
+    def __init__(self, initial: int = 5, min_limit: int = 1, max_limit: int = 50, increase: float = 1.0,
+                 decrease: float = 0.5, latency_target: float | None = None, latency_tolerance: float = 3.0,
+                 error_rate_threshold: float = 0.2, window: int = 50):
+        """
+        :param initial: Starting limit of concurrent requests
+        :param min_limit: The limit never goes below this
+        :param max_limit: The limit never goes above this
+        :param increase: Added to the limit per window of successful requests
+        :param decrease: Factor the limit is multiplied with on overload
+        :param latency_target: Max healthy latency in seconds (Default: latency_tolerance * the best recent latency)
+        :param latency_tolerance: See latency_target
+        :param error_rate_threshold: Error rate over the last `window` requests that counts as overload
+        :param window: Number of requests the error rate and the best latency are computed over
+        """
+        if not 0 < decrease < 1:
+            raise ValueError("decrease must be between 0 and 1")
+
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = float(min(max(initial, min_limit), max_limit))
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_target = latency_target
+        self.latency_tolerance = latency_tolerance
+        self.error_rate_threshold = error_rate_threshold
+        self.clock = time.monotonic
+
+        self.in_flight = 0
+        self.successes = 0
+        self.overloads = 0
+        self.errors = 0
+        self.latency_ewma: float | None = None
+        self.decisions: deque[dict] = deque(maxlen=100)
+        self._outcomes: deque[bool] = deque(maxlen=window)
+        self._latencies: deque[float] = deque(maxlen=window)
+        self._last_decrease = float("-inf")
+        self._condition: asyncio.Condition | None = None
+
+    @property
+    def current_limit(self) -> int:
+        return int(self.limit)
+
+    @property
+    def error_rate(self) -> float:
+        return (self._outcomes.count(False) / len(self._outcomes)) if self._outcomes else 0.0
+
+    def _latency_healthy(self, latency: float) -> bool:
+        if self.latency_target is not None:
+            return latency <= self.latency_target
+
+        if not self._latencies:
+            return True
+
+        return latency <= min(self._latencies) * self.latency_tolerance
+
+    def _decide(self, action: str, reason: str):
+        self.decisions.append({"time": time.time(), "action": action, "limit": self.current_limit, "reason": reason})
+
+    def record(self, outcome: Outcome, started: float, latency: float, reason: str = ""):
+        """Feeds the result of a request into the controller"""
+        self._outcomes.append(outcome == "success")
+        if outcome == "success":
+            self.successes += 1
+            healthy = self._latency_healthy(latency)
+            self._latencies.append(latency)
+            self.latency_ewma = latency if self.latency_ewma is None else 0.8 * self.latency_ewma + 0.2 * latency
+            if healthy and self.limit < self.max_limit:
+                before = self.current_limit
+                self.limit = min(self.max_limit, self.limit + self.increase / self.limit)
+                if self.current_limit != before:
+                    self._decide("increase", f"healthy (latency {latency:.2f}s)")
+            return
+
+        if outcome == "overload":
+            self.overloads += 1
+
+        else:
+            self.errors += 1
+            if self.error_rate <= self.error_rate_threshold:
+                return
+
+            reason = f"error rate {self.error_rate:.0%}" + (f" ({reason})" if reason else "")
+
+        if started < self._last_decrease:
+            return # Already cut for this round trip
+
+        self._last_decrease = self.clock()
+        self.limit = max(float(self.min_limit), self.limit * self.decrease)
+        self._decide("decrease", reason or outcome)
+
+    async def acquire(self):
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < self.current_limit)
+            self.in_flight += 1
+
+    async def release(self):
+        self.in_flight -= 1
+        if self._condition is not None:
+            async with self._condition:
+                self._condition.notify_all()
+
+    @asynccontextmanager
+    async def slot(self):
+        """Waits for a free slot, use record() to report how the request went"""
+        await self.acquire()
+        try:
+            yield self.clock()
+
+        finally:
+            await self.release()
+
+    def metrics(self) -> dict:
+        return {
+            "limit": self.current_limit,
+            "in_flight": self.in_flight,
+            "successes": self.successes,
+            "overloads": self.overloads,
+            "errors": self.errors,
+            "error_rate": self.error_rate,
+            "latency_ewma": self.latency_ewma,
+            "decisions": list(self.decisions),
+        }
+
+    def __repr__(self) -> str:
+        return f"AIMDController(limit={self.current_limit}, min={self.min_limit}, max={self.max_limit}, in_flight={self.in_flight})"
+
+
+_controllers: CoreRegistry[AIMDController] = CoreRegistry()
+
+
+def set_concurrency_controller(core, controller: AIMDController | None):
+    _controllers.set(core, controller)
+
+
+def get_concurrency_controller(core) -> AIMDController | None:
+    return _controllers.get(core)
@@ -0,0 +1,222 @@
+"""
+Sharded crawls over many processes. One Client is one event loop on one core, which is too little once
+extracting the listings is the bottleneck, so large lists of seeds (creator URLs or search queries) are split
+across a pool of worker processes, each with its own Client and BaseCore session:
+
+    runner = crawl(seeds, workers=8, pages="all", rate_limits=limiter)
+    async with aclosing(runner.run()) as summaries:
+        async for summary in summaries:
+            ...
+
+    print(runner.stats(), runner.errors)
+
+- Seeds are sharded by a stable hash, so the same seed always ends up on the same worker
+- Results stream back to the parent while the workers are still running, duplicates are dropped there
+- Rate limits are a global budget: every worker gets 1 / workers of every rate
+- Stopping the iteration (or Ctrl+C) asks the workers to finish their current item and stop,
+  workers that don't stop within `shutdown_timeout` get terminated
+"""
+import queue
+import signal
+import asyncio
+import zlib
+from typing import Any, AsyncGenerator, Callable, Hashable, Iterable
+from .rate_limit import HostLimit, RateLimiter
+
+
+def shard_of(seed: str, workers: int) -> int:
+    """The worker a seed goes to (stable across runs, unlike hash())"""
+    return zlib.crc32(seed.encode("utf-8")) % workers
+
+
+def shard_seeds(seeds: Iterable[str], workers: int) -> list[list[str]]:
+    """Splits the seeds into one list per worker, dropping duplicate seeds"""
+    shards: list[list[str]] = [[] for _ in range(workers)]
+    for seed in dict.fromkeys(seed.strip() for seed in seeds):
+        if seed:
+            shards[shard_of(seed, workers)].append(seed)
+
+    return shards
+
+
+def share_of(limit: HostLimit | None, workers: int) -> HostLimit | None:
+    """One worker's share of a global HostLimit"""
+    if limit is None:
+        return None
+
+    def part(value: float | None) -> float | None:
+        return value / workers if value else value
+
+    return HostLimit(requests_per_second=part(limit.requests_per_second), bytes_per_second=part(limit.bytes_per_second),
+                     burst=max(part(limit.burst), 1) if limit.burst else None,
+                     bytes_burst=part(limit.bytes_burst))
+
+
+def split_rate_limits(limiter: RateLimiter | None, workers: int) -> tuple[dict[str, HostLimit], HostLimit | None] | None:
+    """The rules and default of a RateLimiter, scaled down to one worker (plain objects, so they can be pickled)"""
+    if limiter is None:
+        return None
+
+    return {pattern: share_of(limit, workers) for pattern, limit in limiter.rules.items()}, share_of(limiter.default, workers)
+
+
+async def _run_shard(index: int, seeds: list[str], open_client: Callable, crawl_seed: Callable, options: dict,
+                     rate_limits: tuple | None, results, stop):
+    limiter = RateLimiter(*rate_limits) if rate_limits is not None else None
+    client = open_client(limiter)
+    for seed in seeds:
+        if stop.is_set():
+            break
+
+        count = 0
+        try:
+            records = crawl_seed(client, seed, **options)
+            try:
+                async for record in records:
+                    results.put(("record", index, seed, record)) # Blocks while the parent is behind (bounded queue)
+                    count += 1
+                    if stop.is_set():
+                        break
+
+            finally:
+                await records.aclose()
+
+        except Exception as e:
+            results.put(("error", index, seed, f"{type(e).__name__}: {e}"))
+
+        results.put(("seed", index, seed, count))
+
+
+def _worker_main(index: int, seeds: list[str], open_client: Callable, crawl_seed: Callable, options: dict,
+                 rate_limits: tuple | None, results, stop):
+    signal.signal(signal.SIGINT, signal.SIG_IGN) # Ctrl+C is handled by the parent, which stops the workers properly
+    try:
+        asyncio.run(_run_shard(index, seeds, open_client, crawl_seed, options, rate_limits, results, stop))
+
+    except BaseException as e:
+        results.put(("error", index, None, f"{type(e).__name__}: {e}"))
+
+    finally:
+        results.put(("done", index, None, None))
+
+
+class CrawlRunner:
+    def __init__(self, seeds: Iterable[str], open_client: Callable[[RateLimiter | None], Any],
+                 crawl_seed: Callable[..., AsyncGenerator[Any, None]], workers: int = 4, options: dict | None = None,
+                 rate_limits: RateLimiter | None = None, key: Callable[[Any], Hashable] | None = None,
+                 limit: int | None = None, queue_size: int = 1000, shutdown_timeout: float = 10.0):
+        """
+        :param open_client: Creates the client of a worker from its share of the rate limits (module level function)
+        :param crawl_seed: Async generator function (client, seed, **options) yielding the records of one seed
+        :param workers: Number of worker processes (never more than there are seeds)
+        :param rate_limits: The global budget, split evenly across the workers
+        :param key: Global dedup key of a record (Default: the record itself), None results are never deduplicated
+        :param limit: Stop after that many (unique) records
+        :param queue_size: Records that may wait for the parent before the workers block
+        :param shutdown_timeout: Seconds the workers get to stop before they are terminated
+        """
+        if workers < 1:
+            raise ValueError("workers must be >= 1")
+
+        self.shards = [shard for shard in shard_seeds(seeds, workers) if shard]
+        self.open_client = open_client
+        self.crawl_seed = crawl_seed
+        self.options = dict(options or {})
+        self.rate_limits = split_rate_limits(rate_limits, max(len(self.shards), 1))
+        self.key = key or (lambda record: record)
+        self.limit = limit
+        self.queue_size = queue_size
+        self.shutdown_timeout = shutdown_timeout
+        self.errors: list[tuple[str | None, str]] = []
+        self.seen: set[Hashable] = set()
+        self.counts = {"records": 0, "duplicates": 0, "seeds": 0}
+
+    def __aiter__(self) -> AsyncGenerator[Any, None]:
+        return self.run()
+
+    async def run(self) -> AsyncGenerator[Any, None]:
+        """Starts the workers and yields the (deduplicated) records as they arrive"""
+        if not self.shards or (self.limit is not None and self.limit <= 0):
+            return
+
+        import multiprocessing # Only loaded once a crawl starts
+
+        context = multiprocessing.get_context("spawn") # Forking a process that runs an event loop isn't safe
+        results = context.Queue(maxsize=self.queue_size)
+        stop = context.Event()
+        processes = [context.Process(target=_worker_main, name=f"phub-crawl-{index}", daemon=True,
+                                     args=(index, shard, self.open_client, self.crawl_seed, self.options,
+                                           self.rate_limits, results, stop))
+                     for index, shard in enumerate(self.shards)]
+        for process in processes:
+            process.start()
+
+        running = set(range(len(processes)))
+        loop = asyncio.get_running_loop()
+        try:
+            while running:
+                try:
+                    kind, index, seed, payload = await loop.run_in_executor(None, results.get, True, 0.2)
+
+                except queue.Empty:
+                    for index in list(running):
+                        if not processes[index].is_alive() and results.empty():
+                            self.errors.append((None, f"Worker {index} exited with code {processes[index].exitcode}"))
+                            running.discard(index)
+
+                    continue
+
+                if kind == "done":
+                    running.discard(index)
+
+                elif kind == "error":
+                    self.errors.append((seed, payload))
+
+                elif kind == "seed":
+                    self.counts["seeds"] += 1
+
+                else:
+                    key = self.key(payload)
+                    if key is not None:
+                        if key in self.seen:
+                            self.counts["duplicates"] += 1
+                            continue
+
+                        self.seen.add(key)
+
+                    self.counts["records"] += 1
+                    yield payload
+                    if self.limit is not None and self.counts["records"] >= self.limit:
+                        return
+
+        finally:
+            await self._shutdown(processes, results, stop, running)
+
+    async def _shutdown(self, processes: list, results, stop, running: set[int]):
+        stop.set()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.shutdown_timeout
+        # Keep draining, a worker blocked on a full queue would never see the stop event
+        while running and loop.time() < deadline:
+            try:
+                kind, index, _, _ = await loop.run_in_executor(None, results.get, True, 0.1)
+                if kind == "done":
+                    running.discard(index)
+
+            except queue.Empty:
+                running = {index for index in running if processes[index].is_alive()}
+
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+            await loop.run_in_executor(None, process.join, 1)
+
+        results.close()
+        results.cancel_join_thread()
+
+    def stats(self) -> dict:
+        return {**self.counts, "errors": len(self.errors), "workers": len(self.shards)}
+
+    def __repr__(self) -> str:
+        return f"CrawlRunner(workers={len(self.shards)}, seeds={sum(map(len, self.shards))})"
@@ -38,4 +38,8 @@ class ProxyError(Exception):
 
 class UnknownNetworkError(Exception):
     def __init__(self, msg):
-        self.msg = msg
\ No newline at end of file
+        self.msg = msg
+
+class ContentReleased(Exception):
+    def __init__(self, msg: str):
+        self.msg = msg
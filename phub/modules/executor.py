@@ -0,0 +1,69 @@
+"""
+Optional worker pool for the CPU bound parts of PHUB (listing extractors, BeautifulSoup trees and flashvars).
+
+By default everything is parsed inside the event loop. To move the parsing out of it, assign an executor to the
+configuration of your core:
+
+    core.configuration.parse_executor = ParseExecutor(kind="process", max_workers=4)
+
+Only plain strings go into the workers and only dicts, lists and strings come back, so both thread and
+process pools work. BeautifulSoup trees can't leave a process cheaply, so they are only pre-built with
+kind="thread". With kind="process" the soup stays lazy and is built in the loop on first access.
+"""
+import os
+import asyncio
+import functools
+from typing import Any, Callable, Literal
+from concurrent.futures import Executor, ThreadPoolExecutor
+
+
+class ParseExecutor:
+    def __init__(self, kind: Literal["thread", "process"] = "thread", max_workers: int | None = None):
+        """
+        :param kind: thread or process. Processes scale with your cores, threads are cheaper to start
+        :param max_workers: Number of workers (Default: Number of CPU cores)
+        """
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown executor kind: {kind}, use thread or process")
+
+        self.kind = kind
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._executor: Executor | None = None
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                from concurrent.futures import ProcessPoolExecutor # Pulls in multiprocessing, only when it's used
+
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="phub-parse")
+
+        return self._executor
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+
+    def shutdown(self, wait: bool = True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+    def __repr__(self) -> str:
+        return f"ParseExecutor(kind={self.kind}, max_workers={self.max_workers})"
+
+
+def get_parse_executor(core) -> ParseExecutor | None:
+    return getattr(core.configuration, "parse_executor", None)
+
+
+async def run_parser(core, func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Runs func on the parse executor of the core, or directly if none is configured"""
+    executor = get_parse_executor(core)
+    if executor is None:
+        return func(*args, **kwargs)
+
+    return await executor.run(func, *args, **kwargs)
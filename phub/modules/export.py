@@ -0,0 +1,304 @@
+"""
+Writes the results of any listing (Video, VideoSummary, GIF, ...) to JSON lines, CSV or Parquet:
+
+    async with open_sink("videos.parquet") as sink:
+        async for video in client.search_videos("x", pages=10):
+            await sink.write(video)
+
+    await export(channel.get_videos(pages="all", summaries=True), "videos.csv")
+
+Every row has the same columns (EXPORT_FIELDS) with the same types, whatever the item had, so a file can be
+loaded without guessing. Missing values are null / empty. Lists (tags, categories) are arrays in JSON lines and
+Parquet and `;`-separated in CSV.
+
+Rows are collected into batches of `batch_size` and written on a thread of the sink, so the event loop never
+waits for the disk. At most one batch is written while the next one fills up, so the memory stays the same
+for ten or ten million rows. Parquet needs pyarrow (pip install pyarrow), every batch becomes a row group.
+"""
+import os
+import csv
+import sys
+import json
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterable, Literal
+
+Format = Literal["jsonl", "csv", "parquet"]
+
+# Column -> type (str, int, float or list), the schema of every export
+EXPORT_FIELDS: dict[str, type] = {
+    "url": str,
+    "video_id": str,
+    "title": str,
+    "duration": int, # Seconds
+    "views": int,
+    "likes": int,
+    "rating": float, # Percent
+    "publish_date": str,
+    "thumbnail": str,
+    "tags": list,
+    "categories": list,
+}
+
+# Attributes tried for a column, in order. VideoSummary has thumb / duration_seconds, Video thumbnail / duration.
+SOURCES = {
+    "duration": ("duration_seconds", "duration"),
+    "thumbnail": ("thumbnail", "thumb"),
+    "rating": ("rating", "rating_percent"),
+}
+
+EXTENSIONS = {".jsonl": "jsonl", ".ndjson": "jsonl", ".json": "jsonl", ".csv": "csv", ".parquet": "parquet", ".pq": "parquet"}
+
+
+def _value(item: Any, names: tuple[str, ...]) -> Any:
+    for name in names:
+        try:
+            value = getattr(item, name)
+
+        except Exception:
+            continue # A property the item can't provide (e.g. no watch page)
+
+        if value is not None and not callable(value):
+            return value
+
+    return None
+
+
+def _number(value: Any, kind: type) -> int | float | None:
+    if value is None or isinstance(value, bool):
+        return None
+
+    if isinstance(value, (int, float)):
+        return kind(value)
+
+    text = str(value).strip().replace(",", "").rstrip("%")
+    if kind is int and ":" in text: # 10:23 / 1:02:03
+        seconds = 0
+        for part in text.split(":"):
+            if not part.isdigit():
+                return None
+            seconds = seconds * 60 + int(part)
+        return seconds
+
+    try:
+        return kind(float(text))
+
+    except ValueError:
+        return None
+
+
+def _coerce(value: Any, kind: type) -> Any:
+    if kind is list:
+        if value is None:
+            return []
+
+        values = value.values() if isinstance(value, dict) else value if isinstance(value, (list, tuple)) else [value]
+        return [str(entry) for entry in values]
+
+    if kind in (int, float):
+        return _number(value, kind)
+
+    return None if value is None else str(value)
+
+
+def export_row(item: Any, fields: dict[str, type] | None = None) -> dict:
+    """The row of an item: every field of the schema, converted to its type (None if the item doesn't have it)"""
+    fields = fields or EXPORT_FIELDS
+    if isinstance(item, dict):
+        return {name: _coerce(item.get(name), kind) for name, kind in fields.items()}
+
+    return {name: _coerce(_value(item, SOURCES.get(name, (name,))), kind) for name, kind in fields.items()}
+
+
+class ExportSink:
+    format: Format
+
+    def __init__(self, path: str, fields: dict[str, type] | None = None, batch_size: int = 1000):
+        """
+        :param path: The file to write to, "-" for stdout (not for Parquet)
+        :param fields: Column -> type, the schema of the rows (Default: EXPORT_FIELDS)
+        :param batch_size: Rows that are collected before they're written
+        """
+        self.path = path
+        self.fields = fields or EXPORT_FIELDS
+        self.batch_size = batch_size
+        self.rows = 0
+        self._batch: list[dict] = []
+        self._writing: asyncio.Future | None = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="phub-export") # One thread keeps the order
+        self._file = None
+        self._closed = False
+
+    async def write(self, item: Any):
+        """Adds an item (or a ready row dict). Only waits if the previous batch is still being written."""
+        self._batch.append(export_row(item, self.fields))
+        self.rows += 1
+        if len(self._batch) >= self.batch_size:
+            await self._flush()
+
+    async def _run(self, function, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, function, *args)
+
+    async def _flush(self):
+        if self._writing is not None:
+            await self._writing # Backpressure: one batch in flight at most
+
+        batch, self._batch = self._batch, []
+        self._writing = asyncio.ensure_future(self._run(self._write_batch, batch)) if batch else None
+
+    async def flush(self):
+        """Writes everything that is buffered and waits until it's written"""
+        await self._flush()
+        if self._writing is not None:
+            await self._writing
+            self._writing = None
+
+    async def close(self):
+        if self._closed:
+            return
+
+        self._closed = True
+        try:
+            await self.flush()
+
+        finally:
+            try:
+                await self._run(self._finish)
+
+            finally:
+                self._executor.shutdown(wait=False)
+
+    async def __aenter__(self) -> "ExportSink":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def _open_text(self):
+        if self.path == "-":
+            return sys.stdout
+
+        return open(self.path, "w", encoding="utf-8", newline="")
+
+    def _write_batch(self, rows: list[dict]):
+        raise NotImplementedError
+
+    def _finish(self):
+        if self._file is None:
+            self._write_batch([]) # No rows, still a valid file (with the CSV header / the Parquet schema)
+
+        if self._file is sys.stdout:
+            sys.stdout.flush()
+
+        else:
+            self._file.close()
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(path={self.path!r}, rows={self.rows})"
+
+
+class JSONLSink(ExportSink):
+    format = "jsonl"
+
+    def _write_batch(self, rows: list[dict]):
+        if self._file is None:
+            self._file = self._open_text()
+
+        self._file.write("".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows))
+
+
+class CSVSink(ExportSink):
+    format = "csv"
+
+    def __init__(self, path: str, fields: dict[str, type] | None = None, batch_size: int = 1000, list_separator: str = ";"):
+        """
+        :param list_separator: Joins the values of list columns
+        """
+        super().__init__(path, fields=fields, batch_size=batch_size)
+        self.list_separator = list_separator
+        self._writer = None
+
+    def _write_batch(self, rows: list[dict]):
+        if self._file is None:
+            self._file = self._open_text()
+            self._writer = csv.DictWriter(self._file, fieldnames=list(self.fields))
+            self._writer.writeheader()
+
+        separator = self.list_separator
+        self._writer.writerows({name: separator.join(value) if isinstance(value, list) else value
+                                for name, value in row.items()} for row in rows)
+
+
+class ParquetSink(ExportSink):
+    format = "parquet"
+
+    def __init__(self, path: str, fields: dict[str, type] | None = None, batch_size: int = 10_000, compression: str = "zstd"):
+        """
+        :param compression: Parquet compression codec (snappy, zstd, gzip, none)
+        """
+        try:
+            import pyarrow
+
+        except (ModuleNotFoundError, ImportError):
+            raise ImportError("Parquet exports need the pyarrow package (pip install pyarrow)") from None
+
+        if path == "-":
+            raise ValueError("Parquet can't be written to stdout")
+
+        super().__init__(path, fields=fields, batch_size=batch_size)
+        self.compression = compression
+        types = {str: pyarrow.string(), int: pyarrow.int64(), float: pyarrow.float64(), list: pyarrow.list_(pyarrow.string())}
+        self.schema = pyarrow.schema([(name, types[kind]) for name, kind in self.fields.items()])
+
+    def _write_batch(self, rows: list[dict]):
+        import pyarrow
+        import pyarrow.parquet
+
+        if self._file is None:
+            self._file = pyarrow.parquet.ParquetWriter(self.path, self.schema, compression=self.compression)
+
+        if rows:
+            self._file.write_table(pyarrow.Table.from_pylist(rows, schema=self.schema))
+
+
+SINKS: dict[str, type[ExportSink]] = {"jsonl": JSONLSink, "csv": CSVSink, "parquet": ParquetSink}
+
+
+def guess_format(path: str) -> Format:
+    """The format for a file name (JSON lines if the extension says nothing)"""
+    return EXTENSIONS.get(os.path.splitext(path)[1].lower(), "jsonl")
+
+
+def open_sink(path: str, format: Format | None = None, **kwargs) -> ExportSink:
+    """
+    The sink for a file.
+    :param format: jsonl, csv or parquet (Default: from the extension of the path)
+    :param kwargs: Go to the sink (fields, batch_size, ...)
+    """
+    format = format or guess_format(path)
+    if format not in SINKS:
+        raise ValueError(f"Unknown export format: {format} (one of {', '.join(SINKS)})")
+
+    return SINKS[format](path, **kwargs)
+
+
+async def export(items: AsyncIterable, path: str, format: Format | None = None, limit: int | None = None, **kwargs) -> int:
+    """
+    Writes every item of a listing to a file, returns the number of rows.
+    :param limit: Stops (and closes the listing) after that many rows
+    """
+    written = 0
+    async with open_sink(path, format=format, **kwargs) as sink:
+        try:
+            async for item in items:
+                await sink.write(item)
+                written += 1
+                if limit is not None and written >= limit:
+                    break
+
+        finally:
+            close = getattr(items, "aclose", None)
+            if close is not None:
+                await close()
+
+    return written
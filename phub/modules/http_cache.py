@@ -0,0 +1,314 @@
+"""
+Optional persistent response cache, so that a crawl doesn't download every page again when it's run twice.
+
+    core.configuration.http_cache = HTTPCache("phub_cache.sqlite", max_size_mb=512)
+
+Every page that goes through get_html_content (profiles, listings, watch pages) and the Webmaster API then
+uses the cache. Bodies are stored compressed in a single SQLite file (zstd if available, zlib otherwise).
+
+How long a response stays fresh depends on the kind of URL (see TTLS and resource_type). Expired entries
+that came with an ETag or Last-Modified header are revalidated with a conditional request, so a 304 doesn't
+download the page again. Once the file is bigger than max_size_mb, the least recently used entries are dropped.
+"""
+import re
+import time
+import zlib
+import asyncio
+import threading
+from typing import Awaitable, Callable
+from curl_cffi import Response
+from .single_flight import normalize_url
+from .rate_limit import get_rate_limiter, response_size
+
+try:
+    from compression import zstd # Python 3.14+
+    ZSTD = "zstd"
+
+except (ModuleNotFoundError, ImportError):
+    try:
+        import zstandard
+
+        class _Zstd: # Same interface as compression.zstd
+            @staticmethod
+            def compress(data: bytes, level: int = 3) -> bytes:
+                return zstandard.ZstdCompressor(level=level).compress(data)
+
+            @staticmethod
+            def decompress(data: bytes) -> bytes:
+                return zstandard.ZstdDecompressor().decompress(data)
+
+        zstd = _Zstd
+        ZSTD = "zstd"
+
+    except (ModuleNotFoundError, ImportError):
+        zstd = None
+        ZSTD = None
+
+
+# Seconds a response stays fresh, per kind of URL. 0 disables caching for that kind.
+TTLS = {
+    "api": 60 * 60,
+    "watch": 60 * 60,
+    "listing": 10 * 60,
+    "profile": 6 * 60 * 60,
+    "other": 30 * 60,
+}
+
+REGEX_LISTING_URL = re.compile(r"[?&](page|o|search|c)=|/video/search|/gifs/search|/playlist/viewChunked|/videos(/|$|\?)")
+REGEX_PROFILE_URL = re.compile(r"/(model|pornstar|channels|users|album|playlist)/")
+
+
+def resource_type(url: str) -> str:
+    """api, watch, listing, profile or other"""
+    if "/webmasters/" in url:
+        return "api"
+
+    if "view_video.php" in url:
+        return "watch"
+
+    if REGEX_LISTING_URL.search(url):
+        return "listing"
+
+    if REGEX_PROFILE_URL.search(url):
+        return "profile"
+
+    return "other"
+
+
+class CacheEntry:
+    def __init__(self, body: str, etag: str | None, last_modified: str | None, fresh: bool):
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fresh = fresh
+
+    @property
+    def validators(self) -> dict:
+        """Headers for a conditional request"""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+
+        return headers
+
+
+class HTTPCache:
+    def __init__(self, path: str = "phub_cache.sqlite", ttls: dict | None = None, max_size_mb: float = 512,
+                 compression_level: int = 3):
+        """
+        :param path: The SQLite file (":memory:" works too)
+        :param ttls: Overrides for TTLS, e.g. {"listing": 60}
+        :param max_size_mb: Compressed size at which the least recently used entries get evicted
+        :param compression_level: zstd / zlib compression level
+        """
+        self.path = path
+        self.ttls = {**TTLS, **(ttls or {})}
+        self.max_size = int(max_size_mb * 1024 * 1024)
+        self.compression_level = compression_level
+        self.clock = time.time
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.lock = threading.Lock()
+
+        import sqlite3 # Only loaded once a cache is opened
+
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("""CREATE TABLE IF NOT EXISTS responses (
+            key TEXT PRIMARY KEY,
+            kind TEXT NOT NULL,
+            codec TEXT NOT NULL,
+            body BLOB NOT NULL,
+            size INTEGER NOT NULL,
+            etag TEXT,
+            last_modified TEXT,
+            stored_at REAL NOT NULL,
+            accessed_at REAL NOT NULL
+        )""")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+        self.connection.commit()
+        # Kept up to date by store(), so that a store doesn't have to sum up the whole table
+        self.total = self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def _compress(self, body: str) -> tuple[str, bytes]:
+        data = body.encode("utf-8")
+        if zstd is not None:
+            return "zstd", zstd.compress(data, self.compression_level)
+
+        return "zlib", zlib.compress(data, self.compression_level)
+
+    @staticmethod
+    def _decompress(codec: str, data: bytes) -> str | None:
+        if codec == "zstd":
+            if zstd is None:
+                return None # Written by an installation with zstd, treated as a miss
+
+            return zstd.decompress(data).decode("utf-8")
+
+        return zlib.decompress(data).decode("utf-8")
+
+    def cacheable(self, url: str) -> bool:
+        return self.ttls.get(resource_type(url), 0) > 0
+
+    def lookup(self, url: str) -> CacheEntry | None:
+        key = normalize_url(url)
+        now = self.clock()
+        with self.lock:
+            row = self.connection.execute("SELECT kind, codec, body, etag, last_modified, stored_at FROM responses WHERE key = ?",
+                                          (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            kind, codec, data, etag, last_modified, stored_at = row
+            body = self._decompress(codec, data)
+            if body is None:
+                self.misses += 1
+                return None
+
+            self.connection.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self.connection.commit()
+
+        fresh = now - stored_at < self.ttls.get(kind, 0)
+        if fresh:
+            self.hits += 1
+
+        return CacheEntry(body, etag=etag, last_modified=last_modified, fresh=fresh)
+
+    def store(self, url: str, body: str, etag: str | None = None, last_modified: str | None = None):
+        kind = resource_type(url)
+        if self.ttls.get(kind, 0) <= 0:
+            return
+
+        codec, data = self._compress(body)
+        key = normalize_url(url)
+        now = self.clock()
+        with self.lock:
+            replaced = self.connection.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self.connection.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                    (key, kind, codec, data, len(data), etag, last_modified, now, now))
+            self.total += len(data) - (replaced[0] if replaced else 0)
+            self._evict()
+            self.connection.commit()
+
+    def refresh(self, url: str):
+        """Marks an entry as fresh again (after a 304)"""
+        now = self.clock()
+        with self.lock:
+            self.revalidated += 1
+            self.connection.execute("UPDATE responses SET stored_at = ?, accessed_at = ? WHERE key = ?", (now, now, normalize_url(url)))
+            self.connection.commit()
+
+    def _evict(self):
+        # Walks the accessed_at index from the oldest entry, a few rows at a time
+        while self.total > self.max_size:
+            rows = self.connection.execute("SELECT key, size FROM responses ORDER BY accessed_at LIMIT 32").fetchall()
+            if not rows:
+                self.total = 0 # Out of sync (another process shares the file), nothing left to evict anyway
+                return
+
+            for key, size in rows:
+                self.connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.total -= size
+                if self.total <= self.max_size:
+                    return
+
+    def size(self) -> int:
+        """Compressed size of all entries in bytes"""
+        with self.lock:
+            return self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def __len__(self) -> int:
+        with self.lock:
+            return self.connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "revalidated": self.revalidated, "entries": len(self), "bytes": self.size()}
+
+    def clear(self):
+        with self.lock:
+            self.connection.execute("DELETE FROM responses")
+            self.connection.commit()
+            self.total = 0
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+    def __repr__(self) -> str:
+        return f"HTTPCache(path={self.path}, max_size_mb={self.max_size / 1024 / 1024:g})"
+
+
+def get_http_cache(core) -> HTTPCache | None:
+    return getattr(core.configuration, "http_cache", None)
+
+
+def decode_response(response: Response) -> str:
+    return response.content.decode(getattr(response, "encoding", None) or "utf-8", errors="replace")
+
+
+def _is_challenge(body: str) -> bool:
+    # The bot challenge page, which only core.fetch knows how to solve
+    return 'onload="go()"' in body
+
+
+async def _revalidate(core, url: str, entry: CacheEntry) -> Response | None:
+    if core.session is None:
+        core.initialize_session()
+
+    limiter = get_rate_limiter(core)
+    if limiter is not None:
+        await limiter.acquire(url)
+
+    try:
+        response = await core.session.get(url, headers=entry.validators, timeout=core.configuration.timeout)
+        if limiter is not None:
+            limiter.consume(url, response_size(response))
+
+        return response
+
+    except Exception:
+        return None # core.fetch takes care of retries and errors
+
+
+async def fetch_cached(core, cache: HTTPCache, url: str, fetch: Callable[..., Awaitable] | None = None) -> str | Response:
+    """
+    Fetches a page through the cache. Returns the body, or the Response if the status code isn't 200.
+    :param fetch: Used instead of core.fetch for the actual request
+    """
+    fetch = fetch or core.fetch
+    if not cache.cacheable(url):
+        response = await fetch(url, get_response=True)
+        if isinstance(response, Response) and response.status_code == 200:
+            return decode_response(response)
+
+        return response
+
+    entry = await asyncio.to_thread(cache.lookup, url)
+    if entry is not None and entry.fresh:
+        return entry.body
+
+    if entry is not None and entry.validators:
+        response = await _revalidate(core, url, entry)
+        if response is not None:
+            if response.status_code == 304:
+                await asyncio.to_thread(cache.refresh, url)
+                return entry.body
+
+            if response.status_code == 200:
+                body = decode_response(response)
+                if not _is_challenge(body):
+                    await asyncio.to_thread(cache.store, url, body, response.headers.get("etag"), response.headers.get("last-modified"))
+                    return body
+
+    response = await fetch(url, get_response=True)
+    if not isinstance(response, Response) or response.status_code != 200:
+        return response
+
+    body = decode_response(response)
+    await asyncio.to_thread(cache.store, url, body, response.headers.get("etag"), response.headers.get("last-modified"))
+    return body
@@ -0,0 +1,148 @@
+"""
+Identity map: one object per video / profile per Client, so repeated lookups reuse the already hydrated object.
+
+Objects are keyed on their canonical ID (the viewkey for videos, the slug for profiles), so
+?pkey= parameters, trailing slashes or /videos suffixes don't create duplicates. The map is an LRU with
+a maximum size and an optional TTL, after which an object is considered stale and gets fetched again.
+"""
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable
+from .listing import REGEX_LISTING_VIEWKEY
+from .single_flight import SingleFlight, normalize_url
+from .registry import CoreRegistry
+
+REGEX_PROFILE_SLUG = re.compile(r"/(model|pornstar|channels|users|album|playlist|gif|shorties)/([^/?#]+)", re.IGNORECASE)
+
+
+def identity_key(kind: str, url: str) -> tuple[str, str]:
+    """
+    :param kind: The class name (Video, Pornstar, Channel, ...)
+    :param url: The URL of the object
+    """
+    match = REGEX_LISTING_VIEWKEY.search(url)
+    if match:
+        return kind, match.group(1)
+
+    match = REGEX_PROFILE_SLUG.search(url)
+    if match:
+        return kind, f"{match.group(1).lower()}/{match.group(2).lower()}"
+
+    return kind, normalize_url(url).rstrip("/")
+
+
+def is_hydrated(obj: Any) -> bool:
+    return bool(getattr(obj, "is_hydrated", True))
+
+
+class IdentityMap:
+    def __init__(self, max_size: int = 1000, ttl: float | None = None):
+        """
+        :param max_size: Max number of objects, the least recently used one is dropped first (0 disables the map)
+        :param ttl: Seconds after which an object is fetched again (Default: never)
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = time.monotonic
+        self.hits = 0
+        self.misses = 0
+        self._objects: OrderedDict[tuple[str, str], tuple[Any, float]] = OrderedDict()
+        self._inits = SingleFlight()
+
+    def get(self, kind: str, url: str) -> Any | None:
+        key = identity_key(kind, url)
+        entry = self._objects.get(key)
+        if entry is None:
+            return None
+
+        obj, added = entry
+        if self.ttl is not None and self.clock() - added > self.ttl:
+            del self._objects[key]
+            return None
+
+        self._objects.move_to_end(key)
+        return obj
+
+    def put(self, obj: Any, kind: str | None = None) -> Any:
+        if self.max_size <= 0:
+            return obj
+
+        key = identity_key(kind or obj.__class__.__name__, obj.url)
+        self._objects[key] = (obj, self.clock())
+        self._objects.move_to_end(key)
+        while len(self._objects) > self.max_size:
+            self._objects.popitem(last=False)
+
+        return obj
+
+    def get_or_put(self, obj: Any, kind: str | None = None) -> Any:
+        """Returns the object that is already in the map (hydrated or not), or adds obj"""
+        existing = self.get(kind or obj.__class__.__name__, obj.url)
+        return existing if existing is not None else self.put(obj, kind=kind)
+
+    async def get_or_init(self, kind: str, url: str, create: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Returns the hydrated object for the URL. If there is none, create() builds and initializes it
+        (concurrent calls for the same object share one create()).
+        """
+        existing = self.get(kind, url)
+        if existing is not None and is_hydrated(existing):
+            self.hits += 1
+            return existing
+
+        self.misses += 1
+
+        async def create_and_put():
+            return self.put(await create(), kind=kind)
+
+        return await self._inits.do(identity_key(kind, url), create_and_put)
+
+    def discard(self, kind: str, url: str):
+        self._objects.pop(identity_key(kind, url), None)
+
+    def clear(self):
+        self._objects.clear()
+
+    def __len__(self) -> int:
+        return len(self._objects)
+
+    def __contains__(self, obj: Any) -> bool:
+        return identity_key(obj.__class__.__name__, obj.url) in self._objects
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "coalesced": self._inits.coalesced, "size": len(self)}
+
+    def __repr__(self) -> str:
+        return f"IdentityMap(max_size={self.max_size}, ttl={self.ttl}, size={len(self)})"
+
+
+_maps: CoreRegistry[IdentityMap] = CoreRegistry()
+
+
+def set_identity_map(core, identity_map: IdentityMap | None):
+    _maps.set(core, identity_map)
+
+
+def get_identity_map(core) -> IdentityMap | None:
+    return _maps.get(core)
+
+
+async def fetch_object(core, cls: type, url: str, **kwargs) -> Any:
+    """
+    Returns cls(url, core).init(), or the already hydrated object from the identity map of the core.
+    """
+    identity_map = get_identity_map(core)
+    if identity_map is None:
+        return await cls(url=url, core=core, **kwargs).init()
+
+    return await identity_map.get_or_init(cls.__name__, url, lambda: cls(url=url, core=core, **kwargs).init())
+
+
+def register_object(core, obj: Any) -> Any:
+    """Puts a (not yet hydrated) object into the identity map of the core, or returns the one that is already there"""
+    identity_map = get_identity_map(core)
+    if identity_map is None:
+        return obj
+
+    return identity_map.get_or_put(obj)
@@ -0,0 +1,191 @@
+"""
+Helpers for the listing pipelines (search, channel videos, playlists, ...)
+"""
+import re
+from typing import Any, Callable, Iterable, Iterator
+
+REGEX_LISTING_VIEWKEY = re.compile(r"viewkey=([^&#]+)")
+REGEX_LISTING_GIF_ID = re.compile(r"/gif/(\d+)")
+
+
+def listing_key(item: str | dict) -> str:
+    """
+    Returns a stable key for a listing item (URL or extractor dict).
+    Videos are keyed on their viewkey and GIFs on their ID, so that tracking parameters like &pkey= don't matter.
+    Everything else (users, models, pornstars) is keyed on the URL.
+    """
+    url = item["url"] if isinstance(item, dict) else item
+    match = REGEX_LISTING_VIEWKEY.search(url) or REGEX_LISTING_GIF_ID.search(url)
+    if match:
+        return match.group(1)
+
+    return url.rstrip("/")
+
+
+class SeenKeys:
+    """
+    Keeps a listing free of duplicates across all of its pages.
+
+    A key is reserved as soon as its item is extracted, so an item that is on two pages that download at the
+    same time is only constructed (and hydrated) once. It's yielded at its position on the page that was
+    extracted first, which isn't always the earlier page. If the item fails, its key is released and a later
+    occurrence may take its place. Keys a listing reserved but never yielded (it was left early) are released
+    at the end, so a SeenKeys that is shared between listings only keeps out what was actually yielded.
+    """
+    def __init__(self):
+        self.yielded: set[str] = set()
+        self.reserved: set[str] = set()
+
+    def filter(self, items: list, limit: int | None = None) -> list:
+        """
+        Drops items from an extracted page that were already extracted or yielded before (duplicates on the page too)
+        and reserves the others.
+        :param limit: Keep (and reserve) at most this many items
+        """
+        kept = []
+        for item in items:
+            if limit is not None and len(kept) >= limit:
+                break
+
+            key = listing_key(item)
+            if key not in self.yielded and key not in self.reserved:
+                self.reserved.add(key)
+                kept.append(item)
+
+        return kept
+
+    def release(self, items: Iterable[str | dict]):
+        """Gives up the reservation of items that weren't yielded (they failed, or the listing ended before them)"""
+        for item in items:
+            self.reserved.discard(listing_key(item))
+
+    def admit(self, item: str | dict) -> bool:
+        """Returns True (and remembers the item) if the item wasn't yielded yet."""
+        key = listing_key(item)
+        if key in self.yielded:
+            return False
+
+        self.reserved.discard(key)
+        self.yielded.add(key)
+        return True
+
+    def __len__(self) -> int:
+        return len(self.yielded)
+
+    def __contains__(self, item: str | dict) -> bool:
+        return listing_key(item) in self.yielded
+
+
+# Rough number of items on a listing page. Only used to guess how many pages max_items needs before the first one arrived.
+ITEMS_PER_PAGE = 30
+
+REGEX_PAGINATION = re.compile(r'class="pagination3[^"]*"(.*?)</ul>', re.DOTALL)
+REGEX_PAGINATION_NUMBER = re.compile(r">\s*(\d+)\s*<")
+REGEX_SHOWING_COUNTER = re.compile(r"Showing\s+1\s*-\s*(\d+)\s+of\s+([\d,.]+)", re.IGNORECASE)
+
+
+def detect_last_page(content: str) -> int | None:
+    """
+    Reads the number of the last page from a listing page, either from the "Showing 1-32 of 1,234" counter
+    (only on the first page) or from the pagination widget, which always shows the last page after the "...".
+    Returns None if the page has neither (e.g. JSON), 1 if there's a widget without numbers.
+    """
+    counter = REGEX_SHOWING_COUNTER.search(content)
+    if counter:
+        per_page, total = int(counter.group(1)), int(re.sub(r"[,.]", "", counter.group(2)))
+        if per_page > 0:
+            return max(1, -(-total // per_page))
+
+    widget = REGEX_PAGINATION.search(content)
+    if widget is None:
+        return None
+
+    numbers = [int(number) for number in REGEX_PAGINATION_NUMBER.findall(widget.group(1))]
+    return max(numbers, default=1)
+
+
+class PageURLs:
+    """
+    The page URLs of a listing, handed out one by one as the iterator asks for the next page.
+
+    pages="all" keeps going until the listing ends, with a number it stops there at the latest. Either way,
+    no page after the last one is requested: the last page is read from the pagination widget (see
+    detect_last_page) and a page without any new items ends the listing as well. Pages that were already
+    scheduled when that is found out (at most pages_concurrency) still finish.
+
+    With max_items, pages are handed out until that many new items were found. Items that are lost afterwards
+    (their video failed) don't count anymore, so iterating again continues with the next page.
+    """
+    def __init__(self, url_for: Callable[[int], str], pages: int | str = 5, start: int = 1):
+        """
+        :param url_for: Returns the URL of a page number
+        :param pages: Max number of pages, or "all"
+        :param start: The first page number
+        """
+        if pages != "all" and (not isinstance(pages, int) or pages < 0):
+            raise ValueError(f'pages must be a positive number or "all", not {pages!r}')
+
+        self.url_for = url_for
+        self.limit = None if pages == "all" else start + pages - 1
+        self.start = start
+        self.last_page: int | None = None
+        self.exhausted = False
+        self.handed_out = 0
+        self.next_page = start # Iterating again continues where the last iteration stopped
+        self.max_items: int | None = None # No more pages once that many new items were found
+        self.found = 0
+
+    @classmethod
+    def from_list(cls, urls: list[str]) -> "PageURLs":
+        return cls(lambda page: urls[page - 1], len(urls))
+
+    def _allowed(self, page: int) -> bool:
+        return (not self.exhausted and (self.max_items is None or self.found < self.max_items)
+                and (self.limit is None or page <= self.limit) and (self.last_page is None or page <= self.last_page))
+
+    def __iter__(self) -> Iterator[str]:
+        while self._allowed(self.next_page):
+            page = self.next_page
+            self.next_page += 1
+            self.handed_out += 1
+            yield self.url_for(page)
+
+    def __len__(self) -> int:
+        """The number of pages as far as it's known yet (0 for "all" before the first page arrived)"""
+        known = [number for number in (self.limit, self.last_page) if number is not None]
+        return max(0, min(known) - self.start + 1) if known else 0
+
+    def __bool__(self) -> bool:
+        """Whether there are pages left to hand out"""
+        return self._allowed(self.next_page)
+
+    def observe(self, content: Any, new_items: list):
+        """Called with every extracted page and its new (not yet seen) items"""
+        if isinstance(content, str):
+            last_page = detect_last_page(content)
+            if last_page is not None:
+                self.last_page = max(self.last_page or 0, last_page)
+
+        self.found += len(new_items)
+        if not new_items:
+            self.exhausted = True
+
+    def lost(self, count: int = 1):
+        """Called for found items that won't be yielded after all (their video failed)"""
+        self.found -= count
+
+    def failed(self, url: str):
+        """
+        Called when a page failed for good. Without a known last page, that ends an "all" listing,
+        otherwise pages that don't exist would be requested forever.
+        """
+        if self.limit is None and self.last_page is None:
+            self.exhausted = True
+
+    def __repr__(self) -> str:
+        return f"PageURLs(limit={self.limit}, last_page={self.last_page}, exhausted={self.exhausted}, found={self.found})"
+
+
+def pages_needed(max_items: int, pages_concurrency: int, per_page: int = ITEMS_PER_PAGE) -> int:
+    """How many pages to fetch at once for max_items items (never more than pages_concurrency)"""
+    return max(1, min(pages_concurrency, -(-max_items // per_page)))
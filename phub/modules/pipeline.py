@@ -0,0 +1,219 @@
+"""
+Backpressure for the listing pipelines: work only runs a bounded number of steps ahead of the consumer,
+and stopping the iteration (break, an exception, aclose()) cancels whatever is still in flight.
+
+    async with aclosing(client.search_videos("x", pages=100)) as videos:
+        async for video in videos:
+            await video.download(...) # Slow consumer: only a few pages are fetched ahead of it
+            if done:
+                break # Outstanding page and video tasks get cancelled right here
+
+Without aclosing(), the cancellation happens when the event loop finalizes the generator,
+which in CPython is right after the loop is left as well, just not inside of it.
+
+hydration_stage() does the same for the init() calls of the items a listing produces, so the GIF, account
+and HubTraffic listings initialize several items at once instead of one round trip after another.
+"""
+import asyncio
+from collections import deque
+from contextlib import aclosing
+from contextvars import ContextVar
+from typing import AsyncGenerator, AsyncIterable, AsyncIterator, Awaitable, Callable, Iterable, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+_scope: ContextVar[set[asyncio.Task] | None] = ContextVar("phub_task_scope", default=None)
+
+
+def track_task():
+    """
+    Adds the current task to the scope of the cancel_on_exit() it was (indirectly) created in.
+    Called at the start of every page / video coroutine the iterator of base_api schedules.
+    """
+    tasks = _scope.get()
+    task = asyncio.current_task()
+    if tasks is not None and task is not None and not task.done():
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+
+async def cancel_tasks(tasks: Iterable[asyncio.Future]):
+    """Cancels the tasks and waits until they are actually gone"""
+    tasks = [task for task in tasks if not task.done()]
+    for task in tasks:
+        task.cancel()
+
+    if tasks:
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def cancel_on_exit(generator: AsyncGenerator[T, None]) -> AsyncGenerator[T, None]:
+    """
+    Yields from the generator. Tasks that it creates (and that call track_task()) are cancelled once the
+    iteration stops, so a consumer that breaks out early doesn't leave page fetches running in the background.
+    """
+    tasks: set[asyncio.Task] = set()
+
+    async def step(advance: Callable[[], Awaitable[T]]) -> T:
+        # Only set while the generator actually runs, so interleaved iterations don't mix up their tasks
+        token = _scope.set(tasks)
+        try:
+            return await advance()
+
+        finally:
+            _scope.reset(token)
+
+    try:
+        while True:
+            try:
+                item = await step(generator.__anext__)
+
+            except StopAsyncIteration:
+                return
+
+            yield item
+
+    finally:
+        try:
+            await step(generator.aclose)
+
+        finally:
+            await cancel_tasks(list(tasks))
+
+
+async def bounded_map(items: Iterable[T], func: Callable[[T], Awaitable[R]], ahead: int = 5,
+                      return_exceptions: bool = False) -> AsyncGenerator[R | BaseException, None]:
+    """
+    Yields func(item) for every item, in order. At most `ahead` calls run before the consumer has taken their
+    result, the next one only starts after the consumer asked for more. Leftover calls are cancelled on exit.
+    :param return_exceptions: Yield exceptions as results instead of raising them (like asyncio.gather)
+    """
+    if ahead < 1:
+        raise ValueError("ahead must be >= 1")
+
+    iterator = iter(items)
+    pending: deque[asyncio.Future] = deque()
+
+    def fill():
+        while len(pending) < ahead:
+            try:
+                item = next(iterator)
+
+            except StopIteration:
+                return
+
+            pending.append(asyncio.ensure_future(func(item)))
+
+    try:
+        fill()
+        while pending:
+            task = pending.popleft()
+            try:
+                result = await task
+
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+
+                result = e
+
+            yield result
+            fill()
+
+    finally:
+        await cancel_tasks(pending)
+
+
+async def hydration_stage(items: AsyncIterable[T] | Iterable[T], hydrate: Callable[[T], Awaitable[R]], concurrency: int = 5,
+                          ordered: bool = True) -> AsyncGenerator[R, None]:
+    """
+    Runs hydrate(item) (usually item.init()) for the items of a listing with up to `concurrency` calls at once,
+    instead of one round trip after another.
+
+    :param ordered: Yield in listing order (a slow item holds back the ones after it),
+                    or as the calls complete (fastest, but the order changes)
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be >= 1")
+
+    source = aiter(items) if isinstance(items, AsyncIterable) else _as_async(items)
+    stage = _ordered_stage if ordered else _unordered_stage
+    async with aclosing(stage(source, hydrate, concurrency)) as results: # Closing this closes the stage right away
+        async for result in results:
+            yield result
+
+
+async def _as_async(items: Iterable[T]) -> AsyncGenerator[T, None]:
+    for item in items:
+        yield item
+
+
+async def _ordered_stage(source: AsyncIterator[T], hydrate: Callable[[T], Awaitable[R]], concurrency: int) -> AsyncGenerator[R, None]:
+    pending: deque[asyncio.Future] = deque()
+    exhausted = False
+    try:
+        while True:
+            while not exhausted and len(pending) < concurrency:
+                try:
+                    item = await anext(source)
+
+                except StopAsyncIteration:
+                    exhausted = True
+                    break
+
+                pending.append(asyncio.ensure_future(hydrate(item)))
+
+            if not pending:
+                return
+
+            yield await pending.popleft()
+
+    finally:
+        await cancel_tasks(pending)
+        if hasattr(source, "aclose"):
+            await source.aclose()
+
+
+async def _unordered_stage(source: AsyncIterator[T], hydrate: Callable[[T], Awaitable[R]], concurrency: int) -> AsyncGenerator[R, None]:
+    end = object()
+
+    async def pull():
+        try:
+            return await anext(source)
+
+        except StopAsyncIteration:
+            return end
+
+    running: set[asyncio.Future] = set()
+    next_item: asyncio.Future | None = None
+    exhausted = False
+    try:
+        while True:
+            # Keep pulling from the listing while calls are running, so neither waits for the other
+            if next_item is None and not exhausted and len(running) < concurrency:
+                next_item = asyncio.ensure_future(pull())
+
+            waiting = running | ({next_item} if next_item is not None else set())
+            if not waiting:
+                return
+
+            done, _ = await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+            if next_item is not None and next_item in done:
+                pulled, next_item = next_item, None
+                done.discard(pulled)
+                item = pulled.result()
+                if item is end:
+                    exhausted = True
+
+                else:
+                    running.add(asyncio.ensure_future(hydrate(item)))
+
+            for task in done:
+                running.discard(task)
+                yield task.result()
+
+    finally:
+        await cancel_tasks([*running, *([next_item] if next_item is not None else [])])
+        if hasattr(source, "aclose"):
+            await source.aclose()
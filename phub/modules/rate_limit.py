@@ -0,0 +1,194 @@
+"""
+Per-host rate limiting (token buckets), for requests per second and bytes per second.
+
+The HTML pages, the Webmaster API and the CDN (m3u8 playlists and segments) have very different tolerance,
+so every host (pattern) gets its own budget:
+
+    client = Client(rate_limits=RateLimiter({
+        "www.pornhub.com": HostLimit(requests_per_second=4, burst=8),
+        "*.phncdn.com": HostLimit(bytes_per_second=20 * 1024 * 1024),
+    }))
+
+Rules are fnmatch patterns on the host name and the first match wins. All hosts matching the same pattern share
+its buckets. Hosts without a rule use `default` (one bucket per host), or aren't limited if that is None.
+
+The byte bucket is paid after the response arrived (the size isn't known before), so a large response puts
+the bucket into debt and the next request to that host waits until it's paid off.
+"""
+import time
+import asyncio
+from fnmatch import fnmatch
+from typing import Any, Awaitable, Callable
+from urllib.parse import urlsplit
+from .registry import CoreRegistry
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float | None = None, clock: Callable[[], float] = time.monotonic):
+        """
+        :param rate: Tokens added per second
+        :param capacity: Max tokens (the burst), defaults to one second worth of tokens
+        """
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self.tokens = self.capacity
+        self.clock = clock
+        self.updated = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, amount: float) -> float:
+        """Seconds until `amount` tokens are available"""
+        self._refill()
+        missing = min(amount, self.capacity) - self.tokens
+        return max(0.0, missing / self.rate)
+
+    def take(self, amount: float):
+        """Takes tokens, going into debt if there aren't enough"""
+        self._refill()
+        self.tokens -= amount
+
+
+class HostLimit:
+    def __init__(self, requests_per_second: float | None = None, bytes_per_second: float | None = None,
+                 burst: float | None = None, bytes_burst: float | None = None):
+        """
+        :param requests_per_second: Max requests per second (Default: unlimited)
+        :param bytes_per_second: Max downloaded bytes per second (Default: unlimited)
+        :param burst: Requests that may be sent at once before the rate applies (Default: one second worth)
+        :param bytes_burst: Same for bytes
+        """
+        self.requests_per_second = requests_per_second
+        self.bytes_per_second = bytes_per_second
+        self.burst = burst
+        self.bytes_burst = bytes_burst
+
+    def buckets(self, clock: Callable[[], float]) -> tuple[TokenBucket | None, TokenBucket | None]:
+        requests = TokenBucket(self.requests_per_second, self.burst, clock) if self.requests_per_second else None
+        data = TokenBucket(self.bytes_per_second, self.bytes_burst, clock) if self.bytes_per_second else None
+        return requests, data
+
+    def __repr__(self) -> str:
+        return f"HostLimit(requests_per_second={self.requests_per_second}, bytes_per_second={self.bytes_per_second})"
+
+
+class _Budget:
+    def __init__(self, limit: HostLimit, clock: Callable[[], float]):
+        self.requests, self.data = limit.buckets(clock)
+        self.lock = asyncio.Lock()
+        self.count = 0
+        self.bytes = 0
+        self.waits = 0
+        self.waited = 0.0
+
+
+def host_of(url: str) -> str:
+    return (urlsplit(url).hostname or "").lower()
+
+
+class RateLimiter:
+    def __init__(self, rules: dict[str, HostLimit] | None = None, default: HostLimit | None = None):
+        """
+        :param rules: Host pattern -> HostLimit, e.g. {"*.phncdn.com": HostLimit(bytes_per_second=10e6)}
+        :param default: The limit for every host that doesn't match a rule (Default: unlimited)
+        """
+        self.rules = dict(rules or {})
+        self.default = default
+        self.clock = time.monotonic
+        self.sleep: Callable[[float], Awaitable] = asyncio.sleep
+        self._budgets: dict[str, _Budget] = {}
+
+    def _budget(self, url: str) -> _Budget | None:
+        host = host_of(url)
+        key, limit = next(((pattern, limit) for pattern, limit in self.rules.items() if fnmatch(host, pattern)),
+                          (host, self.default))
+        if limit is None:
+            return None
+
+        budget = self._budgets.get(key)
+        if budget is None:
+            budget = self._budgets[key] = _Budget(limit, self.clock)
+
+        return budget
+
+    async def acquire(self, url: str):
+        """Waits until a request to the host of the URL is allowed"""
+        budget = self._budget(url)
+        if budget is None:
+            return
+
+        async with budget.lock: # Waiters go one after another, so nobody gets starved
+            while True:
+                wait = max(budget.requests.delay(1) if budget.requests else 0.0,
+                           budget.data.delay(0) if budget.data else 0.0)
+                if wait <= 0:
+                    break
+
+                budget.waits += 1
+                budget.waited += wait
+                await self.sleep(wait)
+
+            if budget.requests:
+                budget.requests.take(1)
+
+            budget.count += 1
+
+    def consume(self, url: str, size: int):
+        """Pays for `size` downloaded bytes"""
+        budget = self._budget(url)
+        if budget is None:
+            return
+
+        budget.bytes += size
+        if budget.data:
+            budget.data.take(size)
+
+    def stats(self) -> dict[str, dict]:
+        return {key: {"requests": budget.count, "bytes": budget.bytes, "waits": budget.waits, "waited": budget.waited}
+                for key, budget in self._budgets.items()}
+
+    def __repr__(self) -> str:
+        return f"RateLimiter(rules={list(self.rules)}, default={self.default})"
+
+
+def response_size(result: Any) -> int:
+    if isinstance(result, (str, bytes)):
+        return len(result) # Close enough for text, the encoding doesn't matter for the budget
+
+    content = getattr(result, "content", None)
+    return len(content) if isinstance(content, (bytes, str)) else 0
+
+
+_limiters: CoreRegistry[RateLimiter] = CoreRegistry()
+
+
+def get_rate_limiter(core) -> RateLimiter | None:
+    return _limiters.get(core)
+
+
+def set_rate_limiter(core, limiter: RateLimiter | None):
+    """
+    Limits every request of the core. core.fetch gets wrapped once, because the m3u8 playlists and
+    segments of a download are fetched by BaseCore itself and never go through PHUB.
+    """
+    _limiters.set(core, limiter)
+    if limiter is None or getattr(core.fetch, "rate_limited", False):
+        return
+
+    fetch = core.fetch
+
+    async def rate_limited_fetch(url: str, *args, **kwargs):
+        current = get_rate_limiter(core)
+        if current is None:
+            return await fetch(url, *args, **kwargs)
+
+        await current.acquire(url)
+        result = await fetch(url, *args, **kwargs)
+        current.consume(url, response_size(result))
+        return result
+
+    rate_limited_fetch.rate_limited = True
+    core.fetch = rate_limited_fetch
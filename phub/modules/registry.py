@@ -0,0 +1,51 @@
+"""
+Per-core state (rate limiter, session pool, identity map, ...) that lives outside of the core.
+
+Every registry holds the cores weakly, so the state goes away with its core. Cores that can't be weakly
+referenced (e.g. SimpleNamespace in tests) never have anything registered: get() returns None and
+setdefault() hands out a fresh value every time.
+"""
+import weakref
+from typing import Any, Callable, Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class CoreRegistry(Generic[T]):
+    def __init__(self):
+        self._values: "weakref.WeakKeyDictionary[Any, T]" = weakref.WeakKeyDictionary()
+
+    def get(self, core) -> T | None:
+        try:
+            return self._values.get(core)
+
+        except TypeError:
+            return None # Cores that can't be weakly referenced never have one
+
+    def set(self, core, value: T | None):
+        """Registers value for the core, None removes it"""
+        if value is None:
+            try:
+                self._values.pop(core, None)
+
+            except TypeError:
+                pass
+
+        else:
+            self._values[core] = value
+
+    def setdefault(self, core, factory: Callable[[], T]) -> T:
+        """The value of the core, created with factory() the first time"""
+        value = self.get(core)
+        if value is None:
+            value = factory()
+            try:
+                self._values[core] = value
+
+            except TypeError:
+                pass # Not shared, but still usable
+
+        return value
+
+    def __repr__(self) -> str:
+        return f"CoreRegistry(cores={len(self._values)})"
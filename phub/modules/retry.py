@@ -0,0 +1,294 @@
+"""
+Retries with backoff and a circuit breaker, so a short outage doesn't turn into a retry storm.
+
+RetryPolicy is an on_video_error / on_page_error hook. It decides by error class how often a URL is tried,
+waits (exponential backoff with full jitter, or the Retry-After of the response) and gives up after that:
+
+    policy = RetryPolicy(attempts={NetworkingError: 8}, base_delay=1.0)
+    client = Client(retry_policy=policy) # Used by every listing that doesn't get its own hooks
+    async for video in client.search("x", on_page_error=policy): ...
+
+The CircuitBreaker pauses all requests of a client once the site is clearly unhappy (the bot protection, or
+`threshold` network errors within `window` seconds). After the cooldown, one request probes the site.
+If it works everything resumes, otherwise the breaker opens again with twice the cooldown.
+"""
+import time
+import random
+import asyncio
+from collections import deque
+from typing import Any, Literal
+
+from base_api.modules.errors import (BotProtectionDetected, InvalidProxy, ProxySSLError, NetworkingError, UnknownError,
+                                     ResourceGone)
+from .errors import NotFound, NetworkError, BotDetection, ProxyError
+from .session_pool import classify_failure
+from .registry import CoreRegistry
+
+# Max attempts (the first one included) per error class, the most specific class of an error wins
+DEFAULT_ATTEMPTS: dict[type[BaseException], int] = {
+    ResourceGone: 1, # 404 / 410, never comes back
+    NotFound: 1,
+    InvalidProxy: 1, # The session pool already fails over to other proxies
+    ProxySSLError: 1,
+    ProxyError: 1,
+    BotProtectionDetected: 2, # The circuit breaker does the waiting
+    BotDetection: 2,
+    NetworkingError: 5,
+    NetworkError: 5,
+    UnknownError: 3,
+}
+
+
+def retry_after(error: BaseException) -> float | None:
+    """Seconds from the Retry-After header of the response that came with the error (if any)"""
+    response = getattr(error, "response", None)
+    value = getattr(response, "headers", {}).get("Retry-After") if response is not None else None
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+
+    except ValueError:
+        from email.utils import parsedate_to_datetime
+        try:
+            date = parsedate_to_datetime(value)
+            return max(0.0, (date - date.now(date.tzinfo)).total_seconds())
+
+        except (TypeError, ValueError):
+            return None
+
+
+class RetryPolicy:
+    def __init__(self, attempts: dict[type[BaseException], int] | None = None, default_attempts: int = 3,
+                 base_delay: float = 0.5, max_delay: float = 30.0, jitter: bool = True, max_retry_after: float = 120.0):
+        """
+        :param attempts: Max attempts per error class, on top of DEFAULT_ATTEMPTS
+        :param default_attempts: Max attempts for errors without an entry
+        :param base_delay: Delay before the first retry, doubled for every further one
+        :param max_delay: Longest backoff in seconds
+        :param jitter: Waits a random time between 0 and the backoff (full jitter), so failed requests don't retry in lockstep
+        :param max_retry_after: Longest Retry-After that is honoured, longer ones are cut to this
+        """
+        self.attempts = {**DEFAULT_ATTEMPTS, **(attempts or {})}
+        self.default_attempts = default_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.max_retry_after = max_retry_after
+        self.random = random.random
+        self.sleep = asyncio.sleep
+        self.retries = 0
+        self.gave_up = 0
+        self.decisions: deque[dict] = deque(maxlen=100)
+
+    def max_attempts(self, error: BaseException) -> int:
+        for cls in type(error).__mro__:
+            if cls in self.attempts:
+                return self.attempts[cls]
+
+        return self.default_attempts
+
+    def delay(self, error: BaseException, attempt: int) -> float:
+        """Seconds to wait before the retry after the attempt-th failure"""
+        after = retry_after(error)
+        if after is not None:
+            return min(after, self.max_retry_after)
+
+        backoff = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return backoff * self.random() if self.jitter else backoff
+
+    async def __call__(self, url: str, error: Exception, attempt: int) -> bool:
+        """The on_error hook: waits and returns True if the URL should be tried again"""
+        if attempt >= self.max_attempts(error):
+            self.gave_up += 1
+            self.decisions.append({"url": url, "error": type(error).__name__, "attempt": attempt, "retry": False})
+            return False
+
+        delay = self.delay(error, attempt)
+        self.retries += 1
+        self.decisions.append({"url": url, "error": type(error).__name__, "attempt": attempt, "retry": True, "delay": round(delay, 3)})
+        await self.sleep(delay)
+        return True
+
+    def stats(self) -> dict:
+        return {"retries": self.retries, "gave_up": self.gave_up}
+
+    def __repr__(self) -> str:
+        return f"RetryPolicy(default_attempts={self.default_attempts}, base_delay={self.base_delay}, max_delay={self.max_delay})"
+
+
+def failure_kind(result: Any = None, error: BaseException | None = None) -> str:
+    """bot, proxy, network (the site or the link is in trouble) or other, like classify_failure() but for responses too"""
+    if error is not None:
+        kind = classify_failure(error)
+        if kind != "other":
+            return kind
+
+        result = getattr(error, "response", None) # raise_for_status() of the last response
+
+    status = getattr(result, "status_code", 200) or 200
+    return "network" if status == 429 or status >= 500 else "other"
+
+
+State = Literal["closed", "open", "half_open"]
+
+
+class CircuitBreaker:
+    def __init__(self, threshold: int = 5, window: float = 10.0, cooldown: float = 15.0, max_cooldown: float = 300.0,
+                 trip_on_bot: bool = True):
+        """
+        :param threshold: Network / proxy errors within `window` seconds that open the breaker (0 = never)
+        :param window: See threshold
+        :param cooldown: Seconds all requests wait once the breaker opened, doubled every time the probe fails
+        :param max_cooldown: Longest cooldown in seconds
+        :param trip_on_bot: Opens right away when the bot protection shows up (if threshold isn't 0)
+        """
+        self.threshold = threshold
+        self.window = window
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.trip_on_bot = trip_on_bot
+        self.clock = time.monotonic
+        self.sleep = asyncio.sleep
+        self.state: State = "closed"
+        self.open_until = 0.0
+        self.trips = 0
+        self.failed_probes = 0
+        self.paused = 0 # Requests that had to wait
+        self._failures: deque[float] = deque()
+        self._changed = asyncio.Event()
+
+    def _notify(self):
+        # Wakes everything waiting for the state to change. A new event for the next change.
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def _open(self):
+        cooldown = min(self.cooldown * 2 ** self.failed_probes, self.max_cooldown)
+        self.state = "open"
+        self.open_until = self.clock() + cooldown
+        self._failures.clear()
+        self._notify()
+
+    async def wait(self) -> bool:
+        """Blocks while the breaker is open. Returns True if the caller is the probe and has to report back."""
+        waited = False
+        while True:
+            if self.state == "closed":
+                return False
+
+            if not waited:
+                waited = True
+                self.paused += 1
+
+            if self.state == "open":
+                remaining = self.open_until - self.clock()
+                if remaining > 0:
+                    await self.sleep(remaining)
+                    continue
+
+                self.state = "half_open"
+                return True
+
+            await self._changed.wait() # A probe is running
+
+    def record_success(self, probe: bool = False):
+        if probe and self.state == "half_open":
+            self.state = "closed"
+            self.failed_probes = 0
+            self._notify()
+
+    def record_failure(self, kind: str, probe: bool = False):
+        if probe and self.state == "half_open":
+            if kind == "other":
+                self.record_success(probe) # The site answered, the request itself was the problem
+                return
+
+            self.failed_probes += 1
+            self._open()
+            return
+
+        if self.state != "closed" or kind == "other" or not self.threshold:
+            return
+
+        now = self.clock()
+        self._failures.append(now)
+        while self._failures and self._failures[0] < now - self.window:
+            self._failures.popleft()
+
+        if (kind == "bot" and self.trip_on_bot) or len(self._failures) >= self.threshold:
+            self.trips += 1
+            self._open()
+
+    def abandon_probe(self):
+        """The probe got cancelled before it had a result, the next waiting request probes instead"""
+        if self.state == "half_open":
+            self.state = "open"
+            self.open_until = self.clock()
+            self._notify()
+
+    def stats(self) -> dict:
+        return {"state": self.state, "trips": self.trips, "failed_probes": self.failed_probes, "paused": self.paused,
+                "open_for": max(0.0, round(self.open_until - self.clock(), 1)) if self.state == "open" else 0.0}
+
+    def __repr__(self) -> str:
+        return f"CircuitBreaker(state={self.state!r}, threshold={self.threshold}, cooldown={self.cooldown})"
+
+
+_policies: CoreRegistry[RetryPolicy] = CoreRegistry()
+_breakers: CoreRegistry[CircuitBreaker] = CoreRegistry()
+
+
+def set_retry_policy(core, policy: RetryPolicy | None):
+    _policies.set(core, policy)
+
+
+def get_retry_policy(core) -> RetryPolicy | None:
+    return _policies.get(core)
+
+
+def get_circuit_breaker(core) -> CircuitBreaker | None:
+    return _breakers.get(core)
+
+
+def set_circuit_breaker(core, breaker: CircuitBreaker | None):
+    """
+    Guards every request of the core. Like set_rate_limiter(), core.fetch gets wrapped once. Set the breaker
+    after the rate limiter, so requests that wait for the breaker don't hold rate limit tokens.
+    """
+    _breakers.set(core, breaker)
+    if breaker is None or getattr(core.fetch, "guarded", False):
+        return
+
+    fetch = core.fetch
+
+    async def guarded_fetch(url: str, *args, **kwargs):
+        current = get_circuit_breaker(core)
+        if current is None:
+            return await fetch(url, *args, **kwargs)
+
+        probe = await current.wait()
+        try:
+            result = await fetch(url, *args, **kwargs)
+
+        except Exception as e:
+            current.record_failure(failure_kind(error=e), probe)
+            raise
+
+        except BaseException:
+            if probe:
+                current.abandon_probe()
+            raise
+
+        kind = failure_kind(result)
+        if kind == "other":
+            current.record_success(probe)
+
+        else:
+            current.record_failure(kind, probe)
+
+        return result
+
+    guarded_fetch.guarded = True
+    core.fetch = guarded_fetch
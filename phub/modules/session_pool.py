@@ -0,0 +1,232 @@
+"""
+A pool of HTTP sessions, each optionally behind its own proxy, so a crawl isn't limited to one connection pool
+and one egress identity:
+
+    client = Client(sessions=SessionPool(proxies=[None, "http://10.0.0.2:3128", "socks5://10.0.0.3:1080"]))
+    client.sessions.stats()
+
+Every request goes to the healthiest session that isn't quarantined. Health is the recent latency, scaled up by
+the recent error and bot protection rates and by the requests the session already has in flight.
+
+A session that hits the bot protection or a proxy error is quarantined right away, one with `max_errors`
+errors in a row as well. The quarantine doubles with every strike (up to `max_quarantine`) and a success
+resets the strikes. Requests that fail with a connection or proxy error are retried on another session,
+so one dead proxy doesn't kill the crawl.
+
+Only plain GET requests are spread over the pool. Everything with a body or explicit cookies (the login, votes,
+...) uses the session of the client, whose cookies are copied to the pool after the login.
+"""
+import copy
+import time
+from typing import Any, Callable
+
+from base_api.modules.errors import BotProtectionDetected, InvalidProxy, ProxySSLError, NetworkingError, UnknownError
+from .registry import CoreRegistry
+
+
+class PooledSession:
+    def __init__(self, core, proxy: str | None = None):
+        self.core = core
+        self.proxy = proxy
+        self.requests = 0
+        self.errors = 0
+        self.bot_detections = 0
+        self.latency = 1.0 # EWMA, seconds
+        self.error_rate = 0.0 # EWMA
+        self.bot_rate = 0.0 # EWMA
+        self.in_flight = 0
+        self.errors_in_row = 0
+        self.strikes = 0
+        self.quarantined_until = 0.0
+
+    def score(self) -> float:
+        """Lower is healthier"""
+        return self.latency * (1 + self.in_flight) * (1 + 5 * self.error_rate + 20 * self.bot_rate)
+
+    def as_dict(self, now: float) -> dict:
+        return {"proxy": self.proxy, "requests": self.requests, "errors": self.errors, "bot_detections": self.bot_detections,
+                "latency": round(self.latency, 3), "error_rate": round(self.error_rate, 3), "score": round(self.score(), 3),
+                "quarantined": max(0.0, round(self.quarantined_until - now, 1))}
+
+    def __repr__(self) -> str:
+        return f"PooledSession(proxy={self.proxy!r}, score={self.score():.3f})"
+
+
+def classify_failure(error: BaseException) -> str:
+    """bot, proxy, network (worth another session) or other (the request itself is the problem)"""
+    if isinstance(error, BotProtectionDetected):
+        return "bot"
+
+    if isinstance(error, (InvalidProxy, ProxySSLError)) or "proxy" in str(error).lower():
+        return "proxy"
+
+    if isinstance(error, (NetworkingError, UnknownError, ConnectionError, TimeoutError)) or type(error).__name__ == "RequestsError":
+        return "network"
+
+    return "other"
+
+
+class SessionPool:
+    def __init__(self, size: int | None = None, proxies: list[str | None] | None = None, max_errors: int = 3,
+                 quarantine: float = 30.0, max_quarantine: float = 600.0, failover: int = 2, smoothing: float = 0.2):
+        """
+        :param size: Number of sessions (Default: one per proxy, or 4 without proxies)
+        :param proxies: Proxy URLs the sessions are bound to (round robin), None for a direct connection
+        :param max_errors: Errors in a row that quarantine a session
+        :param quarantine: First quarantine in seconds, doubled with every strike
+        :param max_quarantine: Longest quarantine in seconds
+        :param failover: How many other sessions a request that failed on its connection is retried on
+        :param smoothing: Weight of the newest request in the latency and error rates (EWMA)
+        """
+        self.proxies = list(proxies) if proxies else [None]
+        self.size = size or (len(proxies) if proxies else 4)
+        self.max_errors = max_errors
+        self.quarantine = quarantine
+        self.max_quarantine = max_quarantine
+        self.failover = failover
+        self.smoothing = smoothing
+        self.clock = time.monotonic
+        self.sessions: list[PooledSession] = []
+        self.failovers = 0
+
+    def open(self, core, headers: dict | None = None, cookies: dict | None = None, factory: Callable[[Any], Any] | None = None):
+        """
+        Creates the sessions: a copy of the core per session, with its own configuration (proxy) and session.
+        :param factory: Builds the core of a session from its configuration (Default: the class of `core`)
+        """
+        factory = factory or type(core)
+        self.sessions = []
+        for index in range(self.size):
+            proxy = self.proxies[index % len(self.proxies)]
+            configuration = copy.copy(core.configuration)
+            configuration.proxies = {"http": proxy, "https": proxy} if proxy else core.configuration.proxies
+            member = factory(configuration)
+            member.initialize_session()
+            member.session.headers.update(headers or {})
+            member.session.cookies.update(cookies or {})
+            self.sessions.append(PooledSession(member, proxy))
+
+    def share_cookies(self, cookies):
+        """Copies cookies (e.g. of the login) into every session"""
+        for session in self.sessions:
+            session.core.session.cookies.update(cookies)
+
+    def available(self) -> list[PooledSession]:
+        now = self.clock()
+        healthy = [session for session in self.sessions if session.quarantined_until <= now]
+        # Everything quarantined: the session that comes back first is still better than failing
+        return healthy or [min(self.sessions, key=lambda session: session.quarantined_until)]
+
+    def choose(self, exclude: tuple[PooledSession, ...] = ()) -> PooledSession:
+        candidates = [session for session in self.available() if session not in exclude] or self.available()
+        return min(candidates, key=PooledSession.score)
+
+    def _update(self, session: PooledSession, latency: float | None, error: bool, bot: bool):
+        alpha = self.smoothing
+        session.requests += 1
+        if latency is not None:
+            session.latency += alpha * (latency - session.latency)
+
+        session.error_rate += alpha * (float(error) - session.error_rate)
+        session.bot_rate += alpha * (float(bot) - session.bot_rate)
+
+    def record_success(self, session: PooledSession, latency: float):
+        self._update(session, latency, error=False, bot=False)
+        session.errors_in_row = 0
+        session.strikes = 0
+
+    def record_failure(self, session: PooledSession, kind: str):
+        self._update(session, None, error=True, bot=kind == "bot")
+        session.errors += 1
+        session.errors_in_row += 1
+        if kind == "bot":
+            session.bot_detections += 1
+
+        if kind in ("bot", "proxy") or session.errors_in_row >= self.max_errors:
+            session.strikes += 1
+            session.errors_in_row = 0
+            session.quarantined_until = self.clock() + min(self.quarantine * 2 ** (session.strikes - 1), self.max_quarantine)
+
+    async def fetch(self, url: str, *args, **kwargs):
+        tried: tuple[PooledSession, ...] = ()
+        while True:
+            session = self.choose(exclude=tried)
+            tried += (session,)
+            session.in_flight += 1
+            started = self.clock()
+            try:
+                result = await session.core.fetch(url, *args, **kwargs)
+
+            except Exception as e:
+                kind = classify_failure(e)
+                if kind == "other":
+                    self._update(session, self.clock() - started, error=False, bot=False) # Not the session's fault
+                    raise
+
+                self.record_failure(session, kind)
+                if len(tried) > self.failover or len(tried) >= len(self.sessions):
+                    raise
+
+                self.failovers += 1
+                continue
+
+            finally:
+                session.in_flight -= 1
+
+            status = getattr(result, "status_code", 200)
+            if status == 429 or status >= 500:
+                self.record_failure(session, "network")
+
+            else:
+                self.record_success(session, self.clock() - started)
+
+            return result
+
+    def stats(self) -> dict:
+        now = self.clock()
+        return {"failovers": self.failovers, "sessions": [session.as_dict(now) for session in self.sessions]}
+
+    def __repr__(self) -> str:
+        return f"SessionPool(size={self.size}, proxies={len([proxy for proxy in self.proxies if proxy])})"
+
+
+def pooled_request(kwargs: dict) -> bool:
+    """Whether a request can go to any session of the pool (stateless GET)"""
+    return kwargs.get("method", "GET").upper() == "GET" and not any(kwargs.get(name) for name in ("cookies", "data", "json_data"))
+
+
+_pools: CoreRegistry[SessionPool] = CoreRegistry()
+
+
+def get_session_pool(core) -> SessionPool | None:
+    return _pools.get(core)
+
+
+def set_session_pool(core, pool: SessionPool | None, headers: dict | None = None, cookies: dict | None = None):
+    """
+    Spreads the requests of the core over the sessions of the pool. Like set_rate_limiter(), core.fetch gets
+    wrapped once, so the downloads BaseCore does itself are spread too. Set the pool before the rate limiter,
+    otherwise the pooled requests skip the rate limits.
+    """
+    if pool is None:
+        _pools.set(core, None)
+        return
+
+    if not pool.sessions:
+        pool.open(core, headers=headers, cookies=cookies)
+
+    _pools.set(core, pool)
+    if getattr(core.fetch, "pooled", False):
+        return
+
+    fetch = core.fetch
+
+    async def pooled_fetch(url: str, *args, **kwargs):
+        current = get_session_pool(core)
+        if current is None or args or not pooled_request(kwargs):
+            return await fetch(url, *args, **kwargs)
+
+        return await current.fetch(url, **kwargs)
+
+    pooled_fetch.pooled = True
+    core.fetch = pooled_fetch
@@ -0,0 +1,133 @@
+"""
+Keeps login sessions on disk, so a (worker) process doesn't have to log in again every time it starts:
+
+    client = Client(email=..., password=..., session_store=SessionStore("session.json", secret="passphrase"))
+    await client.login() # Restored from the file, no request. Logs in (and saves) if there is nothing to restore
+
+The store holds the cookies of the session and the Account data of the login. A restored session is trusted
+until the first request that needs the login, which checks it once and logs in again if it has expired.
+
+With a secret the file is encrypted (Fernet, needs `cryptography`), otherwise it's plain JSON. Either way
+it is written with 0600 permissions, because the cookies are as good as the password.
+"""
+import os
+import json
+import time
+import base64
+import hashlib
+from typing import Any
+
+try:
+    from cryptography.fernet import Fernet, InvalidToken
+
+except (ModuleNotFoundError, ImportError):
+    Fernet = None # Only needed for encrypted stores
+    InvalidToken = ValueError
+
+
+def dump_cookies(cookies) -> list[dict]:
+    """The cookies of a session (curl_cffi Cookies or a plain dict) as JSON-able dicts"""
+    jar = getattr(cookies, "jar", None)
+    if jar is None:
+        return [{"name": name, "value": value} for name, value in dict(cookies).items()]
+
+    return [{"name": cookie.name, "value": cookie.value, "domain": cookie.domain, "path": cookie.path,
+             "expires": cookie.expires, "secure": cookie.secure} for cookie in jar]
+
+
+def load_cookies(cookies, items: list[dict], now: float | None = None):
+    """Puts dumped cookies back into a session, skipping expired ones"""
+    now = now if now is not None else time.time()
+    for item in items:
+        if item.get("expires") and item["expires"] < now:
+            continue
+
+        if hasattr(cookies, "jar"):
+            cookies.set(item["name"], item["value"], domain=item.get("domain") or "", path=item.get("path") or "/")
+
+        else:
+            cookies[item["name"]] = item["value"]
+
+
+class SessionStore:
+    def __init__(self, path: str = "phub_session.json", secret: str | bytes | None = None, max_age: float | None = 7 * 24 * 3600):
+        """
+        :param path: The file the session is kept in
+        :param secret: Encrypts the file with a key derived from this (needs `cryptography`)
+        :param max_age: Seconds after which a stored session isn't restored anymore (None = until it fails)
+        """
+        if secret is not None and Fernet is None:
+            raise ImportError("Encrypted session stores need the cryptography package (pip install cryptography)")
+
+        self.path = path
+        self.secret = secret.encode("utf-8") if isinstance(secret, str) else secret
+        self.max_age = max_age
+        self.clock = time.time
+
+    def _fernet(self, salt: bytes) -> Any:
+        key = hashlib.pbkdf2_hmac("sha256", self.secret, salt, 200_000)
+        return Fernet(base64.urlsafe_b64encode(key))
+
+    def _encode(self, state: dict) -> str:
+        data = json.dumps(state)
+        if self.secret is None:
+            return data
+
+        salt = os.urandom(16)
+        token = self._fernet(salt).encrypt(data.encode("utf-8"))
+        return json.dumps({"salt": base64.b64encode(salt).decode("ascii"), "data": token.decode("ascii")})
+
+    def _decode(self, content: str) -> dict | None:
+        document = json.loads(content)
+        if "salt" not in document:
+            return document if self.secret is None else None # Never trust a plain file when a secret is set
+
+        if self.secret is None:
+            return None
+
+        try:
+            data = self._fernet(base64.b64decode(document["salt"])).decrypt(document["data"].encode("ascii"))
+
+        except InvalidToken:
+            return None # Wrong secret
+
+        return json.loads(data)
+
+    def save(self, email: str | None, cookies, account: dict | None):
+        state = {"version": 1, "email": email, "saved_at": self.clock(), "cookies": dump_cookies(cookies), "account": account or {}}
+        temporary = f"{self.path}.tmp"
+        descriptor = os.open(temporary, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(descriptor, "w", encoding="utf-8") as file:
+            file.write(self._encode(state))
+
+        os.replace(temporary, self.path) # Atomic, a crash never leaves half a session behind
+
+    def load(self, email: str | None = None) -> dict | None:
+        """The stored session, or None if there is none (or it's too old, for another account or unreadable)"""
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                state = self._decode(file.read())
+
+        except (OSError, ValueError):
+            return None
+
+        if not state or state.get("version") != 1:
+            return None
+
+        if email is not None and state.get("email") != email:
+            return None
+
+        if self.max_age is not None and self.clock() - state.get("saved_at", 0) > self.max_age:
+            return None
+
+        return state
+
+    def clear(self):
+        try:
+            os.remove(self.path)
+
+        except FileNotFoundError:
+            pass
+
+    def __repr__(self) -> str:
+        return f"SessionStore(path={self.path!r}, encrypted={self.secret is not None})"
@@ -0,0 +1,103 @@
+"""
+Request coalescing ("single-flight"): concurrent callers asking for the same key share one in-flight call.
+
+The call runs as its own task, so a cancelled caller doesn't cancel the request for everyone else waiting on it.
+When the last caller waiting on it is cancelled, nobody needs the result anymore and the call is cancelled too.
+Once the call is done, the key is forgotten, so this is not a cache. The next caller fetches again.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from .registry import CoreRegistry
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+class SingleFlight:
+    def __init__(self):
+        self._calls: dict[Hashable, asyncio.Future] = {}
+        self._waiters: dict[asyncio.Future, int] = {} # Callers still waiting on each call
+        self.leaders = 0 # Calls that actually ran
+        self.coalesced = 0 # Calls that waited for another one instead
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """Runs func() unless a call for the same key is already in flight, in which case its result is shared"""
+        future = self._calls.get(key)
+        if future is not None and not future.done():
+            self.coalesced += 1
+            return await self._wait(key, future)
+
+        self.leaders += 1
+        future = asyncio.ensure_future(func())
+        self._calls[key] = future
+        self._waiters[future] = 0
+
+        def forget(_):
+            self._waiters.pop(future, None)
+            if self._calls.get(key) is future:
+                del self._calls[key]
+
+        future.add_done_callback(forget)
+        return await self._wait(key, future)
+
+    async def _wait(self, key: Hashable, future: asyncio.Future) -> Any:
+        self._waiters[future] += 1
+        try:
+            return await asyncio.shield(future)
+
+        finally:
+            if future in self._waiters:
+                self._waiters[future] -= 1
+                if not self._waiters[future] and not future.done():
+                    # The last caller was cancelled. Forget the call right away, so a new caller starts a fresh one
+                    # instead of joining a call that is being cancelled.
+                    del self._waiters[future]
+                    if self._calls.get(key) is future:
+                        del self._calls[key]
+                    future.cancel()
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    def stats(self) -> dict:
+        return {"leaders": self.leaders, "coalesced": self.coalesced, "in_flight": self.in_flight}
+
+    def __repr__(self) -> str:
+        return f"SingleFlight(leaders={self.leaders}, coalesced={self.coalesced}, in_flight={self.in_flight})"
+
+
+_flights: CoreRegistry[dict[str, SingleFlight]] = CoreRegistry()
+
+
+def single_flight(core, name: str) -> SingleFlight:
+    """The SingleFlight group called `name` of a core. Every core gets its own groups."""
+    groups = _flights.setdefault(core, dict)
+    if name not in groups:
+        groups[name] = SingleFlight()
+
+    return groups[name]
+
+
+def coalescing_stats(core) -> dict[str, dict]:
+    """Counters of all SingleFlight groups of a core, e.g. {"html": {"leaders": 10, "coalesced": 40, ...}}"""
+    return {name: group.stats() for name, group in (_flights.get(core) or {}).items()}
+
+
+def normalize_url(url: str) -> str:
+    """
+    Normalizes a URL for use as a request key: lowercase scheme and host, no default port,
+    no fragment and sorted query parameters. The path is left alone.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, parts.path or "/", query, ""))
+
+
+def request_key(url: str, method: str = "GET", params: dict | None = None) -> tuple:
+    return method.upper(), normalize_url(url), tuple(sorted((params or {}).items()))
@@ -0,0 +1,67 @@
+"""
+Caches the CSRF token (`token = "..."` in every page) per core, so the login, fix_recommendations() and the
+playlist chunks don't download the homepage every time they need it.
+
+The token lives for `ttl` seconds. Pages that were fetched anyway (e.g. a playlist) hand theirs in with offer(),
+and a request that got rejected because of the token calls invalidate(), so the next get() fetches a new one.
+Concurrent get() calls share one homepage download.
+"""
+import time
+from typing import Awaitable, Callable
+from .single_flight import SingleFlight
+from .registry import CoreRegistry
+
+
+class TokenCache:
+    def __init__(self, ttl: float = 1800):
+        """
+        :param ttl: Seconds a token is reused for before it's fetched again
+        """
+        self.ttl = ttl
+        self.clock = time.monotonic
+        self.token: str | None = None
+        self.stored_at = 0.0
+        self.fetches = 0
+        self.hits = 0
+        self._flight = SingleFlight()
+
+    @property
+    def fresh(self) -> bool:
+        return self.token is not None and self.clock() - self.stored_at < self.ttl
+
+    def offer(self, token: str | None):
+        """Stores a token that came with a page that was fetched anyway"""
+        if token:
+            self.token = token
+            self.stored_at = self.clock()
+
+    def invalidate(self):
+        self.token = None
+
+    async def get(self, fetch: Callable[[], Awaitable[str | None]]) -> str | None:
+        """The cached token, or fetch() one (None if the page had none)"""
+        if self.fresh:
+            self.hits += 1
+            return self.token
+
+        async def refresh() -> str | None:
+            self.fetches += 1
+            token = await fetch()
+            self.offer(token)
+            return token
+
+        return await self._flight.do("token", refresh)
+
+    def stats(self) -> dict:
+        return {"fetches": self.fetches, "hits": self.hits, "fresh": self.fresh}
+
+    def __repr__(self) -> str:
+        return f"TokenCache(ttl={self.ttl}, fetches={self.fetches}, hits={self.hits})"
+
+
+_caches: CoreRegistry[TokenCache] = CoreRegistry()
+
+
+def token_cache(core) -> TokenCache:
+    """The TokenCache of a core (the token belongs to the session, so every core has its own)"""
+    return _caches.setdefault(core, TokenCache)
@@ -0,0 +1,83 @@
+"""
+Opt-in "extract then release" mode for long crawls.
+
+Every object keeps the HTML of its page (often 500 KB - 1 MB) and the soup built from it for its whole lifetime.
+With a TrimPolicy on the configuration of the core, init() computes the listed (cached) properties right away
+and then drops the HTML and the soup:
+
+    core.configuration.trim_policy = TrimPolicy(fields={"Video": ["title", "views", "tags"], "Pornstar": ["bio"]})
+
+Touching anything that wasn't extracted afterwards raises ContentReleased. Call `await obj.refetch()` to
+download the page again (it's kept from then on).
+"""
+import gc
+import sys
+from functools import cached_property
+from typing import Any, Iterable
+
+
+class TrimPolicy:
+    def __init__(self, fields: dict[str, Iterable[str]] | Iterable[str]):
+        """
+        :param fields: Properties to extract before releasing, per class name ({"Video": [...], ...}), or one list for
+                       all classes (names that a class doesn't have are ignored). Classes not in the dict keep everything.
+        """
+        if isinstance(fields, dict):
+            self.fields = {kind: tuple(names) for kind, names in fields.items()}
+
+        else:
+            self.fields = {"*": tuple(fields)}
+
+    def fields_for(self, obj: Any) -> tuple[str, ...] | None:
+        """The fields to extract for obj, or None if obj shouldn't be trimmed"""
+        for cls in type(obj).__mro__:
+            if cls.__name__ in self.fields:
+                return self.fields[cls.__name__]
+
+        return self.fields.get("*")
+
+    def __repr__(self) -> str:
+        return f"TrimPolicy(fields={self.fields})"
+
+
+def get_trim_policy(core) -> TrimPolicy | None:
+    return getattr(core.configuration, "trim_policy", None)
+
+
+def is_cached_property(obj: Any, name: str) -> bool:
+    return any(isinstance(cls.__dict__.get(name), cached_property) for cls in type(obj).__mro__)
+
+
+def deep_sizeof(obj: Any) -> int:
+    """Approximate size of obj and everything it references (not counting classes, functions and modules)"""
+    seen = set()
+    pending = [obj]
+    size = 0
+    while pending:
+        current = pending.pop()
+        if id(current) in seen or isinstance(current, (type, type(sys), type(deep_sizeof))):
+            continue
+
+        seen.add(id(current))
+        size += sys.getsizeof(current)
+        pending.extend(gc.get_referents(current))
+
+    return size
+
+
+def retained_bytes(obj: Any) -> dict[str, int]:
+    """
+    Memory held by an object: its HTML, its soup and its cached properties (in bytes, approximately).
+    Meant for debugging memory usage of long crawls.
+    """
+    values = obj.__dict__
+    html_content = values.get("_html_content")
+    soup = values.get("_soup") or values.get("soup")
+    cached = sum(deep_sizeof(value) for name, value in values.items() if is_cached_property(obj, name) and value is not soup)
+    result = {
+        "html_content": sys.getsizeof(html_content) if html_content else 0,
+        "soup": deep_sizeof(soup) if soup is not None else 0,
+        "cached": cached,
+    }
+    result["total"] = sum(result.values())
+    return result
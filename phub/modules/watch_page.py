@@ -0,0 +1,145 @@
+"""
+Fast paths for the video watch page, so that a full BeautifulSoup tree of the (~1 MB) page isn't needed.
+
+- The flashvars object is located with an anchored search and its end is found by skipping over JSON strings and
+  counting braces, which stops right at the closing brace. It's decoded with orjson or msgspec if one of them is
+  installed and the standard json module otherwise.
+- Single elements (views, likes, categories, tags, author) are located with a regex and only their markup
+  is parsed with BeautifulSoup. The returned Tag behaves the same as the one from the full soup.
+"""
+from __future__ import annotations
+
+import re
+import json
+from functools import lru_cache
+from typing import TYPE_CHECKING
+from .backends import html_parser
+from .consts import REGEX_VIDEO_FLASHVARS
+
+if TYPE_CHECKING:
+    from bs4 import Tag
+
+try:
+    import orjson
+    fast_loads = orjson.loads
+
+except (ModuleNotFoundError, ImportError):
+    try:
+        import msgspec
+        fast_loads = msgspec.json.decode
+
+    except (ModuleNotFoundError, ImportError):
+        fast_loads = None
+
+
+REGEX_FLASHVARS_START = re.compile(r"var\s+flashvars_\d+\s*=\s*(?=\{)")
+# Either a complete JSON string (skipped as a whole) or a brace
+REGEX_JSON_TOKEN = re.compile(r'"(?:[^"\\]|\\.)*"|[{}]', re.DOTALL)
+
+
+def loads_json(text: str) -> dict:
+    if fast_loads is not None:
+        try:
+            return fast_loads(text)
+
+        except ValueError:
+            pass # e.g. raw control characters in strings, which only the lenient json module accepts
+
+    return json.loads(text, strict=False)
+
+
+def find_flashvars(html_content: str) -> str | None:
+    """Returns the source of the flashvars object, or None if the page doesn't have one"""
+    start = REGEX_FLASHVARS_START.search(html_content)
+    if start is None:
+        return None
+
+    depth = 0
+    for token in REGEX_JSON_TOKEN.finditer(html_content, start.end()):
+        char = token.group()
+        if char == "{":
+            depth += 1
+
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                return html_content[start.end():token.end()]
+
+    return None
+
+
+def parse_flashvars(html_content: str) -> dict:
+    stuff = find_flashvars(html_content)
+    if stuff is None:
+        # Fallback to the old regex
+        stuff = REGEX_VIDEO_FLASHVARS.search(html_content).group(1)
+
+    return loads_json(stuff)
+
+
+@lru_cache(maxsize=64)
+def _opening_tag(tag: str, class_token: str) -> re.Pattern:
+    return re.compile(rf"""<{tag}\b[^>]*?\bclass\s*=\s*["'][^"']*(?<![\w-]){re.escape(class_token)}(?![\w-])""", re.IGNORECASE)
+
+
+@lru_cache(maxsize=64)
+def _any_tag(tag: str) -> re.Pattern:
+    return re.compile(rf"<(/?){tag}\b[^>]*>", re.IGNORECASE)
+
+
+class WatchPage:
+    def __init__(self, html_content: str):
+        self.html_content = html_content
+
+    def _element_end(self, tag: str, start: int) -> int:
+        depth = 0
+        for match in _any_tag(tag).finditer(self.html_content, start):
+            depth += -1 if match.group(1) else 1
+            if depth == 0:
+                return match.end()
+
+        return len(self.html_content)
+
+    def find(self, tag: str, class_name: str) -> Tag | None:
+        """
+        Same as soup.find(tag, class_=class_name), but only the markup of the found element gets parsed
+        """
+        from bs4 import BeautifulSoup
+
+        for match in _opening_tag(tag, class_name.split()[0]).finditer(self.html_content):
+            fragment = self.html_content[match.start():self._element_end(tag, match.start())]
+            element = BeautifulSoup(fragment, html_parser()).find(tag, class_=class_name)
+            if element is not None:
+                return element
+
+        return None
+
+    @property
+    def views(self) -> str:
+        return self.find("div", "video-actions-menu ctasActionMenu").find("div", class_="views").find("span").text
+
+    @property
+    def publish_date(self) -> str:
+        return self.find("div", "video-actions-menu ctasActionMenu").find("div", class_="videoInfo").text
+
+    @property
+    def likes(self) -> str:
+        return self.find("span", "votesUp").text
+
+    @property
+    def categories(self) -> dict:
+        return {thing.text: thing.get("href") for thing in
+                self.find("div", "categoriesWrapper").find_all("a", class_="gtm-event-video-underplayer item")}
+
+    @property
+    def tags(self) -> dict:
+        return {thing.text: thing.get("href") for thing in
+                self.find("div", "tagsWrapper").find_all("a", class_="video_underplayer")}
+
+    @property
+    def author_url(self) -> str:
+        return f"https://www.pornhub.com{self.find('div', 'userAvatar').find('a').get('href')}"
+
+    @property
+    def author_thumbnail(self) -> str:
+        return self.find("div", "userAvatar").find("img").get("src")
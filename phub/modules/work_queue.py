@@ -0,0 +1,177 @@
+"""
+A durable work queue for long crawls, so a crawl that dies halfway (network drop, bot protection, OOM)
+continues where it stopped instead of starting from zero:
+
+    queue = WorkQueue("crawl.sqlite")
+    async for video in crawl_queue(client, queue, seeds=["https://www.pornhub.com/model/x"], pages="all"):
+        ...
+
+Every task (a page URL to fetch, a video to hydrate, a download) is a row with a state:
+
+    pending -> in_flight (leased) -> done
+                                  -> pending again on failure, until max_attempts -> failed
+
+A lease expires after `lease_seconds`, so tasks of a process that died go back to the other runners.
+Tasks are unique per (kind, key) and adding them again is a no-op, so completed pages are never fetched twice.
+"""
+import json
+import time
+import threading
+from typing import Iterable
+
+PENDING = "pending"
+IN_FLIGHT = "in_flight"
+DONE = "done"
+FAILED = "failed"
+
+
+class WorkTask:
+    __slots__ = ("id", "kind", "key", "payload", "attempts")
+
+    def __init__(self, id: int, kind: str, key: str, payload: dict, attempts: int):
+        self.id = id
+        self.kind = kind
+        self.key = key
+        self.payload = payload
+        self.attempts = attempts
+
+    def __repr__(self) -> str:
+        return f"WorkTask(kind={self.kind!r}, key={self.key!r}, attempts={self.attempts})"
+
+
+class WorkQueue:
+    def __init__(self, path: str = "phub_crawl.sqlite", max_attempts: int = 3, lease_seconds: float = 600):
+        """
+        :param path: The SQLite file (":memory:" works too, but then nothing survives a restart)
+        :param max_attempts: Failed tasks are retried until they failed that often
+        :param lease_seconds: A leased task goes back to pending if it isn't done or failed after that long
+        """
+        self.path = path
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+        self.clock = time.time
+        self.lock = threading.Lock()
+
+        import sqlite3 # Only loaded once a queue is opened
+
+        self.connection = sqlite3.connect(path, check_same_thread=False, timeout=30, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("""CREATE TABLE IF NOT EXISTS tasks (
+            id INTEGER PRIMARY KEY,
+            kind TEXT NOT NULL,
+            key TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            state TEXT NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            lease_until REAL,
+            error TEXT,
+            updated_at REAL NOT NULL,
+            UNIQUE (kind, key)
+        )""")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS tasks_state ON tasks (state, kind)")
+
+    def add(self, kind: str, key: str, payload: dict | None = None) -> bool:
+        """Adds a task, returns False if it already exists (in any state)"""
+        return self.add_many(kind, [(key, payload)]) == 1
+
+    def add_many(self, kind: str, tasks: Iterable[tuple[str, dict | None]]) -> int:
+        """Adds (key, payload) tasks in one transaction, returns how many were new"""
+        now = self.clock()
+        rows = [(kind, key, json.dumps(payload or {}), PENDING, now) for key, payload in tasks]
+        with self.lock:
+            before = self.connection.total_changes
+            self.connection.execute("BEGIN IMMEDIATE")
+            self.connection.executemany("INSERT OR IGNORE INTO tasks (kind, key, payload, state, updated_at) VALUES (?, ?, ?, ?, ?)", rows)
+            self.connection.execute("COMMIT")
+            return self.connection.total_changes - before
+
+    def lease(self, limit: int = 1, kinds: Iterable[str] | None = None, lease_seconds: float | None = None) -> list[WorkTask]:
+        """
+        Takes up to `limit` pending tasks (or in flight ones whose lease expired), oldest first.
+        BEGIN IMMEDIATE makes this safe when several processes share the file.
+        """
+        now = self.clock()
+        kinds = list(kinds) if kinds is not None else None
+        kind_filter = f" AND kind IN ({', '.join('?' * len(kinds))})" if kinds else ""
+        with self.lock:
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self.connection.execute(
+                    f"SELECT id, kind, key, payload, attempts FROM tasks "
+                    f"WHERE (state = ? OR (state = ? AND lease_until < ?)){kind_filter} ORDER BY id LIMIT ?",
+                    (PENDING, IN_FLIGHT, now, *(kinds or []), limit)).fetchall()
+                until = now + (lease_seconds if lease_seconds is not None else self.lease_seconds)
+                self.connection.executemany("UPDATE tasks SET state = ?, attempts = attempts + 1, lease_until = ?, updated_at = ? WHERE id = ?",
+                                            [(IN_FLIGHT, until, now, row[0]) for row in rows])
+                self.connection.execute("COMMIT")
+
+            except BaseException:
+                self.connection.execute("ROLLBACK")
+                raise
+
+        return [WorkTask(id, kind, key, json.loads(payload), attempts + 1) for id, kind, key, payload, attempts in rows]
+
+    def complete(self, task: WorkTask):
+        self._set(task, DONE, None)
+
+    def fail(self, task: WorkTask, error: BaseException | str):
+        """Puts the task back to pending, or marks it failed once it ran out of attempts"""
+        self._set(task, FAILED if task.attempts >= self.max_attempts else PENDING, str(error) or type(error).__name__)
+
+    def release(self, task: WorkTask):
+        """Gives a leased task back without counting the attempt (e.g. on shutdown)"""
+        with self.lock:
+            self.connection.execute("UPDATE tasks SET state = ?, attempts = MAX(attempts - 1, 0), lease_until = NULL, updated_at = ? "
+                                    "WHERE id = ? AND state = ?", (PENDING, self.clock(), task.id, IN_FLIGHT))
+
+    def _set(self, task: WorkTask, state: str, error: str | None):
+        with self.lock:
+            self.connection.execute("UPDATE tasks SET state = ?, error = ?, lease_until = NULL, updated_at = ? WHERE id = ?",
+                                    (state, error, self.clock(), task.id))
+
+    def recover(self) -> int:
+        """
+        Puts every in flight task back to pending right away, instead of waiting for the leases to expire.
+        Only for when no other process works on the same file.
+        """
+        with self.lock:
+            return self.connection.execute("UPDATE tasks SET state = ?, lease_until = NULL WHERE state = ?",
+                                           (PENDING, IN_FLIGHT)).rowcount
+
+    def retry_failed(self, kind: str | None = None) -> int:
+        """Gives failed tasks a fresh set of attempts"""
+        with self.lock:
+            return self.connection.execute("UPDATE tasks SET state = ?, attempts = 0 WHERE state = ?" + (" AND kind = ?" if kind else ""),
+                                           (PENDING, FAILED, *([kind] if kind else []))).rowcount
+
+    def state(self, kind: str, key: str) -> str | None:
+        with self.lock:
+            row = self.connection.execute("SELECT state FROM tasks WHERE kind = ? AND key = ?", (kind, key)).fetchone()
+
+        return row[0] if row else None
+
+    def failures(self, kind: str | None = None) -> list[tuple[str, str, str]]:
+        """(kind, key, error) of the failed tasks"""
+        with self.lock:
+            return self.connection.execute("SELECT kind, key, error FROM tasks WHERE state = ?" + (" AND kind = ?" if kind else "") + " ORDER BY id",
+                                           (FAILED, *([kind] if kind else []))).fetchall()
+
+    def counts(self) -> dict[str, dict[str, int]]:
+        """{kind: {state: count}}"""
+        counts: dict[str, dict[str, int]] = {}
+        with self.lock:
+            for kind, state, count in self.connection.execute("SELECT kind, state, COUNT(*) FROM tasks GROUP BY kind, state"):
+                counts.setdefault(kind, {})[state] = count
+
+        return counts
+
+    def unfinished(self) -> int:
+        """Tasks that are pending or in flight"""
+        with self.lock:
+            return self.connection.execute("SELECT COUNT(*) FROM tasks WHERE state IN (?, ?)", (PENDING, IN_FLIGHT)).fetchone()[0]
+
+    def close(self):
+        self.connection.close()
+
+    def __repr__(self) -> str:
+        return f"WorkQueue(path={self.path!r}, max_attempts={self.max_attempts})"
@@ -16,53 +16,363 @@ along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 from __future__ import annotations
 
-import argparse
 import os
+import sys
 import logging
 import asyncio
-import demjson3
+import functools
 
+from contextlib import aclosing
 from curl_cffi import Response, AsyncSession
 from functools import cached_property
-from typing import AsyncGenerator, Any, Literal, cast
+from typing import AsyncGenerator, AsyncIterable, Iterable, Any, Literal, Callable, Awaitable, TYPE_CHECKING, cast
 from base_api.modules.type_hints import DownloadReport
 from base_api.base import BaseCore, setup_logger, Helper
-from base_api.modules.errors import InvalidProxy, UnknownError, NetworkingError, BotProtectionDetected
+from base_api.modules.errors import (InvalidProxy, UnknownError, NetworkingError, BotProtectionDetected, VideoFetchError,
+                                     PageFetchError)
 
-try:
-    import lxml
-    parser = "lxml" # Faster speeds, but more dependencies
-
-except (ModuleNotFoundError, ImportError):
-    parser = "html.parser" # Fallback to classic HTML parser (will work fine)
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup # Imported when the first soup is built, it's the slowest part of `import phub`
 
 try:
     from modules.consts import *
     from modules.errors import *
     from modules.sorting import *
     from modules.type_hints import *
+    from modules.executor import *
+    from modules.listing import *
+    from modules.watch_page import *
+    from modules.single_flight import *
+    from modules.http_cache import *
+    from modules.identity_map import *
+    from modules.trimming import *
+    from modules.concurrency import *
+    from modules.rate_limit import *
+    from modules.pipeline import *
+    from modules.crawl import *
+    from modules.work_queue import *
+    from modules.session_pool import *
+    from modules.session_store import *
+    from modules.tokens import *
+    from modules.retry import *
+    from modules.export import *
+    from modules.catalog import *
 
 except (ModuleNotFoundError, ImportError):
     from .modules.consts import *
     from .modules.errors import *
     from .modules.sorting import *
     from .modules.type_hints import *
+    from .modules.executor import *
+    from .modules.listing import *
+    from .modules.watch_page import *
+    from .modules.single_flight import *
+    from .modules.http_cache import *
+    from .modules.identity_map import *
+    from .modules.trimming import *
+    from .modules.concurrency import *
+    from .modules.rate_limit import *
+    from .modules.pipeline import *
+    from .modules.crawl import *
+    from .modules.work_queue import *
+    from .modules.session_pool import *
+    from .modules.session_store import *
+    from .modules.tokens import *
+    from .modules.retry import *
+    from .modules.export import *
+    from .modules.catalog import *
+
+
+# The default on_video_error of the listings: retries by error class, with jittered backoff (see modules/retry.py).
+# Listings of a Client follow the retry_policy of the client instead.
+on_error = RetryPolicy()
+
+
+def bind_extractor(core: BaseCore, extractor: Callable[..., list], seen: SeenKeys | None = None,
+                   pages: PageURLs | None = None, max_items: int | None = None,
+                   reserved: list | None = None) -> Callable[[str], Awaitable[list]]:
+    """
+    Binds a listing extractor to the HTML backend and the parse executor of the core.
+    The backend is selected with `core.configuration.extractor_backend` (bs4, strainer, selectolax, auto)
+    and runs on `core.configuration.parse_executor` if one is set.
+    Items that are already in `seen` (extracted or yielded) are dropped before any object gets constructed for them,
+    the others are reserved in `seen` and appended to `reserved`, so the listing can release what it didn't yield.
+    Every extracted page is reported to `pages`, so it can stop handing out pages after the last one.
+    A page never needs more than max_items items, the rest isn't constructed at all.
+    """
+    bound = functools.partial(extractor, backend=getattr(core.configuration, "extractor_backend", None))
+
+    async def extract(content: str) -> list:
+        items = await run_parser(core, bound, content)
+        if seen is not None:
+            items = seen.filter(items, limit=max_items)
+            if reserved is not None:
+                reserved.extend(items)
+
+        elif max_items is not None:
+            items = items[:max_items]
+
+        if pages is not None:
+            pages.observe(content, items)
+
+        return items
+
+    return extract
+
+
+async def iterate_listing(helper: Helper, page_urls: list[str] | PageURLs, extractor: Callable[..., list],
+                          seen: SeenKeys | None = None, summaries: bool = False, max_items: int | None = None,
+                          **kwargs) -> AsyncGenerator[Any, None]:
+    """
+    Runs helper.iterator over the pages and yields every item only once, from the first page it was extracted from (see SeenKeys).
+    Pass the same `seen` to multiple listings to de-duplicate across them. Other kwargs go to the iterator.
+    With summaries=True, VideoSummary records are yielded instead (see iterate_summaries).
+
+    Pages are fetched at most max_page_concurrency pages ahead of the consumer, and leaving the loop
+    cancels the page and video tasks that are still running. With PageURLs, no pages after the last one are requested.
+
+    max_items stops the listing after that many items: no further pages are requested once enough items were
+    found, only as many pages as needed are fetched at once, and outstanding hydrations are cancelled.
+    If some of the found items fail, the listing goes on with the next pages until max_items were yielded.
+    """
+    seen = seen if seen is not None else SeenKeys()
+    if max_items is not None:
+        if max_items <= 0:
+            return
+
+        page_urls = page_urls if isinstance(page_urls, PageURLs) else PageURLs.from_list(page_urls)
+        page_urls.max_items = max_items
+        kwargs["max_page_concurrency"] = pages_needed(max_items, kwargs.get("max_page_concurrency") or 5)
+
+    controller = get_concurrency_controller(helper.core)
+    if controller is not None:
+        # The controller decides how many requests actually run, the iterator only needs enough tasks.
+        # Pages stay bounded, that's how far the iterator may run ahead of the consumer.
+        kwargs["max_video_concurrency"] = controller.max_limit
+
+    if summaries:
+        async for summary in iterate_summaries(helper, page_urls, extractor, seen=seen,
+                                               pages_concurrency=kwargs.get("max_page_concurrency") or 5, max_items=max_items,
+                                               on_page_error=kwargs.get("on_page_error")):
+            yield summary
+        return
+
+    policy = get_retry_policy(helper.core)
+    if policy is not None:
+        # Only replaces the defaults, callbacks that were passed explicitly win
+        if kwargs.get("on_video_error", on_error) is on_error:
+            kwargs["on_video_error"] = policy
+
+        if kwargs.get("on_page_error") is None:
+            kwargs["on_page_error"] = policy
+
+    pages = page_urls if isinstance(page_urls, PageURLs) else None
+    if pages is not None:
+        on_page_error = kwargs.get("on_page_error")
+
+        async def report_page_error(url: str, error: Exception, attempt: int) -> bool:
+            retry = False
+            try:
+                retry = bool(on_page_error and await on_page_error(url, error, attempt))
+                return retry
 
+            finally:
+                if not retry:
+                    pages.failed(url)
 
-async def on_error(url: str, error: Exception, attempt: int) -> bool:
-    print(f"URL: {url}, ERROR: {error}, Attempt: {attempt}")
+        kwargs["on_page_error"] = report_page_error
 
-    if isinstance(error, ResourceGone):
-        return False
+    reserved = []
+    extract = bind_extractor(helper.core, extractor, seen=seen, pages=pages, max_items=max_items, reserved=reserved)
+    # Failed videos come back from the iterator, so that their keys can be released
+    ignore_errors = kwargs.pop("ignore_errors", True)
+    yielded = 0
+    try:
+        while True:
+            lost = 0
+            iterator = helper.iterator(target_page_urls=page_urls, video_link_extractor=extract, ignore_errors=False, **kwargs)
+            async with aclosing(cancel_on_exit(iterator)) as items:
+                async for item in items:
+                    if isinstance(item, (VideoFetchError, PageFetchError)):
+                        if isinstance(item, VideoFetchError):
+                            seen.release([item.url]) # Another page may still have it
+                            if pages is not None:
+                                pages.lost()
+                                lost += 1
+
+                        if not ignore_errors:
+                            yield item
+                        continue
+
+                    if seen.admit(item.url):
+                        yield item
+                        yielded += 1
+                        if max_items is not None and yielded >= max_items:
+                            return # Closing the iterator cancels what's still running
+
+            # The pages stopped early because enough items were found, but some of them failed.
+            # PageURLs continues with the next page.
+            if max_items is None or not lost or not pages:
+                return
+
+    finally:
+        seen.release(reserved)
+
+
+async def iterate_summaries(helper: Helper, page_urls: list[str] | PageURLs, extractor: Callable[..., list],
+                            seen: SeenKeys | None = None, pages_concurrency: int = 5, max_items: int | None = None,
+                            on_page_error: Callable[[str, Exception, int], Awaitable[bool]] | None = None
+                            ) -> AsyncGenerator[VideoSummary, None]:
+    """
+    Only downloads the listing pages and yields a VideoSummary for every item (in listing order, without duplicates).
+    No Video objects and no per video work, which is what you want for listing-only crawls.
+    A page that doesn't exist (404) ends the listing. Other failed pages are retried as on_page_error
+    (by default the retry policy of the client) decides, and skipped after that.
+    """
+    on_page_error = on_page_error or get_retry_policy(helper.core)
+    seen = seen if seen is not None else SeenKeys()
+    reserved = []
+    extract = bind_extractor(helper.core, extractor, seen=seen, pages=page_urls if isinstance(page_urls, PageURLs) else None,
+                             max_items=max_items, reserved=reserved)
+    yielded = 0
+
+    async def fetch_page(url: str) -> tuple[str, list | Exception]:
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                content = await get_html_content(helper.core, url)
+                break
+
+            except NotFound as e:
+                return url, e
+
+            except Exception as e:
+                if on_page_error is None or not await on_page_error(url, e, attempt):
+                    return url, e
+
+        try:
+            return url, await extract(content)
+
+        except Exception as e:
+            return url, e
+
+    # At most pages_concurrency pages ahead of the consumer
+    try:
+        async with aclosing(bounded_map(page_urls, fetch_page, ahead=pages_concurrency)) as pages:
+            async for url, items in pages:
+                if isinstance(items, NotFound):
+                    break
+
+                if isinstance(items, Exception):
+                    helper.logger.warning(f"Failed to fetch listing page {url}: {items}")
+                    if isinstance(page_urls, PageURLs):
+                        page_urls.failed(url)
+                    continue
+
+                for item in items:
+                    if seen.admit(item):
+                        yield VideoSummary.from_item(item)
+                        yielded += 1
+                        if max_items is not None and yielded >= max_items:
+                            return
+
+    finally:
+        seen.release(reserved)
+
+
+def classify_outcome(result: Any = None, error: Exception | None = None) -> tuple[Outcome, str]:
+    """Sorts the result of a request into success, overload (429, 5xx, bot protection) or error"""
+    if error is not None:
+        if isinstance(error, BotProtectionDetected):
+            return "overload", "bot protection"
+
+        message = str(error)
+        if "429" in message or "Server error" in message or "HTTP 5" in message:
+            return "overload", message
+
+        return "error", message
+
+    status = getattr(result, "status_code", 200)
+    if status == 429 or status >= 500:
+        return "overload", f"HTTP {status}"
+
+    return "success", ""
+
+
+async def send_request(core: BaseCore, url: str, **kwargs) -> str | bytes | Response:
+    """
+    Every request of PHUB goes through here. Same as core.fetch(url, **kwargs), but waits for a slot
+    of the adaptive concurrency controller of the client (if there is one) and reports back how it went.
+    """
+    controller = get_concurrency_controller(core)
+    if controller is None:
+        return await core.fetch(url, **kwargs)
+
+    async with controller.slot() as started:
+        try:
+            result = await core.fetch(url, **kwargs)
+
+        except Exception as e:
+            outcome, reason = classify_outcome(error=e)
+            controller.record(outcome, started, controller.clock() - started, reason=reason)
+            raise
+
+        outcome, reason = classify_outcome(result)
+        controller.record(outcome, started, controller.clock() - started, reason=reason)
+        return result
+
+
+async def legacy_download(core: BaseCore, url: str, path: str, **kwargs) -> bool:
+    """
+    core.legacy_download (streams the file with the session directly), counted against the rate limits
+    of the client. The stream itself isn't throttled, the bytes are paid once it's done.
+    """
+    limiter = get_rate_limiter(core)
+    if limiter is not None:
+        await limiter.acquire(url)
 
-    return True
+    result = await core.legacy_download(path=path, url=url, **kwargs)
+    if limiter is not None and os.path.exists(path):
+        limiter.consume(url, os.path.getsize(path))
 
+    return result
 
 
-async def get_html_content(core: BaseCore, url: str) -> str | None | dict:
+async def get_html_content(core: BaseCore, url: str, use_cache: bool = True) -> str | None | dict:
+    """
+    Fetches a page. Concurrent calls for the same (normalized) URL share one request,
+    see coalescing_stats(core)["html"] for how many downloads that saved.
+    :param use_cache: False skips the HTTP cache, for pages that depend on the login session
+    """
+    return await single_flight(core, "html").do((*request_key(url), use_cache),
+                                                functools.partial(_fetch_html_content, core, url, use_cache))
+
+
+async def get_token(core: BaseCore, refresh: bool = False) -> str | None:
+    """
+    The CSRF token of the session. Cached per core (see modules/tokens.py), the homepage is only loaded
+    when there is no fresh token. refresh=True drops the cached one first (after it got rejected).
+    """
+    cache = token_cache(core)
+    if refresh:
+        cache.invalidate()
+
+    async def scrape() -> str | None:
+        # Never from the HTTP cache, a homepage from an earlier run has the token of an earlier session
+        content = await get_html_content(core=core, url=HOST, use_cache=False)
+        match = REGEX_TOKEN.search(content) if isinstance(content, str) else None
+        return match.group(1) if match else None
+
+    return await cache.get(scrape)
+
+
+async def _fetch_html_content(core: BaseCore, url: str, use_cache: bool = True) -> str | None | dict:
     # What should I do here?
     try:
-        content = await core.fetch(url)
+        cache = get_http_cache(core) if use_cache else None
+        content = await (fetch_cached(core, cache, url, fetch=functools.partial(send_request, core)) if cache is not None
+                         else send_request(core, url))
         if isinstance(content, str):
             return content
 
@@ -83,38 +393,214 @@ async def get_html_content(core: BaseCore, url: str) -> str | None | dict:
         raise UnknownNetworkError(str(e)) from e
 
 
+async def get_video_api_data(core: BaseCore, video_id: str) -> dict:
+    """
+    Fetches the Webmaster API data of a video. Concurrent requests for the same video share one request.
+    """
+    async def fetch() -> dict:
+        url = f"https://www.pornhub.com/webmasters/video_by_id?id={video_id}"
+        cache = get_http_cache(core)
+        if cache is not None:
+            stuff = await fetch_cached(core, cache, url, fetch=functools.partial(send_request, core))
+            if isinstance(stuff, str):
+                return json.loads(stuff)
+
+        else:
+            stuff = await send_request(core, url, get_response=True)
+
+        assert isinstance(stuff, Response)
+        return stuff.json()
+
+    return await single_flight(core, "video_by_id").do(video_id, fetch)
+
+
+def apply_api_data(video: Video, data: dict, fields: Iterable[str] | None = None) -> Video:
+    """Fills the api_data of a video in place (only with the given fields, if any)"""
+    data = data.get("video", data)
+    if fields is not None:
+        video.api_data = {field: data[field] for field in fields if field in data}
+
+    else:
+        video.api_data = dict(data) # The response may be shared with other videos
+
+    return video
+
+
+def parse_duration(dur: str | int | None) -> int:
+    """10:23 / 1:02:03 / 623 -> seconds"""
+    if isinstance(dur, str) and ":" in dur:
+        parts = dur.split(":")
+        if len(parts) == 2:
+            return int(parts[0]) * 60 + int(parts[1])
+        elif len(parts) == 3:
+            return int(parts[0]) * 3600 + int(parts[1]) * 60 + int(parts[2])
+    return int(dur) if dur else 0
+
+
+def make_video(core: BaseCore, url: str, api_data: dict | None = None, force_scraping: bool = False) -> Video:
+    """
+    Creates a Video for a listing, or returns the one from the identity map if the video was seen before
+    """
+    video = register_object(core, Video(url, core=core, api_data=api_data, force_scraping=force_scraping))
+    if api_data and not video.is_hydrated and (not video.api_data or not api_data.get("from_search")):
+        video.api_data = api_data
+
+    if force_scraping:
+        video.force_scraping = True
+
+    return video
+
+
 class BaseObject:
     def __init__(self, url: str, core: BaseCore, html_content: str | None = None):
         self.url = url
         self.core = core
+        self._released = False
+        self._keep_content = False
         self.html_content = html_content
         self._soup = None
         self.logger = setup_logger(name=f"PornHub API - [{self.__class__.__name__}]", log_file=None, level=logging.ERROR)
 
+    @property
+    def html_content(self) -> str | None:
+        if self._released:
+            raise ContentReleased(f"The HTML of this {self.__class__.__name__} ({self.url}) was released by the trim policy. "
+                                  f"Add the field to the policy or call 'await refetch()' first.")
+        return self._html_content
+
+    @html_content.setter
+    def html_content(self, value: str | None):
+        self._html_content = value
+        self._released = False
+
     async def _ensure_html(self):
         """Ensures that html_content is available by fetching it if necessary."""
-        if not self.html_content:
+        if not self._html_content:
             self.html_content = await get_html_content(core=self.core, url=self.url)
 
         assert isinstance(self.html_content, str)
+        await self._prepare()
         return self.html_content
 
+    @property
+    def has_content(self) -> bool:
+        """Whether the page was fetched (even if it was released since)"""
+        return bool(self._html_content) or self._released
+
+    @property
+    def is_hydrated(self) -> bool:
+        """Whether init() already fetched the data of this object"""
+        return self.has_content
+
+    def release_content(self, fields: Iterable[str] = ()):
+        """
+        Computes the given cached properties and drops the HTML and the soup.
+        Other fields that need the page raise ContentReleased from now on.
+        """
+        fields = tuple(fields)
+        for name in fields:
+            if is_cached_property(self, name):
+                try:
+                    getattr(self, name)
+
+                except Exception as e:
+                    self.logger.debug(f"Could not extract {name} before releasing {self.url}: {e}")
+
+        for name in ("soup", "watch_page", "flashvars"):
+            if name not in fields:
+                self.__dict__.pop(name, None)
+
+        self._soup = None
+        self._html_content = None
+        self._released = True
+
+    def _trim(self):
+        """Releases the content if the core has a trim policy for this object"""
+        policy = get_trim_policy(self.core)
+        if policy is None or self._keep_content or not self._html_content:
+            return
+
+        fields = policy.fields_for(self)
+        if fields is not None:
+            self.release_content(fields)
+
+    async def _first_page(self) -> str:
+        """The page of this object for a listing, fetched again (but not kept) if the trim policy released it"""
+        if self._html_content:
+            return self._html_content
+
+        content = await get_html_content(core=self.core, url=self.url)
+        assert isinstance(content, str)
+        return content
+
+    async def refetch(self):
+        """Downloads the page again after it was released, and keeps it from now on"""
+        self._keep_content = True
+        self.html_content = await get_html_content(core=self.core, url=self.url)
+        await self._prepare()
+        return self
+
+    def retained_bytes(self) -> dict[str, int]:
+        """Approximate memory held by this object (HTML, soup and cached properties), for debugging"""
+        return retained_bytes(self)
+
+    async def _prepare(self):
+        """Pre-builds the soup on the parse executor, so that the properties don't parse in the event loop."""
+        executor = get_parse_executor(self.core)
+        if executor is not None and executor.kind == "thread" and self._soup is None:
+            from bs4 import BeautifulSoup
+            self._soup = await executor.run(BeautifulSoup, self.html_content, html_parser())
+
     @property
     def soup(self) -> BeautifulSoup:
         """BeautifulSoup object. Triggers error if HTML fetch is missing and not already provided."""
         if self._soup is None:
             if not self.html_content:
                 raise AttributeError(f"HTML content not available for {self.__class__.__name__}. Call 'await init()' first.")
-            self._soup = BeautifulSoup(self.html_content, parser)
+
+            from bs4 import BeautifulSoup
+            self._soup = BeautifulSoup(self.html_content, html_parser())
         return self._soup
 
     async def init(self):
         """Initializes the object by fetching HTML content."""
         await self._ensure_html()
+        self._trim()
         return self
 
 
-class UserHelper(Helper, BaseObject):
+class ListingHelper(Helper):
+    """
+    Helper whose listing pages go through send_request (and with that through the controls of the client).
+    Its page and video tasks belong to the iteration that created them, see iterate_listing.
+    """
+    async def _make_video_safe(self, video_url: str, on_video_error: on_error_hint = None) -> Any:
+        track_task()
+        return await super()._make_video_safe(video_url, on_video_error=on_video_error)
+
+    async def _create_alternative_resource(self, resource_url: str) -> Any:
+        track_task()
+        return await super()._create_alternative_resource(resource_url)
+
+    async def _fetch_page_safe(self, url: str, method: str, on_page_error: on_error_hint = None) -> Any:
+        track_task()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                return await send_request(self.core, url, method=method)
+            except Exception as error:
+                self.logger.warning("PAGE FAILED url=%s attempt=%d: %s", url, attempt, error)
+                if on_page_error:
+                    try:
+                        if await on_page_error(url, error, attempt):
+                            continue
+                    except Exception as e:
+                        self.logger.exception("on_page_error callback failed for url=%s: %s", url, e)
+                raise
+
+
+class UserHelper(ListingHelper, BaseObject):
     def __init__(self, url: str, core: BaseCore):
         BaseObject.__init__(self, url=url, core=core, html_content=None)
         self.core = core # Keep for Helper compatibility
@@ -125,8 +611,8 @@ class UserHelper(Helper, BaseObject):
         """
         if isinstance(video_data, dict):
             url = video_data.pop("url")
-            return Video(url, core=self.core, api_data=video_data)
-        return Video(video_data, core=self.core)
+            return make_video(self.core, url, api_data=video_data)
+        return make_video(self.core, video_data)
 
     def enable_logging(self, log_file: str | None = None, level: int | None = None, log_ip: str | None = None, log_port: int | None = None):
         if not level:
@@ -164,43 +650,46 @@ class UserHelper(Helper, BaseObject):
         return return_thing_idk_bro
 
 
-    async def get_videos(self, pages: int = 5, videos_concurrency: int | None = None, pages_concurrency: int | None = None,
+    async def get_videos(self, pages: int | Literal["all"] = 5, videos_concurrency: int | None = None, pages_concurrency: int | None = None,
                          on_video_error: on_error_hint = on_error,
-                         on_page_error: on_error_hint = None) -> AsyncGenerator[Video, None]:
-        page_urls = [f"{self.url}/videos?page={page}" for page in range(1, pages + 1)]
-        self.logger.debug(f"Processing: {len(page_urls)} pages...")
+                         on_page_error: on_error_hint = None, summaries: bool = False, max_items: int | None = None) -> AsyncGenerator[Video | VideoSummary, None]:
+        """
+        :param pages: Max number of pages or "all", pages after the last one are never requested
+        :param max_items: Stop after this many videos (only the pages needed for them are fetched)
+        """
+        page_urls = PageURLs(lambda page: f"{self.url}/videos?page={page}", pages)
+        self.logger.debug(f"Processing: {page_urls}...")
         videos_concurrency = videos_concurrency or self.core.configuration.videos_concurrency
         pages_concurrency = pages_concurrency or self.core.configuration.pages_concurrency
         assert videos_concurrency and pages_concurrency
-        async for video in self.iterator(target_page_urls=page_urls, max_video_concurrency=videos_concurrency,
-                                         max_page_concurrency=pages_concurrency, video_link_extractor=extractor_videos,
-                                         on_video_error=on_video_error, on_page_error=on_page_error):
+        async for video in iterate_listing(self, page_urls, max_items=max_items, max_video_concurrency=videos_concurrency,
+                                           max_page_concurrency=pages_concurrency, extractor=extractor_videos, summaries=summaries,
+                                           on_video_error=on_video_error, on_page_error=on_page_error):
             yield video
 
 
-class SubscriptionHelper(Helper):
+class SubscriptionHelper(ListingHelper):
     def __init__(self, core: BaseCore):
         # We pass User as the dummy video class, but we'll use other_return
         super().__init__(core=core, video_constructor=User, alternative_constructor=self._make_user)
 
     async def _make_user(self, url: str):
-        user = User(url=url, core=self.core)
-        return await user.init()
+        return await fetch_object(self.core, User, url)
 
     async def get_subscriptions(self, url: str, pages: int = 5, pages_concurrency: int | None = None,
                                 videos_concurrency: int | None = None,
                                 on_video_error: on_error_hint = on_error,
-                                on_page_error: on_error_hint = None
+                                on_page_error: on_error_hint = None, max_items: int | None = None
                                 ) -> AsyncGenerator[User, None]:
         page_urls = [f"{url}?page={page}" for page in range(1, pages + 1)]
         videos_concurrency = videos_concurrency or self.core.configuration.videos_concurrency
         pages_concurrency = pages_concurrency or self.core.configuration.pages_concurrency
         assert videos_concurrency and pages_concurrency
-        async for user in self.iterator(target_page_urls=page_urls, video_link_extractor=extractor_users,
-                                        use_alternative_constructor=True,
-                                        max_page_concurrency=pages_concurrency,
-                                        max_video_concurrency=videos_concurrency,
-                                        on_video_error=on_video_error, on_page_error=on_page_error):
+        async for user in iterate_listing(self, page_urls, max_items=max_items, extractor=extractor_users,
+                                          use_alternative_constructor=True,
+                                          max_page_concurrency=pages_concurrency,
+                                          max_video_concurrency=videos_concurrency,
+                                          on_video_error=on_video_error, on_page_error=on_page_error):
             yield user
 
 
@@ -209,23 +698,27 @@ class Pornstar(UserHelper):
         # This calls UserHelper.__init__ correctly
         super().__init__(url=url, core=core)
 
-    async def get_uploads(self, pages: int = 5, videos_concurrency: int | None = None, pages_concurrency: int | None = None,
-                          on_video_error: on_error_hint = on_error, on_page_error: on_error_hint = None
+    async def get_uploads(self, pages: int | Literal["all"] = 5, videos_concurrency: int | None = None, pages_concurrency: int | None = None,
+                          on_video_error: on_error_hint = on_error, on_page_error: on_error_hint = None, summaries: bool = False, max_items: int | None = None
                           ) -> \
-            AsyncGenerator[Video, None]:
-        page_urls = [f"{self.url}/videos/upload?page={page}" for page in range(1, pages + 1)]
-        self.logger.debug(f"Processing: {len(page_urls)} pages...")
+            AsyncGenerator[Video | VideoSummary, None]:
+        """
+        :param pages: Max number of pages or "all", pages after the last one are never requested
+        :param max_items: Stop after this many videos (only the pages needed for them are fetched)
+        """
+        page_urls = PageURLs(lambda page: f"{self.url}/videos/upload?page={page}", pages)
+        self.logger.debug(f"Processing: {page_urls}...")
         videos_concurrency = videos_concurrency or self.core.configuration.videos_concurrency
         pages_concurrency = pages_concurrency or self.core.configuration.pages_concurrency
         assert videos_concurrency and pages_concurrency
-        async for video in self.iterator(target_page_urls=page_urls, max_video_concurrency=videos_concurrency,
-                                         max_page_concurrency=pages_concurrency, video_link_extractor=extractor_videos,
-                                         on_video_error=on_video_error, on_page_error=on_page_error):
+        async for video in iterate_listing(self, page_urls, max_items=max_items, max_video_concurrency=videos_concurrency,
+                                           max_page_concurrency=pages_concurrency, extractor=extractor_videos, summaries=summaries,
+                                           on_video_error=on_video_error, on_page_error=on_page_error):
             yield video
 
 
     async def get_gifs(self, pages: int = 5, videos_concurrency: int | None = None, pages_concurrency: int | None = None,
-                       on_video_error: on_error_hint = on_error, on_page_error: on_error_hint = None
+                       on_video_error: on_error_hint = on_error, on_page_error: on_error_hint = None, max_items: int | None = None, ordered: bool = True
                        ) -> \
     AsyncGenerator[GIF, None]:
         page_urls = [f"{self.url}/gifs/video?page={page}" for page in range(1, pages + 1)]
@@ -233,10 +726,12 @@ class Pornstar(UserHelper):
         videos_concurrency = videos_concurrency or self.core.configuration.videos_concurrency
         pages_concurrency = pages_concurrency or self.core.configuration.pages_concurrency
         assert videos_concurrency and pages_concurrency
-        async for gif in self.iterator(target_page_urls=page_urls, max_video_concurrency=videos_concurrency,
-                                       max_page_concurrency=pages_concurrency, video_link_extractor=extractor_gifs,
-                                       on_video_error=on_video_error, on_page_error=on_page_error):
-            yield await gif.init()
+        listing = iterate_listing(self, page_urls, max_items=max_items, max_video_concurrency=videos_concurrency,
+                                  max_page_concurrency=pages_concurrency, extractor=extractor_gifs,
+                                  on_video_error=on_video_error, on_page_error=on_page_error)
+        # The init() calls overlap (videos_concurrency at once) instead of running one after another
+        async for gif in hydration_stage(listing, lambda item: item.init(), concurrency=videos_concurrency, ordered=ordered):
+            yield gif
 
 
 class Model(UserHelper):
@@ -291,40 +786,32 @@ class Album(BaseObject):
     async def author(self) -> Pornstar:
         if not hasattr(self, "_cached_author"):
             link = self.soup.find("span", class_="usernameBadgesWrapper").find("a").get("href")
-            self._cached_author = await Pornstar(url=f"https://www.pornhub.com{link}", core=self.core).init()
+            self._cached_author = await fetch_object(self.core, Pornstar, f"https://www.pornhub.com{link}")
         return self._cached_author
 
-    async def get_photos(self, pages: int ) -> AsyncGenerator[dict, None]:
+    async def get_photos(self, pages: int, max_items: int | None = None) -> AsyncGenerator[dict, None]:
         page_urls = [f"{self.url}?page={page}" for page in range(1, pages + 1)]
+        yielded = 0
         for idx, url in enumerate(page_urls):
-            if idx == 0 and self.html_content:
-                html_code = self.html_content
+            if max_items is not None and yielded >= max_items:
+                return
+
+            if idx == 0 and self.has_content:
+                html_code = await self._first_page()
 
             else:
                 html_code = await get_html_content(core=self.core, url=url)
 
             assert isinstance(html_code, str)
-            soup = BeautifulSoup(html_code, parser)
-            main_ul = soup.find("ul", class_="photosAlbumsListing albumViews preloadImage")
-            li_tags = main_ul.find_all("div", class_="js_lazy_bkg photoAlbumListBlock")
-            for li_tag in li_tags:
-                link = f"https://www.pornhub.com{li_tag.find("a").get('href')}"
-                spans = li_tag.find_all("span")
-                rating = spans[0].text
-                views = spans[1].text
-                download_url = li_tag.get("data-bkg")
-
-                thing = {
-                    "url": link,
-                    "download_url": download_url,
-                    "rating": rating,
-                    "views": views,
-                }
+            for thing in await run_parser(self.core, extractor_album_photos, html_code):
+                if max_items is not None and yielded >= max_items:
+                    return
 
                 yield thing
+                yielded += 1
 
     async def download_photo(self, url: str, path: str) -> bool:
-        return await self.core.legacy_download(path=path, url=url)
+        return await legacy_download(self.core, url=url, path=path)
 
 
 class Short(BaseObject):
@@ -341,9 +828,11 @@ class Short(BaseObject):
         for script in scripts:
             if "JSON_SHORTIES" in script.text:
                 stuff = re.search(r'JSON_SHORTIES = insertAfterNthPosition\((.*?), prerollObject', script.text, re.DOTALL).group(1)
+                import demjson3 # Only the shorts need it
                 self._script = demjson3.decode(stuff)
                 self._metadata = self._script[0]
-        
+
+        self._trim()
         return self
 
     @property
@@ -385,7 +874,7 @@ class Short(BaseObject):
     @property
     async def get_video(self) -> Video:
         if not hasattr(self, "_cached_get_video"):
-            self._cached_get_video = await Video(core=self.core, url=str(cast(str, self.metadata.get("linkUrl")))).init()
+            self._cached_get_video = await fetch_object(self.core, Video, str(cast(str, self.metadata.get("linkUrl"))))
         return self._cached_get_video
 
     @cached_property
@@ -409,7 +898,7 @@ class Short(BaseObject):
         return str(cast(str, self.metadata.get("avatar")))
 
     async def get_author(self) -> Pornstar:
-        return await Pornstar(core=self.core, url=str(cast(str, self.metadata.get("profileUrl")))).init()
+        return await fetch_object(self.core, Pornstar, str(cast(str, self.metadata.get("profileUrl"))))
 
     @cached_property
     def author_name(self) -> str:
@@ -534,7 +1023,8 @@ class GIF(BaseObject):
 
         if "This video has been disabled" in self.html_content:
             raise VideoDisabled("The Video has been disabled, I can not fetch any data from it.")
-        
+
+        self._trim()
         return self
 
     def enable_logging(self, log_file: str | None = None, level: int | None = None, log_ip: str | None = None, log_port: int | None = None):
@@ -604,7 +1094,7 @@ class GIF(BaseObject):
 
     async def source_video(self):
         url = self.soup.find("div", class_="bottomMargin").find("a").get("href")
-        return await Video(core=self.core, url=f"https://www.pornhub.com{url}").init()
+        return await fetch_object(self.core, Video, f"https://www.pornhub.com{url}")
 
     async def download(self, callback: callback_hint = None, path="./", no_title=False, stop_event: asyncio.Event | None = None) -> bool:
         """
@@ -617,10 +1107,10 @@ class GIF(BaseObject):
         if not no_title:
             path = os.path.join(path, f"{self.title}.mp4")
 
-        return await self.core.legacy_download(path=path, callback=callback, url=self.content_url, stop_event=stop_event)
+        return await legacy_download(self.core, url=self.content_url, path=path, callback=callback, stop_event=stop_event)
 
 
-class Channel(Helper, BaseObject):
+class Channel(ListingHelper, BaseObject):
     def __init__(self, url: str, core: BaseCore, html_content: str | None = None):
         BaseObject.__init__(self, url=url, core=core, html_content=html_content)
         self.core = core
@@ -628,8 +1118,8 @@ class Channel(Helper, BaseObject):
     async def _make_video_safe(self, video_data: str | dict, **kwargs):
         if isinstance(video_data, dict):
             url = video_data.pop("url")
-            return Video(url, core=self.core, api_data=video_data)
-        return Video(video_data, core=self.core)
+            return make_video(self.core, url, api_data=video_data)
+        return make_video(self.core, video_data)
 
     @cached_property
     def name(self) -> str:
@@ -673,30 +1163,38 @@ class Channel(Helper, BaseObject):
     async def get_user(self) -> User:
         link = self.soup.find_all("p", class_="joined")[3].find("a").get("href")
         link = f"https://www.pornhub.com{link}"
-        user = User(core=self.core, url=link)
-        return await user.init()
+        return await fetch_object(self.core, User, link)
 
-    async def get_videos(self, pages: int = 5, videos_concurrency: int | None = None, pages_concurrency: int | None = None,
-                         on_video_error: on_error_hint = on_error, on_page_error: on_error_hint = None
-                         ) -> AsyncGenerator[Video, None]:
-        page_urls = [f"{self.url}videos?page={page}" for page in range(1, pages + 1)]
+    async def get_videos(self, pages: int | Literal["all"] = 5, videos_concurrency: int | None = None, pages_concurrency: int | None = None,
+                         on_video_error: on_error_hint = on_error, on_page_error: on_error_hint = None, summaries: bool = False, max_items: int | None = None
+                         ) -> AsyncGenerator[Video | VideoSummary, None]:
+        """
+        :param pages: Max number of pages or "all", pages after the last one are never requested
+        :param max_items: Stop after this many videos (only the pages needed for them are fetched)
+        """
+        page_urls = PageURLs(lambda page: f"{self.url}videos?page={page}", pages)
         videos_concurrency = videos_concurrency or self.core.configuration.videos_concurrency
         pages_concurrency = pages_concurrency or self.core.configuration.pages_concurrency
         assert videos_concurrency and pages_concurrency
-        async for video in self.iterator(target_page_urls=page_urls, max_video_concurrency=videos_concurrency,
-                                         max_page_concurrency=pages_concurrency, video_link_extractor=extractor_videos,
-                                         on_video_error=on_video_error, on_page_error=on_page_error):
+        async for video in iterate_listing(self, page_urls, max_items=max_items, max_video_concurrency=videos_concurrency,
+                                           max_page_concurrency=pages_concurrency, extractor=extractor_videos, summaries=summaries,
+                                           on_video_error=on_video_error, on_page_error=on_page_error):
             yield video
 
 
-class Playlist(Helper, BaseObject):
+class Playlist(ListingHelper, BaseObject):
     def __init__(self, url: str, core: BaseCore, html_content: str | None = None):
         BaseObject.__init__(self, url=url, core=core, html_content=html_content)
         self.core = core
 
     @cached_property
     def token(self) -> str:
-        return REGEX_TOKEN.search(self.html_content).group(1)
+        return self._offer_token(self.html_content)
+
+    def _offer_token(self, content: str) -> str:
+        token = REGEX_TOKEN.search(content).group(1)
+        token_cache(self.core).offer(token) # Fresh from the page, so the login etc. don't need the homepage for it
+        return token
 
     @cached_property
     def pid(self) -> str:
@@ -725,8 +1223,7 @@ class Playlist(Helper, BaseObject):
     async def get_author(self) -> User:
         div = self.soup.find("div", class_="usernameWrap clearfix").find("a").get("href")
         url = f"https://www.pornhub.com{div}"
-        user = User(core=self.core, url=url)
-        return await user.init()
+        return await fetch_object(self.core, User, url)
 
     @cached_property
     def video_count(self) -> int:
@@ -757,23 +1254,40 @@ class Playlist(Helper, BaseObject):
         return int(stuff.group(1))
 
     async def get_videos(self, pages: int = 5, videos_concurrency: int | None = None, pages_concurrency: int | None = None,
-                         on_video_error: on_error_hint = on_error, on_page_error: on_error_hint = None) -> AsyncGenerator[Video, None]:
-
+                         on_video_error: on_error_hint = on_error, on_page_error: on_error_hint = None,
+                         max_items: int | None = None) -> AsyncGenerator[Video, None]:
+        """
+        :param max_items: Stop after this many videos (the chunks aren't fetched if the first page has enough)
+        """
         videos_concurrency = videos_concurrency or self.core.configuration.videos_concurrency
         pages_concurrency = pages_concurrency or self.core.configuration.pages_concurrency
         assert videos_concurrency and pages_concurrency
 
-        # Process the initial page (self.html_content) if pages >= 1
-        if pages >= 1:
-            # Use extractor_videos for the initial full HTML page content from
-            # self.html_content
+        # The initial page and the chunks overlap sometimes, so they share the same seen keys
+        seen = SeenKeys()
+
+        remaining = max_items
+        page = await self._first_page()
+        if "token" not in self.__dict__ and not self._html_content:
+            self.token = self._offer_token(page) # The page was released before the token was needed
+
+        # Process the initial page if pages >= 1
+        if pages >= 1 and (remaining is None or remaining > 0):
+            # Use extractor_videos for the initial full HTML page
             # This is critical because the initial page's structure is different from chunked responses.
-            assert isinstance(self.html_content, str)
-            initial_page_links = extractor_videos_from_playlist_page(self.html_content)
-            # Initialize videos concurrently in the background
-            tasks = [asyncio.create_task(Video(url=link, core=self.core).init()) for link in initial_page_links]
-            for task in tasks:
-                yield await task
+            initial_page_links = await bind_extractor(self.core, extractor_videos_from_playlist_page, seen=seen,
+                                                      max_items=remaining)(page)
+            # Initialize videos concurrently, but only videos_concurrency ahead of the consumer
+            async with aclosing(bounded_map(initial_page_links, lambda link: make_video(self.core, link).init(),
+                                            ahead=videos_concurrency)) as videos:
+                async for video in videos:
+                    if seen.admit(video.url):
+                        yield video
+                        if remaining is not None:
+                            remaining -= 1
+
+        if remaining is not None and remaining <= 0:
+            return
 
         # Generate URLs for subsequent chunked pages
         # Start from page 2 (index 1) since page 1 (index 0) was handled above
@@ -783,11 +1297,68 @@ class Playlist(Helper, BaseObject):
         ]
 
         if chunked_page_urls:
-            # Use self.iterator with extractor_videos_playlist for chunked pages
-            async for video in self.iterator(target_page_urls=chunked_page_urls, max_video_concurrency=videos_concurrency,
-                                             max_page_concurrency=pages_concurrency, video_link_extractor=extractor_videos_playlist,
-                                             on_video_error=on_video_error, on_page_error=on_page_error):
-                yield await video
+            # Use the iterator with extractor_videos_playlist for chunked pages
+            async for video in iterate_listing(self, chunked_page_urls, extractor=extractor_videos_playlist, seen=seen, max_items=remaining,
+                                               max_video_concurrency=videos_concurrency, max_page_concurrency=pages_concurrency,
+                                               on_video_error=on_video_error, on_page_error=on_page_error):
+                yield video
+
+
+class VideoSummary:
+    """
+    A video as it appears in a listing (search results, uploads, HubTraffic), without a Video object behind it.
+    Uses __slots__ and has no logger, soup or cache of its own, so hundreds of thousands of them are cheap.
+    Use to_video() / promote() to get the full Video when you need it.
+    """
+    __slots__ = ("url", "title", "duration", "thumb", "views", "rating", "publish_date")
+
+    def __init__(self, url: str, title: str | None = None, duration: str | int | None = None, thumb: str | None = None,
+                 views: int | str | None = None, rating: float | str | None = None, publish_date: str | None = None):
+        self.url = url
+        self.title = title
+        self.duration = duration
+        self.thumb = thumb
+        self.views = views
+        self.rating = rating
+        self.publish_date = publish_date
+
+    @classmethod
+    def from_item(cls, item: str | dict) -> VideoSummary:
+        """From an extractor result (a URL, an extractor_videos dict or a HubTraffic dict)"""
+        if isinstance(item, str):
+            return cls(item)
+
+        return cls(url=item["url"], title=item.get("title"), duration=item.get("duration"),
+                   thumb=item.get("default_thumb") or item.get("thumb"), views=item.get("views"),
+                   rating=item.get("rating"), publish_date=item.get("publish_date"))
+
+    @property
+    def video_id(self) -> str:
+        return listing_key(self.url)
+
+    @property
+    def duration_seconds(self) -> int:
+        return parse_duration(self.duration)
+
+    def as_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def to_video(self, core: BaseCore) -> Video:
+        """The Video for this summary (no request is made, it only has the data of the summary)"""
+        api_data = {name: value for name, value in self.as_dict().items() if value is not None and name != "url"}
+        api_data["from_search"] = True # Partial data, hydration fetches the rest
+        return make_video(core, self.url, api_data=api_data)
+
+    async def promote(self, core: BaseCore) -> Video:
+        """The Video for this summary, with the full Webmaster API data"""
+        video = self.to_video(core)
+        if not video.is_hydrated:
+            apply_api_data(video, await video.get_api_data())
+
+        return video
+
+    def __repr__(self) -> str:
+        return f"VideoSummary(url={self.url!r}, title={self.title!r}, duration={self.duration!r})"
 
 
 class Video(BaseObject):
@@ -804,16 +1375,13 @@ class Video(BaseObject):
             await self.ensure_html()
             return self
 
-        if self._api_data or self.html_content:
+        if self._api_data or self.is_hydrated:
+            self._trim()
             return self
 
         # Default to Webmaster API for initialization if no data provided
         try:
-            data = await self.get_api_data()
-            if "video" in data:
-                self._api_data = data["video"]
-            else:
-                self._api_data = data
+            apply_api_data(self, await self.get_api_data())
         except Exception as e:
             self.logger.warning(f"Failed to fetch HubTraffic API data for {self.url}: {e}")
             pass
@@ -828,9 +1396,25 @@ class Video(BaseObject):
     def api_data(self, value: dict):
         self._api_data = value
 
+    @property
+    def is_hydrated(self) -> bool:
+        # The data from a search page is only a small part of the API data
+        return super().is_hydrated or bool(self._api_data and not self._api_data.get("from_search"))
+
     async def ensure_html(self):
         """Manually trigger HTML fetch if we need deep scraping."""
-        return await self._ensure_html()
+        html_content = await self._ensure_html()
+        self._trim()
+        return html_content
+
+    async def _prepare(self):
+        # The watch page is mostly used for the flashvars (downloads), so those are decoded instead of the soup
+        if get_parse_executor(self.core) is not None and "flashvars" not in self.__dict__:
+            try:
+                self.__dict__["flashvars"] = await run_parser(self.core, parse_flashvars, self.html_content)
+
+            except Exception:
+                pass # Stays lazy, the error is raised again once flashvars is accessed
 
     async def get_api_data(self) -> dict:
         """
@@ -839,9 +1423,7 @@ class Video(BaseObject):
         fetched by using HTML scraping
         :return:
         """
-        stuff = await self.core.fetch(f"https://www.pornhub.com/webmasters/video_by_id?id={self.video_id}", get_response=True)
-        assert isinstance(stuff, Response)
-        return stuff.json()
+        return await get_video_api_data(self.core, self.video_id)
 
 
     def enable_logging(self, log_file: str | None = None, level: int | None = None, log_ip: str | None = None, log_port: int | None = None):
@@ -856,18 +1438,25 @@ class Video(BaseObject):
     @cached_property
     def soup(self) -> BeautifulSoup:
         if self._soup is None and self.html_content:
-            self._soup = BeautifulSoup(self.html_content, parser)
+            from bs4 import BeautifulSoup
+            self._soup = BeautifulSoup(self.html_content, html_parser())
 
         return self._soup
 
+    @cached_property
+    def watch_page(self) -> WatchPage:
+        """Extracts single elements of the watch page without building the full soup"""
+        if not self.html_content:
+            raise ValueError("You need to call: await video.ensure_html() first!")
+
+        return WatchPage(self.html_content)
+
     @cached_property
     def flashvars(self) -> dict:
         if not self.html_content:
             raise ValueError("You need to call: await video.ensure_html() before downloading!")
 
-        match = REGEX_VIDEO_FLASHVARS.search(self.html_content)
-        stuff = match.group(1)
-        return json.loads(stuff, strict=False)
+        return parse_flashvars(self.html_content)
 
     @cached_property
     def is_vr(self) -> bool:
@@ -891,14 +1480,7 @@ class Video(BaseObject):
     @cached_property
     def duration(self) -> int:
         if self.api_data:
-            dur = self.api_data.get("duration")
-            if isinstance(dur, str) and ":" in dur:
-                parts = dur.split(":")
-                if len(parts) == 2:
-                    return int(parts[0]) * 60 + int(parts[1])
-                elif len(parts) == 3:
-                    return int(parts[0]) * 3600 + int(parts[1]) * 60 + int(parts[2])
-            return int(dur) if dur else 0
+            return parse_duration(self.api_data.get("duration"))
         return int(self.flashvars["video_duration"])
 
     @cached_property
@@ -1003,13 +1585,13 @@ class Video(BaseObject):
     def views(self) -> str:
         if self.api_data:
             return str(self.api_data.get("views", "0"))
-        return self.soup.find("div", class_="video-actions-menu ctasActionMenu").find("div", class_="views").find("span").text
+        return self.watch_page.views
 
     @cached_property
     def publish_date(self) -> str:
         if self.api_data:
             return self.api_data.get("publish_date", "")
-        return self.soup.find("div", class_="video-actions-menu ctasActionMenu").find("div", class_="videoInfo").text
+        return self.watch_page.publish_date
 
     @cached_property
     def rating_percent(self) -> str:
@@ -1019,7 +1601,7 @@ class Video(BaseObject):
     def likes(self) -> str:
         if self.api_data:
             return str(self.api_data.get("ratings", "0"))
-        return self.soup.find("span", class_="votesUp").text
+        return self.watch_page.likes
 
     @cached_property
     def categories(self) -> dict | list:
@@ -1033,19 +1615,11 @@ class Video(BaseObject):
 
             return return_thing_idk_bro
 
-        return_thing_idk_bro = {}
-
-        stuff = self.soup.find("div", class_ = "categoriesWrapper").find_all("a", class_="gtm-event-video-underplayer item")
-        for thing in stuff:
-            first = thing.text
-            href = thing.get("href")
-            return_thing_idk_bro[first] = href
-
-        return return_thing_idk_bro
+        return self.watch_page.categories
 
     @cached_property
     def author_thumbnail(self) -> str:
-        return str(cast(str, self.soup.find("div", class_="userAvatar").find("img").get("src")))
+        return str(cast(str, self.watch_page.author_thumbnail))
 
     @cached_property
     def tags(self) -> dict | list:
@@ -1059,33 +1633,21 @@ class Video(BaseObject):
 
             return return_thing_idk_bro
 
-        return_thing_idk_bro = {}
-
-        stuff = self.soup.find("div", class_ = "tagsWrapper").find_all("a", class_="video_underplayer")
-        for thing in stuff:
-            first = thing.text
-            href = thing.get("href")
-            return_thing_idk_bro[first] = href
-
-        return return_thing_idk_bro
+        return self.watch_page.tags
 
     @property
     async def author(self) -> Pornstar | Channel | Model:
         if not hasattr(self, "_cached_author"):
-            link = self.soup.find("div", class_="userAvatar").find("a").get("href")
-            link = f"https://www.pornhub.com{link}"
+            link = self.watch_page.author_url
 
             if "pornstar" in link:
-                pornstar = Pornstar(core=self.core, url=link)
-                self._cached_author = await pornstar.init()
+                self._cached_author = await fetch_object(self.core, Pornstar, link)
 
             elif "model" in link:
-                model = Model(core=self.core, url=link)
-                self._cached_author = await model.init()
+                self._cached_author = await fetch_object(self.core, Model, link)
 
             elif "channel" in link:
-                channel = Channel(core=self.core, url=link)
-                self._cached_author = await channel.init()
+                self._cached_author = await fetch_object(self.core, Channel, link)
             else:
                 self._cached_author = None
         return self._cached_author
@@ -1158,8 +1720,10 @@ class Account:
         self.avatar: Image | None = None
         self.is_premium: bool = False
         self.user: User | None = None
+        self.data: dict = {}
 
     def connect(self, data: dict):
+        self.data = data
         self.name = data.get('username')
         self.avatar = Image(self.client.core, str(cast(str, data.get('avatar'))), name='avatar')
         self.is_premium = data.get('premium_redirect_cookie') != '0'
@@ -1168,24 +1732,24 @@ class Account:
             url = f"https://www.pornhub.com/users/{self.name}"
             self.user = User(url=url, core=self.client.core)
 
-    async def get_recommended(self, pages: int = 5, force_scraping: bool = False) -> AsyncGenerator[Video, None]:
-        async for video in self.client.get_recommended(pages=pages, force_scraping=force_scraping):
+    async def get_recommended(self, pages: int = 5, force_scraping: bool = False, max_items: int | None = None) -> AsyncGenerator[Video, None]:
+        async for video in self.client.get_recommended(pages=pages, force_scraping=force_scraping, max_items=max_items):
             yield video
 
-    async def get_history(self, pages: int = 5, force_scraping: bool = False) -> AsyncGenerator[Video, None]:
-        async for video in self.client.get_history(pages=pages, force_scraping=force_scraping):
+    async def get_history(self, pages: int = 5, force_scraping: bool = False, max_items: int | None = None) -> AsyncGenerator[Video, None]:
+        async for video in self.client.get_history(pages=pages, force_scraping=force_scraping, max_items=max_items):
             yield video
 
-    async def get_favorites(self, pages: int = 5, force_scraping: bool = False) -> AsyncGenerator[Video, None]:
-        async for video in self.client.get_favorites(pages=pages, force_scraping=force_scraping):
+    async def get_favorites(self, pages: int = 5, force_scraping: bool = False, max_items: int | None = None) -> AsyncGenerator[Video, None]:
+        async for video in self.client.get_favorites(pages=pages, force_scraping=force_scraping, max_items=max_items):
             yield video
 
-    async def get_feed(self, section: str = 'videos', pages: int = 5, force_scraping: bool = False) -> AsyncGenerator[Video, None]:
-        async for video in self.client.get_feed(section=section, pages=pages, force_scraping=force_scraping):
+    async def get_feed(self, section: str = 'videos', pages: int = 5, force_scraping: bool = False, max_items: int | None = None) -> AsyncGenerator[Video, None]:
+        async for video in self.client.get_feed(section=section, pages=pages, force_scraping=force_scraping, max_items=max_items):
             yield video
 
-    async def get_subscriptions(self, pages: int = 5) -> AsyncGenerator[User, None]:
-        async for user in self.client.get_subscriptions(pages=pages):
+    async def get_subscriptions(self, pages: int = 5, max_items: int | None = None) -> AsyncGenerator[User, None]:
+        async for user in self.client.get_subscriptions(pages=pages, max_items=max_items):
             yield user
 
     def __repr__(self) -> str:
@@ -1193,10 +1757,40 @@ class Account:
         return f'Account({status})'
 
 
-class Client(Helper):
-    def __init__(self, core: BaseCore = BaseCore(), email: str | None = None, password: str | None = None, login: bool = False):
+class Client(ListingHelper):
+    def __init__(self, core: BaseCore | None = None, email: str | None = None, password: str | None = None, login: bool = False,
+                 identity_map: IdentityMap | None = None, concurrency: AIMDController | None = None,
+                 rate_limits: RateLimiter | None = None, sessions: SessionPool | None = None,
+                 session_store: SessionStore | None = None, retry_policy: RetryPolicy | None = None,
+                 circuit_breaker: CircuitBreaker | None = None):
+        """
+        :param identity_map: Reuses hydrated objects for repeated lookups (Default: IdentityMap(max_size=1000)),
+                             pass IdentityMap(max_size=0) to always create new objects
+        :param concurrency: Adapts the number of concurrent requests of all iterators to the link (AIMD),
+                            instead of the fixed videos_concurrency / pages_concurrency
+        :param rate_limits: Per-host requests / bytes per second for pages, API calls and downloads
+        :param sessions: Spreads the requests over several sessions / proxies, by their health
+        :param session_store: Restores the login from disk instead of logging in on every start
+        :param retry_policy: How often and after which delay failed pages and videos of the listings are tried again
+                             (Default: RetryPolicy()), callbacks passed to a listing replace it
+        :param circuit_breaker: Pauses all requests after a burst of network errors or the bot protection
+                                (Default: CircuitBreaker()), pass CircuitBreaker(threshold=0) to never pause
+        """
+        core = core or BaseCore()
         super().__init__(core, video_constructor=Video)
-        self.core = core or BaseCore()
+        self.core = core
+        self.identity_map = identity_map if identity_map is not None else IdentityMap()
+        set_identity_map(self.core, self.identity_map)
+        self.concurrency = concurrency
+        set_concurrency_controller(self.core, concurrency)
+        self.sessions = sessions
+        set_session_pool(self.core, sessions, headers=HEADERS, cookies=COOKIES) # Before the rate limiter, which wraps it
+        self.rate_limits = rate_limits
+        set_rate_limiter(self.core, rate_limits)
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        set_retry_policy(self.core, self.retry_policy)
+        self.circuit_breaker = circuit_breaker if circuit_breaker is not None else CircuitBreaker()
+        set_circuit_breaker(self.core, self.circuit_breaker) # After the rate limiter, waiting requests hold no tokens
         self.core.initialize_session()
         assert isinstance(self.core.session, AsyncSession)
         self.core.session.headers.update(HEADERS)
@@ -1206,6 +1800,11 @@ class Client(Helper):
         self.credentials = {"email": email, "password": password}
         self.logged = False
         self.account = Account(self)
+        self.session_store = session_store
+        self.session_verified = True
+        self.recommendations_fixed = False
+        if session_store is not None:
+            self.restore_session()
 
         if login and email and password:
             asyncio.create_task(self.login())
@@ -1216,6 +1815,9 @@ class Client(Helper):
         """
         self.logger.debug("Attempting login")
 
+        if not force and self.logged and not self.session_verified:
+            return True # Restored from the session store, checked by ensure_login() once it's needed
+
         if not force and self.logged:
             self.logger.error("Client is already logged in")
             if throw:
@@ -1228,33 +1830,37 @@ class Client(Helper):
                 raise LoginFailed("Email and password are required")
             return False
 
-        # Get token from homepage
-        page_content = await get_html_content(url=HOST, core=self.core)
-        match = REGEX_TOKEN.search(page_content)
-        if not match:
-            self.logger.error("Could not find login token")
-            if throw:
-                raise LoginFailed("Could not find login token")
-            return False
-
-        token = match.group(1)
+        # A cached token that gets rejected is replaced by a fresh one (once), a fresh one that gets rejected
+        # means the credentials are wrong, so the login endpoint isn't hit again for nothing
+        for refresh in (False, True):
+            cached = token_cache(self.core).fresh
+            token = await get_token(self.core, refresh=refresh)
+            if not token:
+                self.logger.error("Could not find login token")
+                if throw:
+                    raise LoginFailed("Could not find login token")
+                return False
+
+            # Send credentials
+            payload = LOGIN_PAYLOAD | self.credentials | {"token": token}
+
+            url = f"{HOST}front/authenticate"
+            try:
+                response = await send_request(self.core, url, method="POST", data=payload, get_response=True)
+                assert isinstance(response, Response)
+                data = response.json()
+            except Exception as e:
+                self.logger.error(f"Login request failed: {e}")
+                if throw:
+                    raise LoginFailed(f"Login request failed: {e}")
+                return False
 
-        # Send credentials
-        payload = LOGIN_PAYLOAD | self.credentials | {"token": token}
-        
-        url = f"{HOST}front/authenticate"
-        try:
-            response = await self.core.fetch(url, method="POST", data=payload, get_response=True)
-            assert isinstance(response, Response)
-            data = response.json()
-        except Exception as e:
-            self.logger.error(f"Login request failed: {e}")
-            if throw:
-                raise LoginFailed(f"Login request failed: {e}")
-            return False
+            success = int(data.get("success", 0))
+            message = data.get("message", "Unknown error")
+            if success or refresh or not cached:
+                break
 
-        success = int(data.get("success", 0))
-        message = data.get("message", "Unknown error")
+            self.logger.debug(f"Login rejected with a cached token ({message}), retrying with a new one")
 
         if not success:
             self.logger.error(f"Login failed: {message}")
@@ -1265,42 +1871,113 @@ class Client(Helper):
         # Update account data
         self.account.connect(data)
         self.logged = True
+        self.session_verified = True
+        self.recommendations_fixed = False
+        token_cache(self.core).invalidate() # The token belongs to the logged out session
+        if self.sessions is not None:
+            self.sessions.share_cookies(self.core.session.cookies)
+
+        if self.session_store is not None:
+            self.session_store.save(self.credentials["email"], self.core.session.cookies, data)
+
+        return True
+
+    def restore_session(self) -> bool:
+        """
+        Restores the login from the session store (no request). The session is checked by ensure_login()
+        on the first request that needs it.
+        """
+        state = self.session_store.load(email=self.credentials["email"]) if self.session_store is not None else None
+        if state is None:
+            return False
+
+        load_cookies(self.core.session.cookies, state["cookies"])
+        if self.sessions is not None:
+            self.sessions.share_cookies(self.core.session.cookies)
+
+        if state["account"]:
+            self.account.connect(state["account"])
+
+        self.logged = True
+        self.session_verified = False
         return True
 
+    async def check_session(self) -> bool:
+        """Whether the site still sees the session as logged in (unknown counts as yes)"""
+        url = self.account.user.url if self.account.user is not None else HOST
+        content = await get_html_content(core=self.core, url=url, use_cache=False) # A cached page may be from before it expired
+        match = REGEX_LOGGED_IN.search(content) if isinstance(content, str) else None
+        return match is None or match.group(1) == "true"
+
+    async def ensure_login(self) -> bool:
+        """
+        Checks a restored session once, and logs in again if it expired.
+        :return: Whether the client is logged in
+        """
+        if not self.logged or self.session_verified:
+            return self.logged
+
+        self.session_verified = True
+        try:
+            if await self.check_session():
+                return True
+
+        except Exception as e:
+            self.logger.warning(f"Could not check the restored session: {e}")
+            return True # Keep it, the request that needed it will tell
+
+        self.logger.info("The restored session expired, logging in again")
+        self.logged = False
+        self.session_store.clear()
+        return await self.login(force=True, throw=False)
+
     async def fix_recommendations(self) -> bool:
         """
         Allow recommendations cookies.
         """
+        await self.ensure_login()
         if not self.logged:
             return False
 
+        if self.recommendations_fixed:
+            return True # The consent sticks to the session
+
         self.logger.info("Fixing account recommendations")
-        
-        # Get token
-        page_content = await get_html_content(url=HOST, core=self.core)
-        match = REGEX_TOKEN.search(page_content)
-        if not match:
-            return False
-        token = match.group(1)
 
-        params = {
-            'token': token,
-            'cookie_selection': 3,
-            'site_id': 1
-        }
-        url = f"{HOST}user/log_user_cookie_consent"
-        try:
-            response = await self.core.fetch(url, params=params, get_response=True)
-            assert isinstance(response, Response)
-            return response.json().get("success", False)
-        except Exception:
-            return False
+        for refresh in (False, True):
+            cached = token_cache(self.core).fresh
+            token = await get_token(self.core, refresh=refresh)
+            if not token:
+                return False
+
+            params = {
+                'token': token,
+                'cookie_selection': 3,
+                'site_id': 1
+            }
+            url = f"{HOST}user/log_user_cookie_consent"
+            try:
+                response = await send_request(self.core, url, params=params, get_response=True)
+                assert isinstance(response, Response)
+                success = bool(response.json().get("success", False))
+            except Exception:
+                return False
+
+            if success:
+                self.recommendations_fixed = True
+                return True
+
+            if refresh or not cached:
+                return False # A fresh token didn't help either
+
+        return False
 
     async def get_recommended(self, pages: int = 5, videos_concurrency: int | None = None, pages_concurrency: int | None = None, force_scraping: bool = False,
-                              on_video_error: on_error_hint = on_error, on_page_error: on_error_hint = None) -> AsyncGenerator[Video, None]:
+                              on_video_error: on_error_hint = on_error, on_page_error: on_error_hint = None, max_items: int | None = None, ordered: bool = True) -> AsyncGenerator[Video, None]:
         """
         Get recommended videos for the logged-in account.
         """
+        await self.ensure_login()
         if not self.logged:
             self.logger.warning("Client not logged in, recommended videos might not be personalized")
 
@@ -1312,17 +1989,20 @@ class Client(Helper):
         videos_concurrency = videos_concurrency or self.core.configuration.videos_concurrency
         pages_concurrency = pages_concurrency or self.core.configuration.pages_concurrency
         assert videos_concurrency and pages_concurrency
-        async for video in self.iterator(target_page_urls=page_urls, max_video_concurrency=videos_concurrency,
-                                       max_page_concurrency=pages_concurrency, video_link_extractor=extractor_videos, force_scraping=force_scraping,
-                                         on_video_error=on_video_error, on_page_error=on_page_error):
-            yield await video
+        listing = iterate_listing(self, page_urls, max_items=max_items, max_video_concurrency=videos_concurrency,
+                                  max_page_concurrency=pages_concurrency, extractor=extractor_videos, force_scraping=force_scraping,
+                                  on_video_error=on_video_error, on_page_error=on_page_error)
+        # The init() calls overlap (videos_concurrency at once) instead of running one after another
+        async for video in hydration_stage(listing, lambda item: item.init(), concurrency=videos_concurrency, ordered=ordered):
+            yield video
 
     async def get_history(self, pages: int = 5, videos_concurrency: int | None = None, pages_concurrency: int | None = None, force_scraping: bool = False,
-                          on_video_error: on_error_hint = on_error, on_page_error: on_error_hint = None
+                          on_video_error: on_error_hint = on_error, on_page_error: on_error_hint = None, max_items: int | None = None, ordered: bool = True
                           ) -> AsyncGenerator[Video, None]:
         """
         Get watch history for the logged-in account.
         """
+        await self.ensure_login()
         if not self.logged:
             raise LoginFailed("Must be logged in to access history")
 
@@ -1332,16 +2012,19 @@ class Client(Helper):
         videos_concurrency = videos_concurrency or self.core.configuration.videos_concurrency
         pages_concurrency = pages_concurrency or self.core.configuration.pages_concurrency
         assert videos_concurrency and pages_concurrency
-        async for video in self.iterator(target_page_urls=page_urls, max_video_concurrency=videos_concurrency,
-                                       max_page_concurrency=pages_concurrency, video_link_extractor=extractor_videos, force_scraping=force_scraping,
-                                         on_video_error=on_video_error, on_page_error=on_page_error):
-            yield await video
+        listing = iterate_listing(self, page_urls, max_items=max_items, max_video_concurrency=videos_concurrency,
+                                  max_page_concurrency=pages_concurrency, extractor=extractor_videos, force_scraping=force_scraping,
+                                  on_video_error=on_video_error, on_page_error=on_page_error)
+        # The init() calls overlap (videos_concurrency at once) instead of running one after another
+        async for video in hydration_stage(listing, lambda item: item.init(), concurrency=videos_concurrency, ordered=ordered):
+            yield video
 
     async def get_favorites(self, pages: int = 5, videos_concurrency: int | None = None, pages_concurrency: int | None = None, force_scraping: bool = False,
-                            on_video_error: on_error_hint = on_error,   on_page_error: on_error_hint = None) -> AsyncGenerator[Video, None]:
+                            on_video_error: on_error_hint = on_error,   on_page_error: on_error_hint = None, max_items: int | None = None, ordered: bool = True) -> AsyncGenerator[Video, None]:
         """
         Get favorite videos for the logged-in account.
         """
+        await self.ensure_login()
         if not self.logged:
             raise LoginFailed("Must be logged in to access favorites")
 
@@ -1352,13 +2035,15 @@ class Client(Helper):
         pages_concurrency = pages_concurrency or self.core.configuration.pages_concurrency
         assert videos_concurrency and pages_concurrency
 
-        async for video in self.iterator(target_page_urls=page_urls, max_video_concurrency=videos_concurrency,
-                                       max_page_concurrency=pages_concurrency, video_link_extractor=extractor_videos, force_scraping=force_scraping,
-                                         on_video_error=on_video_error, on_page_error=on_page_error):
-            yield await video
+        listing = iterate_listing(self, page_urls, max_items=max_items, max_video_concurrency=videos_concurrency,
+                                  max_page_concurrency=pages_concurrency, extractor=extractor_videos, force_scraping=force_scraping,
+                                  on_video_error=on_video_error, on_page_error=on_page_error)
+        # The init() calls overlap (videos_concurrency at once) instead of running one after another
+        async for video in hydration_stage(listing, lambda item: item.init(), concurrency=videos_concurrency, ordered=ordered):
+            yield video
 
     async def get_feed(self, section: str = 'videos', pages: int = 5, videos_concurrency: int | None = None, pages_concurrency: int | None = None, force_scraping: bool = False,
-                       on_video_error: on_error_hint = on_error, on_page_error: on_error_hint = None) -> AsyncGenerator[Video, None]:
+                       on_video_error: on_error_hint = on_error, on_page_error: on_error_hint = None, max_items: int | None = None, ordered: bool = True) -> AsyncGenerator[Video, None]:
         """
         Get the account feed.
         :param force_scraping:
@@ -1368,7 +2053,9 @@ class Client(Helper):
         :param on_video_error:
         :param on_page_error:
         :param pages: Number of pages to fetch.
+        :param max_items: Stop after this many videos
         """
+        await self.ensure_login()
         if not self.logged:
             raise LoginFailed("Must be logged in to access feed")
 
@@ -1379,16 +2066,19 @@ class Client(Helper):
         pages_concurrency = pages_concurrency or self.core.configuration.pages_concurrency
         assert videos_concurrency and pages_concurrency
 
-        async for video in self.iterator(target_page_urls=page_urls, max_video_concurrency=videos_concurrency,
-                                         max_page_concurrency=pages_concurrency, video_link_extractor=extractor_videos, force_scraping=force_scraping,
-                                         on_video_error=on_video_error, on_page_error=on_page_error):
-            yield await video
+        listing = iterate_listing(self, page_urls, max_items=max_items, max_video_concurrency=videos_concurrency,
+                                  max_page_concurrency=pages_concurrency, extractor=extractor_videos, force_scraping=force_scraping,
+                                  on_video_error=on_video_error, on_page_error=on_page_error)
+        # The init() calls overlap (videos_concurrency at once) instead of running one after another
+        async for video in hydration_stage(listing, lambda item: item.init(), concurrency=videos_concurrency, ordered=ordered):
+            yield video
 
     async def get_subscriptions(self, pages: int = 5, pages_concurrency: int | None = None, videos_concurrency: int | None = None,
-                                on_video_error: on_error_hint = on_error, on_page_error: on_error_hint = None) -> AsyncGenerator[User, None]:
+                                on_video_error: on_error_hint = on_error, on_page_error: on_error_hint = None, max_items: int | None = None) -> AsyncGenerator[User, None]:
         """
         Get the account subscriptions.
         """
+        await self.ensure_login()
         if not self.logged:
             raise LoginFailed("Must be logged in to access subscriptions")
 
@@ -1398,7 +2088,7 @@ class Client(Helper):
         pages_concurrency = pages_concurrency or self.core.configuration.pages_concurrency
         assert videos_concurrency and pages_concurrency
         async for user in helper.get_subscriptions(url=url, pages=pages, pages_concurrency=pages_concurrency, videos_concurrency=videos_concurrency,
-                                                   on_video_error=on_video_error, on_page_error=on_page_error):
+                                                   on_video_error=on_video_error, on_page_error=on_page_error, max_items=max_items):
             yield user
 
     async def iterator(self, *args, force_scraping: bool = False, **kwargs):
@@ -1427,10 +2117,10 @@ class Client(Helper):
             url = video_data.pop("url")
             # If metadata says it's from search, we can treat it as api_data for the Video object
             # This avoids fetching the video page HTML during search/iteration
-            return Video(url, core=self.core, api_data=video_data, force_scraping=force)
+            return make_video(self.core, url, api_data=video_data, force_scraping=force)
         
         # If it's just a URL string, we create a Video object without fetching HTML yet
-        return Video(video_data, core=self.core, force_scraping=force)
+        return make_video(self.core, video_data, force_scraping=force)
 
     def enable_logging(self, log_file: str | None = None, level: int | None =None, log_ip: str | None = None, log_port: int | None = None):
         if not level:
@@ -1444,24 +2134,25 @@ class Client(Helper):
         :param force_scraping: (bool) Whether to force web scraping instead of using the API
         :return: (Video) The video object
         """
-        video = Video(url, core=self.core, force_scraping=force_scraping)
-        return await video.init()
+        video = await fetch_object(self.core, Video, url, force_scraping=force_scraping)
+        if force_scraping and not video.has_content:
+            await video.ensure_html() # Was hydrated through the API before
+
+        return video
 
     async def get_pornstar(self, url: str) -> Pornstar:
         """
         :param url: (str) The Pornstar URL
         :return: (Video) The Pornstar object
         """
-        pornstar = Pornstar(url, core=self.core)
-        return await pornstar.init()
+        return await fetch_object(self.core, Pornstar, url)
 
     async def get_gif(self, url: str) -> GIF:
         """
         param url: (str) The GIF URL
         :return: (GIF) The GIF object
         """
-        gif = GIF(url, core=self.core)
-        return await gif.init()
+        return await fetch_object(self.core, GIF, url)
 
     async def get_album(self, url: str) -> Album:
         """
@@ -1469,8 +2160,7 @@ class Client(Helper):
         :param url:
         :return:
         """
-        album = Album(url, core=self.core)
-        return await album.init()
+        return await fetch_object(self.core, Album, url)
 
     async def get_short(self, url: str) -> Short:
         """
@@ -1478,8 +2168,7 @@ class Client(Helper):
         :param url:
         :return:
         """
-        short = Short(url, core=self.core)
-        return await short.init()
+        return await fetch_object(self.core, Short, url)
 
     async def get_model(self, url: str) -> Model:
         """
@@ -1487,8 +2176,7 @@ class Client(Helper):
         :param url:
         :return:
         """
-        model = Model(url, core=self.core)
-        return await model.init()
+        return await fetch_object(self.core, Model, url)
 
     async def get_user(self, url: str) -> User:
         """
@@ -1496,27 +2184,100 @@ class Client(Helper):
         :param url:
         :return:
         """
-        user = User(url, core=self.core)
-        return await user.init()
+        return await fetch_object(self.core, User, url)
 
     async def get_playlist(self, url: str) -> Playlist:
-        playlist = Playlist(url=url, core=self.core)
-        return await playlist.init()
+        return await fetch_object(self.core, Playlist, url)
 
     async def get_channel(self, url: str) -> Channel:
-        channel = Channel(url=url, core=self.core)
-        return await channel.init()
+        return await fetch_object(self.core, Channel, url)
+
+    async def hydrate(self, videos: Iterable[Video | str] | AsyncIterable[Video | str], concurrency: int | None = None,
+                      fields: Iterable[str] | None = None, force: bool = False) -> AsyncGenerator[Video, None]:
+        """
+        Fetches the Webmaster API data for many videos at once and yields them as soon as they are done
+        (not in input order). Videos that appear multiple times are only requested and yielded once, and
+        requests for videos that are already being fetched elsewhere (e.g. video.init()) are shared.
+
+        Videos whose api_data was already fetched are yielded right away, videos that only have the data
+        from a search page are fetched again. If a request fails, the video is yielded without new data.
+
+        :param videos: Video objects or URLs, also works with a listing: client.hydrate(client.search_videos(...))
+        :param concurrency: Max requests at the same time (Default: videos_concurrency of the configuration)
+        :param fields: Only keep these keys of the API data (saves memory on large crawls)
+        :param force: Fetch the API data even if the video already has it
+        """
+        concurrency = concurrency or self.core.configuration.videos_concurrency
+        assert concurrency
+        fields = tuple(fields) if fields is not None else None
+        first: dict[str, Video] = {} # The instance that gets yielded for every video ID
+        waiting: dict[str, list[Video]] = {} # Duplicates of videos that are still being fetched
+
+        async def hydrate_one(video: Video) -> Video:
+            if video.video_id not in waiting:
+                return video # Already hydrated
+
+            try:
+                data = await get_video_api_data(self.core, video.video_id)
+
+            except Exception as e:
+                self.logger.warning(f"Failed to hydrate {video.url}: {e}")
+                waiting.pop(video.video_id, None)
+                return video
+
+            apply_api_data(video, data, fields=fields)
+            for duplicate in waiting.pop(video.video_id, []):
+                apply_api_data(duplicate, data, fields=fields)
+
+            return video
+
+        async def source() -> AsyncGenerator[Video | str, None]:
+            if isinstance(videos, AsyncIterable):
+                async for item in videos:
+                    yield item
+
+            else:
+                for item in videos:
+                    yield item
+
+        async def unique() -> AsyncGenerator[Video, None]:
+            # Only the first instance of every video goes on, duplicates get its data
+            async for video in source():
+                if isinstance(video, str):
+                    video = make_video(self.core, video)
+
+                video_id = video.video_id
+                if video_id in waiting:
+                    waiting[video_id].append(video)
+                    continue
+
+                if video_id in first:
+                    if video is not first[video_id] and first[video_id].api_data:
+                        video.api_data = dict(first[video_id].api_data)
+                    continue
+
+                first[video_id] = video
+                if force or not video.is_hydrated:
+                    waiting[video_id] = []
+
+                yield video
+
+        # Yields every video as soon as its request is done, leaving the loop cancels (and awaits) the running ones
+        async with aclosing(hydration_stage(unique(), hydrate_one, concurrency=concurrency, ordered=False)) as hydrated:
+            async for video in hydrated:
+                yield video
 
     async def search_gifs(self, query: str, category: Literal["gay", "transgender"] | None = None,
                           search_filter: Literal["mr", "mv", "tr"] | None = None,
-                          pages: int = 5,
+                          pages: int | Literal["all"] = 5,
                           pages_concurrency: int | None = None, videos_concurrency: int | None = None,
-                          on_video_error: on_error_hint = on_error, on_page_error: on_error_hint = None) -> AsyncGenerator[GIF, None]:
+                          on_video_error: on_error_hint = on_error, on_page_error: on_error_hint = None, max_items: int | None = None, ordered: bool = True) -> AsyncGenerator[GIF, None]:
         """
         :param search_filter: [mr = Most Recent, mv = Most Viewed, tr = Top Rated] Default: Most relevant
         :param category: [gay, transgender] Default: Straight
         :param query:
-        :param pages: Default: 5
+        :param pages: Max number of pages or "all", pages after the last one are never requested (Default: 5)
+        :param max_items: Stop after this many GIFs (only the pages needed for them are fetched)
         :param videos_concurrency:
         :param pages_concurrency:
         :return:
@@ -1531,27 +2292,36 @@ class Client(Helper):
         if search_filter:
             base_url += f"&o={search_filter}"
 
-        page_urls = [f"{base_url}&page={page}" for page in range(1, pages + 1)]
-        self.logger.debug(f"Processing: {len(page_urls)} pages...")
+        page_urls = PageURLs(lambda page: f"{base_url}&page={page}", pages)
+        self.logger.debug(f"Processing: {page_urls}...")
         videos_concurrency = videos_concurrency or self.core.configuration.videos_concurrency
         pages_concurrency = pages_concurrency or self.core.configuration.pages_concurrency
         assert videos_concurrency and pages_concurrency
-        async for gif in self.iterator(target_page_urls=page_urls, max_video_concurrency=videos_concurrency,
-                                         max_page_concurrency=pages_concurrency, video_link_extractor=extractor_gifs,
-                                       on_video_error=on_video_error, on_page_error=on_page_error):
-            yield await gif.init()
+        listing = iterate_listing(self, page_urls, max_items=max_items, max_video_concurrency=videos_concurrency,
+                                  max_page_concurrency=pages_concurrency, extractor=extractor_gifs,
+                                  on_video_error=on_video_error, on_page_error=on_page_error)
+        # The init() calls overlap (videos_concurrency at once) instead of running one after another
+        async for gif in hydration_stage(listing, lambda item: item.init(), concurrency=videos_concurrency, ordered=ordered):
+            yield gif
 
     async def search_videos(self, query: str, production_type: Literal["professional", "homemade"] | None = None,
                             sort_by: Literal["mr", "mv", "tr"] | None = None,
                             duration_min: Literal["10", "20", "30"] | None = None,
                             duration_max: Literal["10", "20", "30"] | None = None,
-                            pages: int = 5,
+                            pages: int | Literal["all"] = 5,
                             videos_concurrency: int | None = None,
                             pages_concurrency: int | None = None,
                             force_scraping: bool = False,
                             on_video_error: on_error_hint = on_error,
-                            on_page_error: on_error_hint = None
-                            ) -> AsyncGenerator[Video, None]:
+                            on_page_error: on_error_hint = None,
+                            summaries: bool = False,
+                            max_items: int | None = None
+                            ) -> AsyncGenerator[Video | VideoSummary, None]:
+        """
+        :param pages: Max number of pages or "all", pages after the last one are never requested
+        :param summaries: Yield VideoSummary records straight from the result pages instead of Video objects
+        :param max_items: Stop after this many videos (only the pages needed for them are fetched)
+        """
         base_url = f"https://www.pornhub.com/video/search?search={query}"
         if production_type:
             base_url += f"&p={production_type}"
@@ -1565,26 +2335,34 @@ class Client(Helper):
         if duration_max:
             base_url += f"&duration_max={duration_max}"
 
-        page_urls = [f"{base_url}&page={page}" for page in range(1, pages + 1)]
-        self.logger.debug(f"Processing: {len(page_urls)} pages...")
+        page_urls = PageURLs(lambda page: f"{base_url}&page={page}", pages)
+        self.logger.debug(f"Processing: {page_urls}...")
         videos_concurrency = videos_concurrency or self.core.configuration.videos_concurrency
         pages_concurrency = pages_concurrency or self.core.configuration.pages_concurrency
         assert videos_concurrency and pages_concurrency
-        async for video in self.iterator(target_page_urls=page_urls, max_video_concurrency=videos_concurrency,
-                                       max_page_concurrency=pages_concurrency, video_link_extractor=extractor_videos, force_scraping=force_scraping,
-                                         on_video_error=on_video_error, on_page_error=on_page_error):
+        async for video in iterate_listing(self, page_urls, max_items=max_items, max_video_concurrency=videos_concurrency,
+                                           max_page_concurrency=pages_concurrency, extractor=extractor_videos, force_scraping=force_scraping,
+                                           summaries=summaries, on_video_error=on_video_error, on_page_error=on_page_error):
             yield video
 
     async def search_hubtraffic(self, query: str,
                                  category: str | None = None,
                                  sort_by: Literal["newest", "mostviewed", "rating"] | None = None,
                                  period: Literal["weekly", "monthly", "alltime"] | None = None,
-                                 pages: int = 5,
+                                 pages: int | Literal["all"] = 5,
                                  pages_concurrency: int = 5,
-                                 ) -> AsyncGenerator[Video, None]:
+                                 summaries: bool = False,
+                                 max_items: int | None = None,
+                                 videos_concurrency: int | None = None,
+                                 ordered: bool = True,
+                                 ) -> AsyncGenerator[Video | VideoSummary, None]:
         """
         Search for videos using the HubTraffic API (Webmaster API).
         This is faster and provides pre-parsed metadata.
+        With summaries=True, VideoSummary records are yielded instead of Video objects.
+        pages="all" keeps going until a page has no new videos. max_items stops after that many videos,
+        without requesting the pages after them. Up to videos_concurrency videos are initialized at once,
+        ordered=False yields them as they finish instead of in listing order.
         """
         base_url = f"https://www.pornhub.com/webmasters/search?search={query}"
         if category:
@@ -1594,30 +2372,231 @@ class Client(Helper):
         if period:
             base_url += f"&period={period}"
 
-        page_urls = [f"{base_url}&page={page}" for page in range(1, pages + 1)]
-        self.logger.debug(f"Processing: {len(page_urls)} HubTraffic pages...")
+        page_urls = PageURLs(lambda page: f"{base_url}&page={page}", pages)
+        self.logger.debug(f"Processing: {page_urls} (HubTraffic)...")
+        seen = SeenKeys()
+        if max_items is not None:
+            if max_items <= 0:
+                return
 
-        # We can use a simpler concurrency model here since the API is JSON and fast
-        semaphore = asyncio.Semaphore(pages_concurrency)
+            page_urls.max_items = max_items
+            pages_concurrency = pages_needed(max_items, pages_concurrency)
 
-        async def fetch_page(url):
-            async with semaphore:
-                try:
-                    content = await get_html_content(core=self.core, url=url)
-                    assert isinstance(content, str)
-                    return extractor_hubtraffic(content)
-                except Exception as e:
-                    self.logger.error(f"Failed to fetch HubTraffic page {url}: {e}")
-                    return []
+        async def fetch_page(url: str) -> tuple[str, list | Exception]:
+            try:
+                content = await get_html_content(core=self.core, url=url)
+                assert isinstance(content, str), f"No content for {url}"
+                # Reserved right away, a video that's on two pages in flight is only yielded from the first one
+                video_data_list = seen.filter(await run_parser(self.core, extractor_hubtraffic, content), limit=max_items)
+                page_urls.observe(content, video_data_list)
+                return url, video_data_list
+
+            except Exception as e:
+                return url, e
+
+        async def items():
+            yielded = 0
+            # Pages are fetched concurrently, but at most pages_concurrency pages ahead of the consumer
+            async with aclosing(bounded_map(page_urls, fetch_page, ahead=pages_concurrency)) as pages:
+                async for url, video_data_list in pages:
+                    if isinstance(video_data_list, NotFound):
+                        break # Past the last page
+
+                    if isinstance(video_data_list, Exception):
+                        self.logger.error(f"Failed to fetch HubTraffic page {url}: {video_data_list}")
+                        page_urls.failed(url) # Ends a pages="all" listing, it would run forever otherwise
+                        continue
+
+                    for data in video_data_list:
+                        if not seen.admit(data["url"]):
+                            continue
+
+                        if summaries:
+                            yield VideoSummary.from_item(data)
+
+                        else:
+                            # Create Video object with pre-parsed data
+                            yield make_video(self.core, data["url"], api_data=data)
+
+                        yielded += 1
+                        if max_items is not None and yielded >= max_items:
+                            return
+
+        if summaries:
+            async with aclosing(items()) as listing:
+                async for summary in listing:
+                    yield summary
+
+            return
+
+        videos_concurrency = videos_concurrency or self.core.configuration.videos_concurrency
+        async for video in hydration_stage(items(), lambda video: video.init(), concurrency=videos_concurrency, ordered=ordered):
+            yield video
+
+
+def open_crawl_client(rate_limits: RateLimiter | None = None) -> Client:
+    """The client of a crawl worker, with a session of its own"""
+    return Client(core=BaseCore(), rate_limits=rate_limits)
+
+
+async def crawl_seed(client: Client, seed: str, pages: int | Literal["all"] = 1, max_items: int | None = None,
+                     summaries: bool = True) -> AsyncGenerator[VideoSummary | Video, None]:
+    """
+    The videos of one crawl seed, as VideoSummary records.
+    :param seed: A video, model, pornstar, user or channel URL, anything else is a search query
+    :param summaries: False yields the hydrated Video objects instead (tags, categories, likes, ...)
+    """
+    if not seed.startswith(("http://", "https://")):
+        videos = client.search_videos(seed, pages=pages, summaries=summaries, max_items=max_items)
+
+    elif "view_video.php" in seed:
+        video = await client.get_video(seed)
+        yield VideoSummary(url=video.url, title=video.title, thumb=video.thumbnail) if summaries else video
+        return
+
+    else:
+        if "/channels/" in seed:
+            owner = await client.get_channel(seed)
+
+        elif "/pornstar/" in seed:
+            owner = await client.get_pornstar(seed)
+
+        elif "/model/" in seed:
+            owner = await client.get_model(seed)
+
+        else:
+            owner = await client.get_user(seed)
+
+        videos = owner.get_videos(pages=pages, summaries=summaries, max_items=max_items)
+
+    async with aclosing(videos) as results:
+        async for result in results:
+            yield result
+
+
+def crawl(seeds: Iterable[str], workers: int = 4, pages: int | Literal["all"] = 1, max_items: int | None = None,
+          rate_limits: RateLimiter | None = None, limit: int | None = None, shutdown_timeout: float = 10.0) -> CrawlRunner:
+    """
+    Crawls many seeds (creator URLs or search queries) on a pool of worker processes, see modules/crawl.py.
+    Yields VideoSummary records, every video only once across all seeds and workers.
+
+    :param workers: Number of processes, each one runs its own Client
+    :param pages: Pages per seed
+    :param max_items: Videos per seed
+    :param rate_limits: The rate limits for the whole crawl (split across the workers)
+    :param limit: Stop after that many videos
+    """
+    return CrawlRunner(seeds, open_crawl_client, crawl_seed, workers=workers, options={"pages": pages, "max_items": max_items},
+                       rate_limits=rate_limits, key=lambda summary: summary.video_id, limit=limit,
+                       shutdown_timeout=shutdown_timeout)
+
+
+def seed_page_url(seed: str, page: int) -> str:
+    """The URL of a listing page of a crawl seed (a search query or a model, pornstar, user or channel URL)"""
+    if not seed.startswith(("http://", "https://")):
+        return f"https://www.pornhub.com/video/search?search={seed}&page={page}"
+
+    return f"{seed.rstrip('/')}/videos?page={page}"
+
+
+async def crawl_queue(client: Client, queue: WorkQueue, seeds: Iterable[str] = (), pages: int | Literal["all"] = 1,
+                      concurrency: int = 5, hydrate: bool = True, download_path: str | None = None, quality: str = "best",
+                      recover: bool = True, max_items: int | None = None) -> AsyncGenerator[Video | VideoSummary, None]:
+    """
+    Crawls through a WorkQueue (see modules/work_queue.py), so the crawl survives restarts: run it again with
+    the same queue and it continues with the pages, videos and downloads that weren't done yet.
+
+    Pages are fetched and turned into video tasks, videos are hydrated (Webmaster API) and yielded, and with
+    download_path they are queued for download as well. Failed tasks are retried up to queue.max_attempts times.
+
+    :param seeds: Search queries or video, model, pornstar, user or channel URLs, seeds that were added before are skipped
+    :param concurrency: Tasks that run at once
+    :param hydrate: Yield full Videos instead of the VideoSummary records from the listing pages
+    :param recover: Take over the tasks that were in flight when the last run died (only with a single runner per queue)
+    :param max_items: Videos per seed, no more video tasks (and pages) are queued for a seed once it has that many
+    """
+    if recover:
+        queue.recover()
+
+    seeds = [seed for seed in dict.fromkeys(seed.strip() for seed in seeds) if seed] # e.g. blank lines of a seed file
+    videos = [seed for seed in seeds if seed.startswith(("http://", "https://")) and "view_video.php" in seed]
+    queue.add_many("video", [(listing_key(seed), {"summary": VideoSummary(url=seed).as_dict()}) for seed in videos])
+    queue.add_many("page", [(seed_page_url(seed, 1), {"seed": seed, "page": 1, "pages": pages})
+                            for seed in seeds if seed not in videos])
+
+    extract = bind_extractor(client.core, extractor_videos) # No SeenKeys, the queue drops the videos it already has
+
+    async def run_page(task: WorkTask) -> list:
+        content = await get_html_content(core=client.core, url=task.key)
+        assert isinstance(content, str)
+        items = await extract(content)
+        found = task.payload.get("found", 0) # Videos queued by the earlier pages of the seed
+        if max_items is not None:
+            items = items[:max(0, max_items - found)]
+
+        queue.add_many("video", [(listing_key(item), {"summary": VideoSummary.from_item(item).as_dict()}) for item in items])
+        found += len(items)
+
+        page, limit = task.payload["page"], task.payload["pages"]
+        last_page = detect_last_page(content)
+        if (items and (limit == "all" or page < limit) and (last_page is None or page < last_page)
+                and (max_items is None or found < max_items)):
+            queue.add("page", seed_page_url(task.payload["seed"], page + 1), {**task.payload, "page": page + 1, "found": found})
+
+        return []
+
+    async def run_video(task: WorkTask) -> list:
+        summary = VideoSummary(**task.payload["summary"])
+        result = await summary.promote(client.core) if hydrate else summary
+        if download_path is not None:
+            queue.add("download", task.key, {"url": summary.url})
+
+        return [result]
+
+    async def run_download(task: WorkTask) -> list:
+        video = await client.get_video(task.payload["url"])
+        await video.download(quality=quality, path=download_path)
+        return []
+
+    runners = {"page": run_page, "video": run_video, "download": run_download}
+    started: set[int] = set()
+
+    async def run(task: WorkTask) -> list:
+        started.add(task.id)
+        try:
+            results = await runners[task.kind](task)
 
-        # Fetch all pages concurrently
-        tasks = [fetch_page(url) for url in page_urls]
-        for completed_task in asyncio.as_completed(tasks):
-            video_data_list = await completed_task
-            for data in video_data_list:
-                # Create Video object with pre-parsed data
-                video = Video(url=data["url"], core=self.core, api_data=data)
-                yield await video.init()
+        except asyncio.CancelledError:
+            queue.release(task) # Stopped from the outside, not the task's fault
+            raise
+
+        except Exception as e:
+            client.logger.error(f"Crawl task {task} failed: {e}")
+            queue.fail(task, e)
+            return []
+
+        queue.complete(task)
+        return results
+
+    while True:
+        tasks = queue.lease(limit=concurrency * 4)
+        if not tasks:
+            if not queue.unfinished():
+                return
+
+            await asyncio.sleep(1) # The rest is leased by another runner
+            continue
+
+        try:
+            async with aclosing(hydration_stage(tasks, run, concurrency=concurrency, ordered=False)) as finished:
+                async for results in finished:
+                    for result in results:
+                        yield result
+
+        finally:
+            for task in tasks:
+                if task.id not in started:
+                    queue.release(task) # Leased, but the consumer stopped before it ran
 
 
 def str_to_bool(val: str) -> bool:
@@ -1628,6 +2607,12 @@ def can_download(state: dict) -> bool:
         return True
     return state["downloaded"] < state["limit"]
 
+def remaining(state: dict) -> int | None:
+    """How many items the listings still need to produce for --limit (None = no limit)"""
+    if state["limit"] is None:
+        return None
+    return max(0, state["limit"] - state["downloaded"])
+
 async def _cli_download_video_generator(generator, args, no_title: bool, state: dict):
     async for video in generator:
         if not can_download(state): break
@@ -1682,7 +2667,7 @@ async def _cli_process_url(client: Client, url: str, args, no_title: bool, state
             
         elif "/album/" in url:
             album = await client.get_album(url)
-            async for photo in album.get_photos(pages=args.pages):
+            async for photo in album.get_photos(pages=args.pages, max_items=remaining(state)):
                 if not can_download(state): break
                 await album.download_photo(photo["download_url"], path=args.output)
                 state["downloaded"] += 1
@@ -1702,12 +2687,141 @@ async def _cli_process_url(client: Client, url: str, args, no_title: bool, state
                 print(f"Unsupported or unrecognized URL format: {url}")
                 return
 
-            await _cli_download_video_generator(obj.get_videos(pages=args.pages), args, no_title, state)
+            await _cli_download_video_generator(obj.get_videos(pages=args.pages, max_items=remaining(state)), args, no_title, state)
                 
     except Exception as e:
         print(f"Error processing {url}: {e}")
 
+async def _cli_crawl_queue(seeds: list[str], pages: int | Literal["all"], args, rate_limits: RateLimiter | None):
+    queue = WorkQueue(args.queue)
+    client = Client(rate_limits=rate_limits)
+    output = open(args.output, "a", encoding="utf-8") if args.output else sys.stdout # Appends, the run may be a resumed one
+    try:
+        crawl_run = crawl_queue(client, queue, seeds=seeds, pages=pages, hydrate=False, download_path=args.download_to,
+                                quality=args.quality, concurrency=args.workers, max_items=args.max_items)
+        written = 0
+        async with aclosing(crawl_run) as summaries:
+            async for summary in summaries:
+                output.write(json.dumps(summary.as_dict(), ensure_ascii=False) + "\n")
+                written += 1
+                if args.limit is not None and written >= args.limit:
+                    break # The rest stays in the queue for the next run
+
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    for kind, key, error in queue.failures():
+        print(f"Failed: {kind} {key}: {error}", file=sys.stderr)
+
+    print(f"Crawled {queue.counts()}", file=sys.stderr)
+    queue.close()
+
+
+async def run_crawl(argv: list[str]):
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="phub crawl", description="Crawl many creators / search queries on several processes")
+    parser.add_argument("seeds", nargs="*", help="Video, model, pornstar, user or channel URLs, anything else is a search query")
+    parser.add_argument("--file", type=str, help="(Optional) A file with one seed per line")
+    parser.add_argument("--workers", type=int, default=4, help="Number of worker processes, or of tasks at once with --queue (Default: 4)")
+    parser.add_argument("--pages", type=str, default="1", help="Pages per seed, or 'all' (Default: 1)")
+    parser.add_argument("--max-items", type=int, default=None, help="Maximum number of videos per seed")
+    parser.add_argument("--limit", type=int, default=None, help="Maximum number of videos in total")
+    parser.add_argument("--rps", type=float, default=None, help="Requests per second to pornhub.com, for all workers together")
+    parser.add_argument("--output", type=str, default=None, help="JSON lines file to write to (Default: stdout)")
+    parser.add_argument("--queue", type=str, default=None, help="Crawl through a resumable SQLite work queue (one process), "
+                                                                 "running the same command again continues where it stopped")
+    parser.add_argument("--download-to", type=str, default=None, help="With --queue: also download the videos to this directory")
+    parser.add_argument("--quality", type=str, default="best", help="With --download-to: the video quality (Default: best)")
+    args = parser.parse_args(argv)
+
+    seeds = list(args.seeds)
+    if args.file:
+        with open(args.file, "r") as file:
+            seeds.extend(file.read().splitlines())
+
+    if not seeds and not args.queue: # A queue can be resumed without seeds
+        parser.error("No seeds given")
+
+    pages = "all" if args.pages == "all" else int(args.pages)
+    rate_limits = RateLimiter({"*pornhub.com": HostLimit(requests_per_second=args.rps)}) if args.rps else None
+    if args.queue:
+        return await _cli_crawl_queue(seeds, pages, args, rate_limits)
+
+    runner = crawl(seeds, workers=args.workers, pages=pages, max_items=args.max_items, rate_limits=rate_limits, limit=args.limit)
+
+    output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        async with aclosing(runner.run()) as summaries:
+            async for summary in summaries:
+                output.write(json.dumps(summary.as_dict(), ensure_ascii=False) + "\n")
+
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    for seed, error in runner.errors:
+        print(f"Failed: {seed}: {error}", file=sys.stderr)
+
+    print(f"Crawled {runner.stats()}", file=sys.stderr)
+
+
+async def run_export(argv: list[str]):
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="phub export", description="Export the metadata of videos to JSON lines, CSV or Parquet")
+    parser.add_argument("seeds", nargs="*", help="Video, model, pornstar, user or channel URLs, anything else is a search query")
+    parser.add_argument("--file", type=str, help="(Optional) A file with one seed per line")
+    parser.add_argument("--output", type=str, required=True, help="The file to write to, '-' for stdout")
+    parser.add_argument("--format", type=str, choices=list(SINKS), default=None, help="(Default: from the extension of --output)")
+    parser.add_argument("--pages", type=str, default="1", help="Pages per seed, or 'all' (Default: 1)")
+    parser.add_argument("--max-items", type=int, default=None, help="Maximum number of videos per seed")
+    parser.add_argument("--limit", type=int, default=None, help="Maximum number of rows in total")
+    parser.add_argument("--summaries", action="store_true", help="Only the listing data (no tags, categories or likes), "
+                                                                 "but no request per video")
+    parser.add_argument("--batch-size", type=int, default=None, help="Rows per write / Parquet row group")
+    parser.add_argument("--rps", type=float, default=None, help="Requests per second to pornhub.com")
+    args = parser.parse_args(argv)
+
+    seeds = list(args.seeds)
+    if args.file:
+        with open(args.file, "r") as file:
+            seeds.extend(file.read().splitlines())
+
+    if not seeds:
+        parser.error("No seeds given")
+
+    pages = "all" if args.pages == "all" else int(args.pages)
+    rate_limits = RateLimiter({"*pornhub.com": HostLimit(requests_per_second=args.rps)}) if args.rps else None
+    client = Client(rate_limits=rate_limits)
+    seen = SeenKeys() # A video of several seeds is exported once
+
+    async def videos():
+        for seed in seeds:
+            try:
+                async with aclosing(crawl_seed(client, seed, pages=pages, max_items=args.max_items, summaries=args.summaries)) as results:
+                    async for video in results:
+                        if seen.admit(video.url):
+                            yield video
+
+            except Exception as e:
+                print(f"Failed: {seed}: {e}", file=sys.stderr)
+
+    options = {"batch_size": args.batch_size} if args.batch_size else {}
+    written = await export(videos(), args.output, format=args.format, limit=args.limit, **options)
+    print(f"Exported {written} videos to {args.output}", file=sys.stderr)
+
+
 async def run_main():
+    if sys.argv[1:2] == ["crawl"]:
+        return await run_crawl(sys.argv[2:])
+
+    if sys.argv[1:2] == ["export"]:
+        return await run_export(sys.argv[2:])
+
+    import argparse
+
     parser = argparse.ArgumentParser(description="PornHub API Command Line Interface")
     parser.add_argument("--download", metavar="URL (str)", type=str, help="URL to download from")
     parser.add_argument("--quality", metavar="best,half,worst", type=str, help="The video quality (best,half,worst)", required=True)
@@ -1717,6 +2831,7 @@ async def run_main():
     parser.add_argument("--pages", metavar="Pages (int)", type=int, default=1, help="Number of pages to fetch for iterables (Default: 1)")
     parser.add_argument("--email", type=str, help="Account email for login", default=None)
     parser.add_argument("--password", type=str, help="Account password for login", default=None)
+    parser.add_argument("--session", type=str, help="Keep the login in this file and reuse it next time", default=None)
     parser.add_argument("--id-as-title", action="store_true", help="Use the video ID as the output title")
     parser.add_argument("--limit", type=int, default=None, help="Maximum number of videos to download")
     parser.add_argument("--liked", action="store_true", help="Download liked/favorite videos (requires login)")
@@ -1727,7 +2842,8 @@ async def run_main():
     no_title = str_to_bool(args.no_title)
 
     login = False
-    client = Client(email=args.email, password=args.password, login=False)
+    session_store = SessionStore(args.session) if args.session else None
+    client = Client(email=args.email, password=args.password, login=False, session_store=session_store)
     if args.email and args.password:
         login = True
         await client.login()
@@ -1750,11 +2866,11 @@ async def run_main():
 
     if login:
         if getattr(args, "liked", False):
-            await _cli_download_video_generator(client.get_favorites(pages=args.pages), args, no_title, state)
+            await _cli_download_video_generator(client.get_favorites(pages=args.pages, max_items=remaining(state)), args, no_title, state)
         if getattr(args, "recommended", False):
-            await _cli_download_video_generator(client.get_recommended(pages=args.pages), args, no_title, state)
+            await _cli_download_video_generator(client.get_recommended(pages=args.pages, max_items=remaining(state)), args, no_title, state)
         if getattr(args, "watched", False):
-            await _cli_download_video_generator(client.get_history(pages=args.pages), args, no_title, state)
+            await _cli_download_video_generator(client.get_history(pages=args.pages, max_items=remaining(state)), args, no_title, state)
     else:
         if getattr(args, "liked", False) or getattr(args, "recommended", False) or getattr(args, "watched", False):
             print("Warning: --liked, --recommended, and --watched require --email and --password to work. Skipping.")
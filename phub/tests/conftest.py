@@ -0,0 +1,94 @@
+import asyncio
+import pytest
+
+from types import SimpleNamespace
+from typing import Any, Callable
+
+
+class FakeClock:
+    """A clock (call it for the time) with a sleep that only moves the time forward"""
+    def __init__(self, now: float = 0.0):
+        self.now = now
+        self.slept: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float):
+        self.slept.append(seconds)
+        self.now += seconds
+        await asyncio.sleep(0)
+
+
+class FakeCore:
+    """
+    A core without a session: a configuration and a fetch() that records the URLs and how many requests overlap.
+    respond(url) decides the answer (exceptions are raised), the default is a small page with the URL in it.
+    """
+    def __init__(self, respond: Callable[[str], Any] | None = None, delay: float = 0, **configuration):
+        self.configuration = SimpleNamespace(**configuration)
+        self.respond = respond or (lambda url: f"<html>{url}</html>")
+        self.delay = delay
+        self.requested: list[str] = []
+        self.running = 0
+        self.max_running = 0
+
+    async def fetch(self, url: str, **kwargs):
+        self.requested.append(url)
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await asyncio.sleep(self.delay) # Always gives the other tasks a turn, like a real request
+            result = self.respond(url)
+
+        finally:
+            self.running -= 1
+
+        if isinstance(result, BaseException):
+            raise result
+
+        return result
+
+
+def failing(times: int, error: BaseException, then: Callable[[str], Any] = lambda url: f"<html>{url}</html>"):
+    """respond() for a core whose first `times` requests fail with error"""
+    def respond(url: str):
+        nonlocal times
+        times -= 1
+        return error if times >= 0 else then(url)
+
+    return respond
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+@pytest.fixture
+def make_clocked() -> Callable[..., tuple[Any, FakeClock]]:
+    """
+    Puts a FakeClock into the clock / sleep attributes of an object (limiter, policy, breaker, pool, catalog, ...):
+    limiter, clock = make_clocked(RateLimiter(...))
+    """
+    def attach(obj: Any, now: float = 0.0) -> tuple[Any, FakeClock]:
+        clock = FakeClock(now)
+        if hasattr(obj, "clock"):
+            obj.clock = clock
+
+        if hasattr(obj, "sleep"):
+            obj.sleep = clock.sleep
+
+        return obj, clock
+
+    return attach
+
+
+@pytest.fixture
+def make_core() -> type[FakeCore]:
+    return FakeCore
+
+
+@pytest.fixture
+def make_failing() -> Callable[..., Callable[[str], Any]]:
+    return failing
@@ -0,0 +1,109 @@
+import pytest
+
+from types import SimpleNamespace
+from phub.phub import VideoSummary
+from phub.modules.catalog import Catalog, creator_key, item_kind
+
+
+def video(key: str, **values) -> SimpleNamespace:
+    """Looks like a hydrated Video"""
+    data = {"url": f"https://www.pornhub.com/view_video.php?viewkey={key}", "video_id": key, "title": f"Video {key}",
+            "duration": 600, "views": "100", "likes": "10", "rating_percent": "80", "publish_date": "2024-01-01 00:00:00",
+            "thumbnail": None, "tags": ["solo"], "categories": ["Amateur"]}
+    return SimpleNamespace(**{**data, **values})
+
+
+async def listing(items: list):
+    for item in items:
+        yield item
+
+
+@pytest.fixture
+def catalog(make_clocked):
+    catalog, _ = make_clocked(Catalog(":memory:", batch_size=2), now=1000.0)
+    yield catalog
+    catalog.close()
+
+
+def test_keys():
+    assert creator_key("https://www.pornhub.com/model/some-one/videos") == ("model/some-one", "model")
+    assert creator_key(SimpleNamespace(url="https://www.pornhub.com/channels/studio")) == ("channel/studio", "channel")
+    assert creator_key("https://www.pornhub.com/view_video.php?viewkey=x") is None
+    assert item_kind("https://www.pornhub.com/gif/123") == "gif"
+    assert item_kind("https://www.pornhub.com/users/x") == "creator"
+
+
+@pytest.mark.asyncio
+async def test_sync_records_first_and_last_seen_and_deltas(catalog):
+    model = SimpleNamespace(url="https://www.pornhub.com/model/x", name="X")
+    report = await catalog.sync(listing([video("a"), video("b"), video("c", tags=["duo", "solo"])]), creator=model)
+    assert report == {"seen": 3, "new": 4, "changed": 0} # Three videos and the model
+
+    catalog.clock.now = 2000.0
+    report = await catalog.sync(listing([video("a", views="150", likes="12", rating_percent="82.5"), video("b"), video("d")]), creator=model)
+    assert report == {"seen": 3, "new": 1, "changed": 1}
+
+    a = catalog.video("a")
+    assert (a["first_seen"], a["last_seen"], a["changed_at"]) == (1000.0, 2000.0, 2000.0)
+    assert (a["views"], a["views_delta"], a["likes_delta"], a["rating_delta"]) == (150, 50, 2, 2.5)
+    assert catalog.video("b")["views_delta"] == 0 and catalog.video("b")["changed_at"] is None
+    assert catalog.video("c")["tags"] == ["duo", "solo"] and catalog.video("c")["categories"] == ["Amateur"]
+    assert catalog.creators() == [{"id": "model/x", "kind": "model", "url": model.url, "name": "X",
+                                   "first_seen": 1000.0, "last_seen": 2000.0, "videos": 4}]
+
+
+@pytest.mark.asyncio
+async def test_summaries_dont_erase_known_values(catalog):
+    await catalog.sync(listing([video("a")]))
+    catalog.clock.now = 2000.0
+    await catalog.sync(listing([VideoSummary(url="https://www.pornhub.com/view_video.php?viewkey=a", title="Renamed", duration="10:00")]))
+    a = catalog.video("a")
+    assert (a["title"], a["likes"], a["views"], a["tags"]) == ("Renamed", 10, 100, ["solo"])
+    assert a["changed_at"] is None and a["last_seen"] == 2000.0
+
+
+@pytest.mark.asyncio
+async def test_local_queries(catalog):
+    await catalog.sync(listing([
+        video("a", duration=300, publish_date="2024-01-01", tags=["solo"]),
+        video("b", duration=900, publish_date="2024-03-01", tags=["duo"]),
+        video("c", duration=1800, publish_date="2024-02-01", tags=["solo", "duo"]),
+    ]), creator="https://www.pornhub.com/pornstar/p")
+    catalog.clock.now = 5000.0
+    await catalog.sync(listing([video("e", publish_date="2024-04-01", tags=[])]))
+
+    ids = lambda rows: [row["id"] for row in rows]
+    assert ids(catalog.videos(creator="pornstar/p")) == ["b", "c", "a"]
+    assert ids(catalog.videos(tag="solo", order_by="duration", descending=False)) == ["a", "c"]
+    assert ids(catalog.videos(min_duration=600, max_duration=1000)) == ["e", "b"]
+    assert ids(catalog.videos(published_after="2024-02-01", limit=2)) == ["e", "b"]
+    assert ids(catalog.videos(since=5000.0)) == ["e"]
+    assert catalog.tags() == [("duo", 2), ("solo", 2)]
+    with pytest.raises(ValueError):
+        catalog.videos(order_by="id; DROP TABLE videos")
+
+
+@pytest.mark.asyncio
+async def test_track_stores_what_was_consumed(catalog):
+    items = [video(str(i)) for i in range(5)]
+    tracked = catalog.track(listing(items))
+    async for item in tracked:
+        if item.video_id == "2":
+            break
+
+    await tracked.aclose()
+    assert catalog.counts()["videos"] == 3
+
+
+@pytest.mark.asyncio
+async def test_collections_gifs_and_creators(catalog):
+    playlist = SimpleNamespace(url="https://www.pornhub.com/playlist/42", title="Mine")
+    await catalog.sync(listing([video("b"), video("a")]), collection=playlist)
+    assert catalog.collection(playlist) == ["b", "a"]
+
+    await catalog.sync(listing([video("a")]), collection="https://www.pornhub.com/playlist/42")
+    assert catalog.collection(playlist) == ["a"] # Replaced as a whole
+
+    await catalog.sync(listing([SimpleNamespace(url="https://www.pornhub.com/gif/7", title="A gif"),
+                                SimpleNamespace(url="https://www.pornhub.com/users/u")]))
+    assert catalog.counts() == {"videos": 2, "gifs": 1, "creators": 1, "collections": 1}
@@ -77,7 +77,10 @@ async def test_cli_iterable_limit(tmp_path):
         mock_v2 = AsyncMock()
         mock_v3 = AsyncMock()
         
-        async def mock_get_videos(pages=1):
+        requested = {}
+
+        async def mock_get_videos(pages=1, max_items=None):
+            requested["max_items"] = max_items
             yield mock_v1
             yield mock_v2
             yield mock_v3
@@ -101,3 +104,4 @@ async def test_cli_iterable_limit(tmp_path):
         mock_v1.download.assert_called_once()
         mock_v2.download.assert_called_once()
         mock_v3.download.assert_not_called()
+        assert requested["max_items"] == 2 # --limit is pushed down into the listing
@@ -0,0 +1,73 @@
+import asyncio
+import pytest
+
+from types import SimpleNamespace
+from base_api.modules.errors import NetworkingError, BotProtectionDetected
+from phub.phub import send_request, classify_outcome
+from phub.modules.concurrency import AIMDController, set_concurrency_controller
+
+
+def test_additive_increase_and_bounds():
+    controller = AIMDController(initial=4, max_limit=6)
+    for _ in range(5):
+        controller.record("success", controller.clock(), 0.1)
+    assert controller.current_limit == 5 # About one window of successes adds one
+
+    for _ in range(100):
+        controller.record("success", controller.clock(), 0.1)
+    assert controller.current_limit == 6
+    assert [decision["action"] for decision in controller.decisions] == ["increase", "increase"]
+
+
+def test_no_increase_on_slow_requests():
+    controller = AIMDController(initial=4, latency_target=1.0)
+    for _ in range(20):
+        controller.record("success", controller.clock(), 2.0)
+    assert controller.current_limit == 4
+
+
+def test_multiplicative_decrease_once_per_round_trip():
+    controller = AIMDController(initial=16, min_limit=2)
+    started = controller.clock()
+    for _ in range(5):
+        controller.record("overload", started, 0.5, reason="HTTP 429")
+    assert controller.current_limit == 8
+
+    controller.record("overload", controller.clock(), 0.5)
+    assert controller.current_limit == 4
+    for _ in range(5):
+        controller.record("overload", controller.clock(), 0.5)
+    assert controller.current_limit == 2
+    assert controller.metrics()["overloads"] == 11
+
+
+def test_classify_outcome():
+    assert classify_outcome(error=BotProtectionDetected("x"))[0] == "overload"
+    assert classify_outcome(error=NetworkingError("429 Rate Limited"))[0] == "overload"
+    assert classify_outcome(error=NetworkingError("Server error 503"))[0] == "overload"
+    assert classify_outcome(error=NetworkingError("timeout"))[0] == "error"
+    assert classify_outcome(SimpleNamespace(status_code=404))[0] == "success"
+    assert classify_outcome("<html></html>")[0] == "success"
+
+
+@pytest.mark.asyncio
+async def test_send_request_respects_limit(make_core):
+    core = make_core(delay=0.005)
+    controller = AIMDController(initial=3, max_limit=3)
+    set_concurrency_controller(core, controller)
+    await asyncio.gather(*(send_request(core, f"https://www.pornhub.com/{i}") for i in range(20)))
+    assert core.max_running == 3
+    assert controller.metrics()["successes"] == 20
+    assert controller.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_send_request_backs_off(make_core, make_failing):
+    core = make_core(make_failing(3, NetworkingError("HTTP 503")), delay=0.005)
+    controller = AIMDController(initial=8)
+    set_concurrency_controller(core, controller)
+    results = await asyncio.gather(*(send_request(core, "https://www.pornhub.com/") for _ in range(8)), return_exceptions=True)
+    assert sum(isinstance(result, NetworkingError) for result in results) == 3
+    # All failures were in the same round trip, so there was only one cut (8 -> 4, then growing again)
+    assert [decision["action"] for decision in controller.decisions].count("decrease") == 1
+    assert 4 <= controller.current_limit < 8
@@ -0,0 +1,63 @@
+import pytest
+
+from contextlib import aclosing
+from phub.modules.crawl import CrawlRunner, shard_seeds, shard_of, share_of, split_rate_limits
+from phub.modules.rate_limit import RateLimiter, HostLimit
+
+
+# Workers are separate (spawned) processes, so these have to be importable module level functions
+def open_client(rate_limits):
+    return {"rate_limits": rate_limits}
+
+
+async def crawl_seed(client, seed: str, count: int = 3):
+    if seed == "broken":
+        raise ValueError("no such seed")
+
+    limiter = client["rate_limits"]
+    yield {"key": "shared", "seed": seed} # Every seed finds this one
+    for index in range(count):
+        yield {"key": f"{seed}-{index}", "seed": seed, "requests_per_second": limiter and limiter.rules["*"].requests_per_second}
+
+
+def test_shards_are_stable_and_unique():
+    seeds = [f"query {n}" for n in range(20)] + ["query 3", " query 4 ", ""]
+    shards = shard_seeds(seeds, 4)
+    assert sorted(seed for shard in shards for seed in shard) == sorted(f"query {n}" for n in range(20))
+    assert all(shard_of(seed, 4) == index for index, shard in enumerate(shards) for seed in shard)
+    assert shard_seeds(seeds, 4) == shards
+
+
+def test_rate_limits_are_split():
+    rules, default = split_rate_limits(RateLimiter({"*.phncdn.com": HostLimit(bytes_per_second=8000, burst=2)},
+                                                   default=HostLimit(requests_per_second=4)), 4)
+    assert rules["*.phncdn.com"].bytes_per_second == 2000 and rules["*.phncdn.com"].burst == 1
+    assert default.requests_per_second == 1
+    assert share_of(None, 4) is None and split_rate_limits(None, 4) is None
+
+
+@pytest.mark.asyncio
+async def test_crawl_merges_and_deduplicates():
+    seeds = ["a", "b", "c", "broken", "a"]
+    runner = CrawlRunner(seeds, open_client, crawl_seed, workers=2, options={"count": 2},
+                         rate_limits=RateLimiter({"*": HostLimit(requests_per_second=10)}), key=lambda record: record["key"])
+    records = [record async for record in runner]
+
+    keys = [record["key"] for record in records]
+    assert sorted(keys) == sorted(["shared", "a-0", "a-1", "b-0", "b-1", "c-0", "c-1"])
+    assert runner.counts["duplicates"] == 2 # "shared" from the other two seeds
+    assert runner.counts["seeds"] == 4
+    assert [seed for seed, _ in runner.errors] == ["broken"]
+    workers = len(runner.shards)
+    assert all(record["requests_per_second"] == 10 / workers for record in records if record["key"] != "shared")
+
+
+@pytest.mark.asyncio
+async def test_crawl_stops_workers_on_exit():
+    runner = CrawlRunner([f"seed {n}" for n in range(8)], open_client, crawl_seed, workers=2, options={"count": 100_000},
+                         key=lambda record: record["key"], limit=5, shutdown_timeout=5)
+    async with aclosing(runner.run()) as records:
+        results = [record async for record in records]
+
+    assert len(results) == 5 and not runner.errors
+    assert runner.counts["seeds"] < 8 # The workers stopped instead of crawling everything
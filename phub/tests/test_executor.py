@@ -0,0 +1,39 @@
+import os
+import pytest
+
+from types import SimpleNamespace
+from phub.modules.executor import ParseExecutor, run_parser
+from phub.modules.consts import extractor_videos, extractor_users
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def fixture(name: str) -> str:
+    with open(os.path.join(FIXTURES, name), "r", encoding="utf-8") as file:
+        return file.read()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("kind", ["thread", "process"])
+async def test_parse_executor(kind):
+    executor = ParseExecutor(kind=kind, max_workers=2)
+    core = SimpleNamespace(configuration=SimpleNamespace(parse_executor=executor))
+    try:
+        for extractor, page in [(extractor_videos, "search_videos.html"), (extractor_users, "subscriptions.html")]:
+            content = fixture(page)
+            assert await run_parser(core, extractor, content) == extractor(content)
+
+    finally:
+        executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_without_executor():
+    core = SimpleNamespace(configuration=SimpleNamespace())
+    content = fixture("search_videos.html")
+    assert await run_parser(core, extractor_videos, content) == extractor_videos(content)
+
+
+def test_invalid_kind():
+    with pytest.raises(ValueError):
+        ParseExecutor(kind="fiber")
@@ -0,0 +1,143 @@
+import csv
+import json
+import asyncio
+import pytest
+from unittest.mock import patch
+
+from phub.phub import VideoSummary, run_export
+from phub.modules.export import export, export_row, open_sink, guess_format, EXPORT_FIELDS, JSONLSink, CSVSink
+
+
+class FakeVideo:
+    """Looks like a hydrated Video: duration in seconds, views as a string, a property that fails"""
+    url = "https://www.pornhub.com/view_video.php?viewkey=abc"
+    video_id = "abc"
+    title = "Some title"
+    duration = 623
+    views = "1,234"
+    likes = "56"
+    rating_percent = "87.5"
+    publish_date = "2024-01-02 03:04:05"
+    thumbnail = "https://ei.phncdn.com/abc.jpg"
+    tags = ["one", "two"]
+    categories = {"a": "Amateur"}
+
+    @property
+    def author_thumbnail(self):
+        raise AttributeError("No watch page")
+
+
+async def listing(count: int):
+    for i in range(count):
+        yield VideoSummary(url=f"https://www.pornhub.com/view_video.php?viewkey=v{i}", title=f"Video {i}",
+                           duration="1:02:03", views=i, rating="90%")
+
+
+def test_rows_are_schema_stable():
+    summary = export_row(VideoSummary(url="https://www.pornhub.com/view_video.php?viewkey=x1", duration="10:23", thumb="t.jpg"))
+    video = export_row(FakeVideo())
+    assert list(summary) == list(video) == list(EXPORT_FIELDS)
+    assert summary["video_id"] == "x1" and summary["duration"] == 623 and summary["thumbnail"] == "t.jpg"
+    assert summary["views"] is None and summary["tags"] == []
+    assert video == {"url": FakeVideo.url, "video_id": "abc", "title": "Some title", "duration": 623, "views": 1234, "likes": 56,
+                     "rating": 87.5, "publish_date": "2024-01-02 03:04:05", "thumbnail": "https://ei.phncdn.com/abc.jpg",
+                     "tags": ["one", "two"], "categories": ["Amateur"]}
+    assert export_row({"url": "u", "views": "12"})["views"] == 12
+
+
+def test_formats():
+    assert guess_format("out.CSV") == "csv"
+    assert guess_format("out.parquet") == "parquet"
+    assert guess_format("out.txt") == "jsonl"
+    assert isinstance(open_sink("out.csv"), CSVSink)
+    with pytest.raises(ValueError):
+        open_sink("out", format="xml")
+
+
+@pytest.mark.asyncio
+async def test_jsonl_export_in_batches(tmp_path):
+    path = str(tmp_path / "videos.jsonl")
+    written = await export(listing(25), path, batch_size=10)
+    assert written == 25
+    with open(path, encoding="utf-8") as file:
+        rows = [json.loads(line) for line in file]
+
+    assert [row["title"] for row in rows] == [f"Video {i}" for i in range(25)]
+    assert rows[3]["duration"] == 3723 and rows[3]["views"] == 3 and rows[3]["rating"] == 90.0
+
+
+@pytest.mark.asyncio
+async def test_csv_export_and_limit(tmp_path):
+    path = str(tmp_path / "videos.csv")
+    videos = listing(100)
+    assert await export(videos, path, limit=5) == 5
+    assert videos.ag_running is False and videos.ag_frame is None # The listing got closed
+
+    async with open_sink(str(tmp_path / "full.csv"), batch_size=1) as sink:
+        await sink.write(FakeVideo())
+
+    with open(path, encoding="utf-8", newline="") as file:
+        assert len(list(csv.DictReader(file))) == 5
+
+    with open(tmp_path / "full.csv", encoding="utf-8", newline="") as file:
+        row = next(csv.DictReader(file))
+    assert row["tags"] == "one;two" and row["views"] == "1234"
+
+
+@pytest.mark.asyncio
+async def test_empty_exports_are_valid(tmp_path):
+    assert await export(listing(0), str(tmp_path / "empty.csv")) == 0
+    with open(tmp_path / "empty.csv", encoding="utf-8") as file:
+        assert file.read().strip() == ",".join(EXPORT_FIELDS)
+
+
+@pytest.mark.asyncio
+async def test_one_batch_in_flight(tmp_path):
+    """The writer thread is slow, write() waits instead of piling up batches"""
+    sink = JSONLSink(str(tmp_path / "slow.jsonl"), batch_size=2)
+    written_batches = []
+    release = asyncio.Event()
+    loop = asyncio.get_running_loop()
+
+    def slow_write(rows):
+        asyncio.run_coroutine_threadsafe(release.wait(), loop).result()
+        written_batches.append(len(rows))
+
+    sink._write_batch = slow_write
+    for i in range(3):
+        await asyncio.wait_for(sink.write({"url": str(i)}), 1) # The first batch is writing, the second one fills up
+
+    fourth = asyncio.create_task(sink.write({"url": "3"}))
+    await asyncio.sleep(0.05)
+    assert not fourth.done() # The second batch has to wait for the first one
+    release.set()
+    await fourth
+    sink._finish = lambda: None
+    await sink.close()
+    assert written_batches == [2, 2]
+
+
+@pytest.mark.asyncio
+async def test_parquet_export(tmp_path):
+    parquet = pytest.importorskip("pyarrow.parquet")
+    path = str(tmp_path / "videos.parquet")
+    assert await export(listing(12), path, batch_size=5) == 12
+    table = parquet.read_table(path)
+    assert table.num_rows == 12 and table.column_names == list(EXPORT_FIELDS)
+    assert parquet.ParquetFile(path).num_row_groups == 3
+
+
+@pytest.mark.asyncio
+async def test_cli_export(tmp_path):
+    path = str(tmp_path / "out.jsonl")
+
+    async def fake_seed(client, seed, pages=1, max_items=None, summaries=True):
+        assert summaries
+        async for summary in listing(3):
+            yield summary
+
+    with patch("phub.phub.Client"), patch("phub.phub.crawl_seed", fake_seed):
+        await run_export(["first", "second", "--output", path, "--summaries"])
+
+    with open(path, encoding="utf-8") as file:
+        assert len(file.readlines()) == 3 # The second seed only had duplicates
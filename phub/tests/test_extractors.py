@@ -0,0 +1,83 @@
+import os
+import pytest
+
+from phub.modules.backends import available_backends, get_backend
+from phub.modules.consts import (extractor_videos, extractor_gifs, extractor_users, extractor_videos_playlist,
+                                 extractor_videos_from_playlist_page)
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+BACKENDS = available_backends()
+
+
+def fixture(name: str) -> str:
+    with open(os.path.join(FIXTURES, name), "r", encoding="utf-8") as file:
+        return file.read()
+
+
+CASES = [
+    (extractor_videos, "search_videos.html"),
+    (extractor_videos, "listing_links_only.html"),
+    (extractor_videos, "playlist.html"),
+    (extractor_gifs, "gifs_profile.html"),
+    (extractor_gifs, "gifs_search.html"),
+    (extractor_gifs, "gifs_wrapper.html"),
+    (extractor_users, "subscriptions.html"),
+    (extractor_videos_from_playlist_page, "playlist.html"),
+    (extractor_videos_playlist, "playlist_chunk.json"),
+    (extractor_videos_playlist, "playlist.html"),
+]
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("extractor, page", CASES)
+def test_backend_parity(extractor, page, backend):
+    content = fixture(page)
+    reference = extractor(content, backend="bs4")
+    assert len(reference) > 0
+    assert extractor(content, backend=backend) == reference
+
+
+def test_extractor_videos():
+    results = extractor_videos(fixture("search_videos.html"), backend="bs4")
+    assert [r["url"] for r in results] == [
+        "https://www.pornhub.com/view_video.php?viewkey=6512a1f6d1b2c",
+        "https://www.pornhub.com/view_video.php?viewkey=64f0c0d0e0f01",
+        "https://www.pornhub.com/view_video.php?viewkey=ph5f1e2d3c4b5a6&pkey=987",
+        "https://www.pornhub.com/view_video.php?viewkey=65a0b0c0d0e0f",
+        "https://www.pornhub.com/view_video.php?viewkey=65b1c2d3e4f50",
+        "https://www.pornhub.com/view_video.php?viewkey=66c0ffee00001",
+    ]
+    assert results[0]["title"] == "Fortnite Battle Royale & Friends"
+    assert results[0]["duration"] == "10:21"
+    assert results[0]["thumb"] == "https://ei.phncdn.com/videos/202309/26/1_big.jpg"
+    assert results[1]["title"] == "Thumbnail alt title"
+    assert results[2]["title"] == "Title only in a span"
+    assert results[3]["thumb"] is None
+
+
+def test_extractor_gifs_container():
+    assert extractor_gifs(fixture("gifs_profile.html"), backend="bs4") == [
+        "https://www.pornhub.com/gif/54402301",
+        "https://www.pornhub.com/gif/54402302",
+        "https://www.pornhub.com/gif/54402303?from=profile",
+    ]
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_extractor_order_and_duplicates(backend):
+    # Duplicates are detected by viewkey, so the &pkey= variants count as the same video
+    assert extractor_videos_from_playlist_page(fixture("playlist.html"), backend=backend) == [
+        "https://www.pornhub.com/view_video.php?viewkey=ph5a1b2c3d4e5f6&pkey=119820351",
+        "https://www.pornhub.com/view_video.php?viewkey=6400000000002&pkey=119820351",
+        "https://www.pornhub.com/view_video.php?viewkey=6400000000003",
+    ]
+    assert extractor_users(fixture("subscriptions.html"), backend=backend) == [
+        "https://www.pornhub.com/users/first-user",
+        "https://www.pornhub.com/model/second-model",
+        "https://www.pornhub.com/pornstar/third-star",
+    ]
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        get_backend("does-not-exist")
@@ -0,0 +1,142 @@
+import json
+import random
+import string
+import pytest
+
+from curl_cffi import Response
+from phub.phub import get_html_content, get_video_api_data
+from phub.modules.http_cache import HTTPCache, resource_type
+
+PROFILE = "https://www.pornhub.com/model/some-model"
+LISTING = "https://www.pornhub.com/video/search?search=test&page=2"
+
+
+def response(status: int, body: str = "", headers: dict | None = None) -> Response:
+    result = Response()
+    result.status_code = status
+    result.content = body.encode()
+    result.headers.update(headers or {})
+    return result
+
+
+class FakeSession:
+    def __init__(self, status: int):
+        self.status = status
+        self.conditional = []
+
+    async def get(self, url: str, headers: dict, **kwargs):
+        self.conditional.append(headers)
+        return response(self.status, "<html>changed</html>")
+
+
+def respond(url: str) -> Response:
+    if "webmasters" in url:
+        return response(200, json.dumps({"video": {"title": "API"}}))
+
+    return response(200, f"<html>{url}</html>", {"ETag": '"v1"', "Last-Modified": "Sat, 17 Oct 2026 10:00:00 GMT"})
+
+
+@pytest.fixture
+def make_cached_core(make_core):
+    def make(cache: HTTPCache, revalidation_status: int = 304):
+        core = make_core(respond, http_cache=cache, timeout=10)
+        core.session = FakeSession(revalidation_status)
+        return core
+
+    return make
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = HTTPCache(str(tmp_path / "cache.sqlite"))
+    yield cache
+    cache.close()
+
+
+def test_resource_type():
+    assert resource_type(PROFILE) == "profile"
+    assert resource_type(LISTING) == "listing"
+    assert resource_type("https://www.pornhub.com/model/some-model/videos?page=2") == "listing"
+    assert resource_type("https://www.pornhub.com/view_video.php?viewkey=abc") == "watch"
+    assert resource_type("https://www.pornhub.com/webmasters/video_by_id?id=abc") == "api"
+
+
+@pytest.mark.asyncio
+async def test_cache_hit_and_persistence(cache, tmp_path, make_cached_core):
+    core = make_cached_core(cache)
+    first = await get_html_content(core, PROFILE)
+    assert await get_html_content(core, PROFILE + "#about") == first
+    assert await get_video_api_data(core, "abc") == await get_video_api_data(core, "abc") == {"video": {"title": "API"}}
+    assert len(core.requested) == 2
+    assert cache.stats()["hits"] == 2
+
+    # A new run (new cache object) uses the same file
+    reopened = HTTPCache(str(tmp_path / "cache.sqlite"))
+    other = make_cached_core(reopened)
+    assert await get_html_content(other, PROFILE) == first
+    assert other.requested == []
+    reopened.close()
+
+
+@pytest.mark.asyncio
+async def test_revalidation(cache, make_cached_core, make_clocked):
+    _, clock = make_clocked(cache, now=1000.0)
+    core = make_cached_core(cache, revalidation_status=304)
+    body = await get_html_content(core, LISTING)
+
+    clock.now += cache.ttls["listing"] + 1
+    assert await get_html_content(core, LISTING) == body
+    assert core.session.conditional == [{"If-None-Match": '"v1"', "If-Modified-Since": "Sat, 17 Oct 2026 10:00:00 GMT"}]
+    assert core.requested == [LISTING]
+    assert cache.stats()["revalidated"] == 1
+
+    # Fresh again after the 304
+    assert await get_html_content(core, LISTING) == body
+    assert len(core.session.conditional) == 1
+
+    core.session.status = 200
+    clock.now += cache.ttls["listing"] + 1
+    assert await get_html_content(core, LISTING) == "<html>changed</html>"
+    assert core.requested == [LISTING]
+
+
+def test_lru_eviction(tmp_path, make_clocked):
+    cache, clock = make_clocked(HTTPCache(str(tmp_path / "small.sqlite"), max_size_mb=0.01))
+    for i in range(10):
+        clock.now += 1
+        cache.store(f"{PROFILE}{i}", "".join(random.Random(i).choices(string.ascii_letters, k=3000)))
+        clock.now += 1
+        assert cache.lookup(f"{PROFILE}0") is not None # Keeps being used, so it survives
+
+    assert cache.size() <= cache.max_size
+    assert cache.lookup(f"{PROFILE}0") is not None
+    assert cache.lookup(f"{PROFILE}9") is not None
+    assert cache.lookup(f"{PROFILE}1") is None
+    cache.close()
+
+
+def test_store_keeps_a_running_size(tmp_path, make_clocked):
+    cache, clock = make_clocked(HTTPCache(str(tmp_path / "small.sqlite"), max_size_mb=0.01))
+    statements = []
+    for i in range(10):
+        clock.now += 1
+        cache.connection.set_trace_callback(statements.append)
+        cache.store(f"{PROFILE}{i % 4}", "".join(random.Random(i).choices(string.ascii_letters, k=4000)))
+        cache.connection.set_trace_callback(None)
+        assert cache.total == cache.size() <= cache.max_size # Also with entries that got replaced
+
+    assert len(cache) < 4 # Some were evicted
+    assert statements and not [statement for statement in statements if "SUM(" in statement]
+    cache.close()
+
+
+@pytest.mark.asyncio
+async def test_disabled_type(make_cached_core):
+    cache = HTTPCache(":memory:", ttls={"listing": 0})
+    cache.store(LISTING, "<html></html>")
+    assert len(cache) == 0
+
+    core = make_cached_core(cache)
+    assert await get_html_content(core, LISTING) == await get_html_content(core, LISTING) == f"<html>{LISTING}</html>"
+    assert core.requested == [LISTING, LISTING] and len(cache) == 0
+    cache.close()
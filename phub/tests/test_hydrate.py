@@ -0,0 +1,161 @@
+import json
+import asyncio
+import pytest
+
+from curl_cffi import Response
+from base_api.base import BaseCore
+from phub import Client, Video
+from phub.modules.single_flight import SingleFlight, single_flight
+
+URL = "https://www.pornhub.com/view_video.php?viewkey={}"
+
+
+class FakeFetch:
+    def __init__(self, fail: set | None = None):
+        self.requested = []
+        self.running = 0
+        self.max_running = 0
+        self.fail = fail or set()
+
+    async def __call__(self, url: str, get_response: bool = False, **kwargs):
+        video_id = url.split("id=")[1]
+        self.requested.append(video_id)
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await asyncio.sleep(0.01)
+            if video_id in self.fail:
+                raise ConnectionError("nope")
+
+            response = Response()
+            response.content = json.dumps({"video": {"video_id": video_id, "title": f"Title {video_id}", "views": 5}}).encode()
+            return response
+
+        finally:
+            self.running -= 1
+
+
+@pytest.fixture
+def client():
+    client = Client(core=BaseCore())
+    client.core.fetch = FakeFetch()
+    return client
+
+
+@pytest.mark.asyncio
+async def test_hydrate_dedup_and_concurrency(client):
+    urls = [URL.format(i % 10) for i in range(30)]
+    videos = [video async for video in client.hydrate(urls, concurrency=3)]
+
+    assert sorted(video.video_id for video in videos) == [str(i) for i in range(10)]
+    assert sorted(client.core.fetch.requested) == [str(i) for i in range(10)]
+    assert client.core.fetch.max_running <= 3
+    assert all(video.title == f"Title {video.video_id}" for video in videos)
+
+
+@pytest.mark.asyncio
+async def test_hydrate_fills_duplicates_and_fields(client):
+    duplicates = [Video(URL.format("a"), core=client.core), Video(URL.format("a") + "&pkey=1", core=client.core)]
+
+    async def listing():
+        for video in duplicates:
+            yield video
+
+    videos = [video async for video in client.hydrate(listing(), fields=["title"])]
+    assert videos == [duplicates[0]]
+    assert duplicates[0].api_data == duplicates[1].api_data == {"title": "Title a"}
+    assert duplicates[0].api_data is not duplicates[1].api_data
+
+
+@pytest.mark.asyncio
+async def test_hydrate_skips_hydrated_and_survives_errors(client):
+    client.core.fetch.fail = {"bad"}
+    done = Video(URL.format("done"), core=client.core, api_data={"title": "Done"})
+    searched = Video(URL.format("searched"), core=client.core, api_data={"title": "x", "from_search": True})
+    videos = [video async for video in client.hydrate([done, searched, URL.format("bad")])]
+
+    assert len(videos) == 3
+    assert sorted(client.core.fetch.requested) == ["bad", "searched"]
+    assert searched.api_data["title"] == "Title searched"
+    assert done.api_data == {"title": "Done"}
+
+
+@pytest.mark.asyncio
+async def test_hydrate_coalesces_with_init(client):
+    video = Video(URL.format("x"), core=client.core)
+    hydrated, _ = await asyncio.gather(
+        asyncio.ensure_future(anext(client.hydrate([URL.format("x")]))), video.init())
+
+    assert client.core.fetch.requested == ["x"]
+    assert hydrated.api_data == video.api_data
+    assert single_flight(client.core, "video_by_id").stats() == {"leaders": 1, "coalesced": 1, "in_flight": 0}
+
+
+@pytest.mark.asyncio
+async def test_single_flight_cancelled_caller():
+    flight = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "result"
+
+    first = asyncio.ensure_future(flight.do("key", work))
+    second = asyncio.ensure_future(flight.do("key", work))
+    await asyncio.sleep(0)
+    first.cancel()
+    assert await second == "result"
+    assert calls == [1]
+
+
+@pytest.mark.asyncio
+async def test_hydrate_yields_while_the_listing_is_still_running(client):
+    more = asyncio.Event()
+
+    async def listing():
+        yield URL.format("first")
+        await more.wait() # The next page only comes after the first video was used
+        yield URL.format("second")
+
+    hydrated = client.hydrate(listing(), concurrency=5)
+    first = await asyncio.wait_for(anext(hydrated), 1)
+    assert first.video_id == "first"
+    more.set()
+    assert [video.video_id async for video in hydrated] == ["second"]
+
+
+@pytest.mark.asyncio
+async def test_hydrate_cancels_requests_on_exit(client):
+    hydrated = client.hydrate([URL.format(i) for i in range(5)], concurrency=5)
+    await anext(hydrated)
+    await hydrated.aclose()
+    assert all(task.done() for task in asyncio.all_tasks() if task is not asyncio.current_task())
+
+
+@pytest.mark.asyncio
+async def test_single_flight_cancels_when_all_callers_are_gone():
+    flight = SingleFlight()
+    cancelled = []
+
+    async def work():
+        try:
+            await asyncio.sleep(1)
+
+        except asyncio.CancelledError:
+            cancelled.append(1)
+            raise
+
+    callers = [asyncio.ensure_future(flight.do("key", work)) for _ in range(3)]
+    await asyncio.sleep(0)
+    for caller in callers:
+        caller.cancel()
+
+    await asyncio.gather(*callers, return_exceptions=True)
+    await asyncio.sleep(0)
+    assert cancelled == [1] and flight.in_flight == 0
+
+    async def quick():
+        return "fresh"
+
+    assert await flight.do("key", quick) == "fresh" # A new caller doesn't join the cancelled call
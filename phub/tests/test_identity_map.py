@@ -0,0 +1,89 @@
+import asyncio
+import pytest
+
+from phub.phub import make_video, Video, Playlist
+from phub.modules.identity_map import IdentityMap, identity_key, fetch_object, set_identity_map
+
+URL = "https://www.pornhub.com/view_video.php?viewkey={}"
+
+
+class FakeObject:
+    created = 0
+
+    def __init__(self, url: str, core):
+        self.url = url
+        self.core = core
+        self.html_content = None
+        FakeObject.created += 1
+
+    @property
+    def is_hydrated(self) -> bool:
+        return bool(self.html_content)
+
+    async def init(self):
+        await asyncio.sleep(0.01)
+        self.html_content = "<html></html>"
+        return self
+
+
+@pytest.fixture
+def core(make_core):
+    core = make_core()
+    set_identity_map(core, IdentityMap(max_size=3))
+    FakeObject.created = 0
+    return core
+
+
+def test_identity_key():
+    assert identity_key("Video", URL.format("abc") + "&pkey=5") == ("Video", "abc")
+    assert identity_key("Model", "https://www.pornhub.com/model/Some-Model/videos") == ("Model", "model/some-model")
+    assert identity_key("Model", "https://www.pornhub.com/model/some-model/") == ("Model", "model/some-model")
+
+
+@pytest.mark.asyncio
+async def test_fetch_object_reuses_and_coalesces(core):
+    first, second = await asyncio.gather(fetch_object(core, FakeObject, "https://www.pornhub.com/model/x"),
+                                         fetch_object(core, FakeObject, "https://www.pornhub.com/model/x/"))
+    assert first is second
+    assert await fetch_object(core, FakeObject, "https://www.pornhub.com/model/x/videos") is first
+    assert FakeObject.created == 1
+
+
+@pytest.mark.asyncio
+async def test_lru_and_ttl(core, make_clocked):
+    identity_map, clock = make_clocked(IdentityMap(max_size=2, ttl=10))
+    set_identity_map(core, identity_map)
+
+    a = await fetch_object(core, FakeObject, "https://www.pornhub.com/model/a")
+    await fetch_object(core, FakeObject, "https://www.pornhub.com/model/b")
+    assert await fetch_object(core, FakeObject, "https://www.pornhub.com/model/a") is a # a is now more recent than b
+    await fetch_object(core, FakeObject, "https://www.pornhub.com/model/c")
+    assert identity_map.get("FakeObject", "https://www.pornhub.com/model/b") is None
+    assert identity_map.get("FakeObject", "https://www.pornhub.com/model/a") is a
+
+    clock.now = 11
+    assert await fetch_object(core, FakeObject, "https://www.pornhub.com/model/a") is not a
+
+
+def test_listing_videos_are_shared(core):
+    first = make_video(core, URL.format("abc"), api_data={"title": "Search", "from_search": True})
+    again = make_video(core, URL.format("abc") + "&pkey=1", api_data={"title": "Other", "from_search": True})
+    assert again is first
+    assert first.api_data["title"] == "Search"
+
+    # Better data (e.g. from HubTraffic) replaces the search data, but never the hydrated data
+    assert make_video(core, URL.format("abc"), api_data={"title": "API"}).api_data == {"title": "API"}
+    assert make_video(core, URL.format("abc"), api_data={"title": "Search", "from_search": True}).api_data == {"title": "API"}
+    assert isinstance(first, Video) and first.is_hydrated
+
+
+@pytest.mark.asyncio
+async def test_playlist_videos_are_shared(core):
+    known = make_video(core, URL.format("v1"), api_data={"title": "Known"})
+    core.configuration.videos_concurrency = core.configuration.pages_concurrency = 2
+    core.respond = lambda url: "{}"
+    page = '<a href="/view_video.php?viewkey=v1">One</a><a href="/view_video.php?viewkey=v2">Two</a>'
+    playlist = Playlist("https://www.pornhub.com/playlist/42", core=core, html_content=page)
+    videos = [video async for video in playlist.get_videos(pages=1)]
+    assert videos[0] is known and videos[1] is make_video(core, URL.format("v2"))
+    assert not any("v1" in url for url in core.requested) # Already hydrated, no second request
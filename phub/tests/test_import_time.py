@@ -0,0 +1,36 @@
+import os
+import sys
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def run(code: str) -> subprocess.CompletedProcess:
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    return subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+
+
+def loaded(statement: str, modules: tuple[str, ...]) -> list[str]:
+    code = f"import sys; {statement}; print(','.join(m for m in {modules!r} if m in sys.modules))"
+    return [module for module in run(code).stdout.strip().split(",") if module]
+
+
+def test_import_phub_is_lazy():
+    assert loaded("import phub", ("phub.phub", "bs4", "demjson3", "curl_cffi", "base_api")) == []
+
+
+def test_import_phub_phub_skips_parsers():
+    heavy = ("bs4", "demjson3", "lxml", "selectolax")
+    # Only meaningful if base_api doesn't pull them in by itself
+    heavy = tuple(module for module in heavy if module not in loaded("import base_api.base", heavy))
+    assert loaded("import phub.phub", heavy) == []
+
+
+def test_attributes_still_work():
+    assert run("import phub; print(phub.Client.__module__, 'Client' in dir(phub))").stdout.split() == ["phub.phub", "True"]
+
+
+def test_import_phub_phub_skips_stdlib_extras():
+    extras = ("multiprocessing", "sqlite3", "argparse") # Only loaded by the features that need them
+    extras = tuple(module for module in extras if module not in loaded("import asyncio, logging, curl_cffi, base_api.base", extras))
+    assert loaded("import phub.phub", extras) == []
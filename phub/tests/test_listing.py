@@ -0,0 +1,265 @@
+import os
+import json
+import logging
+import pytest
+
+from contextlib import aclosing
+from types import SimpleNamespace
+from base_api.modules.errors import NetworkingError, VideoFetchError
+from phub.phub import iterate_listing, VideoSummary, ListingHelper, Client
+from phub.modules.consts import extractor_videos
+from phub.modules.listing import SeenKeys, PageURLs, listing_key, detect_last_page
+
+
+class FakeHelper:
+    """Extracts the pages in reverse order (like pages that finish out of order) but yields in listing order."""
+    def __init__(self, pages: dict):
+        self.core = SimpleNamespace(configuration=SimpleNamespace())
+        self.pages = pages
+        self.constructed = []
+
+    async def iterator(self, target_page_urls, video_link_extractor, **kwargs):
+        extracted = {}
+        for url in reversed(target_page_urls):
+            extracted[url] = await video_link_extractor(url)
+
+        for url in target_page_urls:
+            for item in extracted[url]:
+                self.constructed.append(item)
+                yield SimpleNamespace(url=item)
+
+
+def fake_extractor(content: str, backend: str | None = None) -> list:
+    return PAGES[content]
+
+
+PAGES = {
+    "page1": ["https://www.pornhub.com/view_video.php?viewkey=a", "https://www.pornhub.com/view_video.php?viewkey=b"],
+    "page2": ["https://www.pornhub.com/view_video.php?viewkey=b&pkey=1", "https://www.pornhub.com/view_video.php?viewkey=c"],
+    "page3": ["https://www.pornhub.com/view_video.php?viewkey=a", "https://www.pornhub.com/view_video.php?viewkey=d"],
+}
+
+
+def test_listing_key():
+    assert listing_key("https://www.pornhub.com/view_video.php?viewkey=ph123&pkey=5") == "ph123"
+    assert listing_key({"url": "https://www.pornhub.com/gif/54402301"}) == "54402301"
+    assert listing_key("https://www.pornhub.com/users/someone/") == "https://www.pornhub.com/users/someone"
+
+
+@pytest.mark.asyncio
+async def test_iterate_listing_order():
+    helper = FakeHelper(PAGES)
+    urls = [item.url async for item in iterate_listing(helper, ["page1", "page2", "page3"], fake_extractor)]
+    # page3 and page2 were extracted first, so a and b stay where those pages have them
+    assert [listing_key(url) for url in urls] == ["b", "c", "a", "d"]
+    assert len(helper.constructed) == 4 # The duplicates were never constructed
+
+
+@pytest.mark.asyncio
+async def test_unyielded_keys_are_released():
+    seen = SeenKeys()
+    async with aclosing(iterate_listing(FakeHelper(PAGES), ["page1"], fake_extractor, seen=seen)) as items:
+        async for item in items:
+            break # b was reserved, but never yielded
+
+    urls = [item.url async for item in iterate_listing(FakeHelper(PAGES), ["page1"], fake_extractor, seen=seen)]
+    assert [listing_key(url) for url in urls] == ["b"]
+    assert not seen.reserved
+
+
+@pytest.mark.asyncio
+async def test_shared_seen_keys():
+    seen = SeenKeys()
+    first = [item.url async for item in iterate_listing(FakeHelper(PAGES), ["page1"], fake_extractor, seen=seen)]
+    helper = FakeHelper(PAGES)
+    second = [item.url async for item in iterate_listing(helper, ["page2", "page3"], fake_extractor, seen=seen)]
+    assert len(first) == 2
+    assert [listing_key(url) for url in second] == ["c", "d"]
+    # Items that were already yielded by the first listing are never constructed again
+    assert [listing_key(url) for url in helper.constructed] == ["c", "d"]
+
+
+@pytest.mark.asyncio
+async def test_iterate_listing_summaries(make_core):
+    with open(os.path.join(os.path.dirname(__file__), "fixtures", "search_videos.html"), "r", encoding="utf-8") as file:
+        page = file.read()
+
+    helper = FakeHelper({})
+    helper.core = make_core({"page1": page, "page2": page}.__getitem__)
+    helper.logger = logging.getLogger("test")
+    summaries = [summary async for summary in iterate_listing(helper, ["page1", "page2"], extractor_videos, summaries=True)]
+
+    assert helper.constructed == [] # helper.iterator was never used
+    assert all(isinstance(summary, VideoSummary) for summary in summaries)
+    assert [summary.url for summary in summaries] == [item["url"] for item in extractor_videos(page)]
+
+    video = summaries[0].to_video(helper.core)
+    assert video.url == summaries[0].url and video.title == summaries[0].title
+    assert not video.is_hydrated
+
+
+def test_video_summary_from_hubtraffic():
+    summary = VideoSummary.from_item({"url": "https://www.pornhub.com/view_video.php?viewkey=ph1", "title": "T", "duration": "1:02:03",
+                                      "views": 10, "rating": 90.5, "default_thumb": "thumb.jpg", "tags": [{"tag_name": "x"}]})
+    assert summary.video_id == "ph1"
+    assert summary.duration_seconds == 3723
+    assert summary.thumb == "thumb.jpg"
+    assert not hasattr(summary, "__dict__")
+
+
+def test_detect_last_page():
+    with open(os.path.join(os.path.dirname(__file__), "fixtures", "search_videos.html"), "r", encoding="utf-8") as file:
+        assert detect_last_page(file.read()) == 3
+
+    assert detect_last_page('<div class="showingCounter">Showing 1-32 of 1,234</div>') == 39
+    assert detect_last_page('<div class="pagination3"><ul><li class="page_current"><span>1</span></li></ul></div>') == 1
+    assert detect_last_page('{"videos": []}') is None
+
+
+def widget(last_page: int) -> str:
+    return f'<div class="pagination3"><ul><li class="page_number"><a href="?page={last_page}">{last_page}</a></li></ul></div>'
+
+
+def page_extractor(content: str, backend: str | None = None) -> list:
+    return [f"https://www.pornhub.com/view_video.php?viewkey={key}" for key in content.split("|")[0].split(",") if key]
+
+
+@pytest.fixture
+def run_pages(make_core):
+    async def run(pages: dict, page_urls: PageURLs) -> tuple[list, list]:
+        helper = FakeHelper({})
+        helper.core = make_core(pages.__getitem__)
+        helper.logger = logging.getLogger("test")
+        summaries = [summary async for summary in iterate_listing(helper, page_urls, page_extractor, summaries=True,
+                                                                  max_page_concurrency=1)]
+        return [listing_key(summary.url) for summary in summaries], helper.core.requested
+
+    return run
+
+
+@pytest.mark.asyncio
+async def test_pages_stop_at_last_page(run_pages):
+    pages = {f"p{page}": f"{page}a,{page}b|{widget(2)}" for page in range(1, 51)}
+    keys, requested = await run_pages(pages, PageURLs(lambda page: f"p{page}", 50))
+    assert keys == ["1a", "1b", "2a", "2b"]
+    assert requested == ["p1", "p2"] # Not 50 requests
+
+
+@pytest.mark.asyncio
+async def test_pages_all_stops_without_new_items(run_pages):
+    # No pagination widget, the listing just repeats its last page
+    pages = {"p1": "a,b", "p2": "c", "p3": "c", "p4": "d"}
+    keys, requested = await run_pages(pages, PageURLs(lambda page: f"p{page}", "all"))
+    assert keys == ["a", "b", "c"]
+    assert requested == ["p1", "p2", "p3"]
+
+
+def test_page_urls_limits():
+    assert list(PageURLs(lambda page: f"p{page}", 3)) == ["p1", "p2", "p3"]
+    assert len(PageURLs(lambda page: f"p{page}", "all")) == 0
+    with pytest.raises(ValueError):
+        PageURLs(lambda page: f"p{page}", "some")
+
+
+class URLHelper(ListingHelper):
+    async def _make_video_safe(self, video_data: str, **kwargs):
+        return SimpleNamespace(url=video_data)
+
+
+@pytest.mark.asyncio
+async def test_pages_all_stops_on_failed_page(make_core):
+    # p5 doesn't exist and fails, which has to end the listing instead of trying p6, p7, ...
+    core = make_core({"p1": "a,b", "p2": "c", "p3": "d"}.__getitem__)
+    helper = URLHelper(core, video_constructor=SimpleNamespace)
+    videos = [video.url async for video in iterate_listing(helper, PageURLs(lambda page: f"p{page}", "all"), page_extractor,
+                                                           max_page_concurrency=1)]
+    assert [listing_key(url) for url in videos] == ["a", "b", "c", "d"]
+    assert core.requested == ["p1", "p2", "p3", "p4"]
+
+
+@pytest.mark.asyncio
+async def test_failed_videos_are_released(make_core):
+    core = make_core({"p1": "a,b,c"}.__getitem__)
+    helper = URLHelper(core, video_constructor=SimpleNamespace)
+
+    async def make_video_safe(video_data: str, **kwargs):
+        if listing_key(video_data) == "b":
+            return VideoFetchError(video_data, NetworkingError("HTTP 500"))
+
+        return SimpleNamespace(url=video_data)
+
+    helper._make_video_safe = make_video_safe
+    seen = SeenKeys()
+    videos = [video.url async for video in iterate_listing(helper, ["p1"], page_extractor, seen=seen)]
+    assert [listing_key(url) for url in videos] == ["a", "c"]
+    assert "b" not in seen and not seen.reserved
+
+
+@pytest.mark.asyncio
+async def test_max_items_counts_yielded_videos(make_core):
+    core = make_core({"p1": "a,b,c", "p2": "c,d,e", "p3": "f"}.__getitem__)
+    helper = URLHelper(core, video_constructor=SimpleNamespace)
+
+    async def make_video_safe(video_data: str, **kwargs):
+        if listing_key(video_data) == "b":
+            return VideoFetchError(video_data, NetworkingError("HTTP 500"))
+
+        return SimpleNamespace(url=video_data)
+
+    helper._make_video_safe = make_video_safe
+    page_urls = PageURLs(lambda page: f"p{page}", 3)
+    videos = [video.url async for video in iterate_listing(helper, page_urls, page_extractor, max_items=3)]
+    assert [listing_key(url) for url in videos] == ["a", "c", "d"] # b failed, so p2 was needed after all
+    assert core.requested == ["p1", "p2"]
+    assert page_urls.found == 4 # a, c, d and e, the second c didn't count
+
+
+def test_seen_keys_reserve_on_filter():
+    seen = SeenKeys()
+    assert seen.filter(["viewkey=a", "viewkey=b", "viewkey=a"]) == ["viewkey=a", "viewkey=b"]
+    assert seen.filter(["viewkey=b", "viewkey=c", "viewkey=d"], limit=1) == ["viewkey=c"] # d isn't reserved
+    seen.release(["viewkey=b"])
+    assert seen.filter(["viewkey=b", "viewkey=d"]) == ["viewkey=b", "viewkey=d"]
+    assert seen.admit("viewkey=b") and not seen.admit("viewkey=b")
+    assert "b" in seen and "a" not in seen
+
+
+@pytest.mark.asyncio
+async def test_max_items_is_pushed_down(make_core, run_pages):
+    # 40 pages with 30 videos each, but only 5 videos are wanted
+    pages = {f"p{page}": ",".join(f"{page}v{index}" for index in range(30)) for page in range(1, 41)}
+    core = make_core(pages.__getitem__)
+    helper = URLHelper(core, video_constructor=SimpleNamespace)
+    constructed = []
+    original = helper._make_video_safe
+
+    async def make_video_safe(video_data, **kwargs):
+        constructed.append(video_data)
+        return await original(video_data, **kwargs)
+
+    helper._make_video_safe = make_video_safe
+    videos = [video.url async for video in iterate_listing(helper, [f"p{page}" for page in range(1, 41)], page_extractor,
+                                                           max_items=5, max_page_concurrency=5)]
+    assert [listing_key(url) for url in videos] == [f"1v{index}" for index in range(5)]
+    assert core.requested == ["p1"]
+    assert len(constructed) == 5
+
+    keys, requested = await run_pages(pages, PageURLs(lambda page: f"p{page}", 40))
+    assert len(keys) == 1200 and len(requested) == 40 # Without max_items everything is fetched
+
+
+def hubtraffic_page(url: str) -> str | Exception:
+    """One new video per page, page 2 keeps failing"""
+    page = int(url.rsplit("=", 1)[1])
+    if page == 2:
+        return NetworkingError("HTTP 500")
+
+    return json.dumps({"videos": [{"url": f"https://www.pornhub.com/view_video.php?viewkey=v{page}", "title": "T"}]})
+
+
+@pytest.mark.asyncio
+async def test_hubtraffic_all_stops_on_failed_page(make_core):
+    client = SimpleNamespace(core=make_core(hubtraffic_page), logger=logging.getLogger("test"))
+    summaries = [summary async for summary in Client.search_hubtraffic(client, "x", pages="all", pages_concurrency=1, summaries=True)]
+    assert summaries[0].video_id == "v1"
+    assert len(client.core.requested) <= 3 # Not hundreds of pages
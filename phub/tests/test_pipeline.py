@@ -0,0 +1,167 @@
+import asyncio
+import pytest
+
+from types import SimpleNamespace
+from contextlib import aclosing
+from phub.phub import iterate_listing, ListingHelper
+from phub.modules.pipeline import bounded_map, hydration_stage
+
+
+@pytest.mark.asyncio
+async def test_bounded_map_order_and_lookahead():
+    started = []
+
+    async def work(n: int) -> int:
+        started.append(n)
+        await asyncio.sleep(0.001 * (5 - n % 5)) # Later items finish first
+        return n * 10
+
+    results = []
+    async with aclosing(bounded_map(range(20), work, ahead=3)) as stream:
+        async for result in stream:
+            results.append(result)
+            assert len(started) <= len(results) + 3 # Never more than 3 ahead of the consumer
+            if len(results) == 4:
+                break
+
+    assert results == [0, 10, 20, 30]
+    assert len(started) <= 7
+
+
+@pytest.mark.asyncio
+async def test_bounded_map_cancels_on_exit():
+    cancelled = []
+
+    async def work(n: int) -> int:
+        try:
+            await asyncio.sleep(0 if n == 0 else 10)
+            return n
+
+        except asyncio.CancelledError:
+            cancelled.append(n)
+            raise
+
+    async with aclosing(bounded_map(range(10), work, ahead=4)) as stream:
+        async for result in stream:
+            assert result == 0
+            break
+
+    assert sorted(cancelled) == [1, 2, 3] # The 3 calls ahead of the consumer, 4+ never started
+
+
+@pytest.mark.asyncio
+async def test_bounded_map_return_exceptions():
+    async def work(n: int) -> int:
+        if n == 1:
+            raise ValueError("page 1 failed")
+        return n
+
+    results = [result async for result in bounded_map(range(3), work, ahead=2, return_exceptions=True)]
+    assert results[0] == 0 and isinstance(results[1], ValueError) and results[2] == 2
+
+
+class HangingCore:
+    """The first page answers right away, every other page never does"""
+    def __init__(self):
+        self.configuration = SimpleNamespace()
+        self.cancelled = 0
+        self.release = asyncio.Event()
+
+    async def fetch(self, url: str, **kwargs):
+        if url == "page1":
+            return "page1"
+
+        try:
+            await self.release.wait()
+            return url
+
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+
+
+class QuickHelper(ListingHelper):
+    async def _make_video_safe(self, video_data: str, **kwargs):
+        return SimpleNamespace(url=video_data)
+
+
+def extract_page(content: str, backend: str | None = None) -> list:
+    return [f"https://www.pornhub.com/view_video.php?viewkey={content}{index}" for index in range(3)]
+
+
+@pytest.mark.asyncio
+async def test_breaking_out_cancels_page_fetches():
+    core = HangingCore()
+    helper = QuickHelper(core, video_constructor=SimpleNamespace)
+    listing = iterate_listing(helper, [f"page{page}" for page in range(1, 10)], extract_page,
+                              max_page_concurrency=3, max_video_concurrency=5)
+
+    async with aclosing(listing) as videos:
+        async for video in videos:
+            assert video.url.endswith("page10")
+            break
+
+    await asyncio.sleep(0)
+    assert core.cancelled == 3 # Pages 2 to 4 were in flight (max_page_concurrency), later pages never started
+
+
+class Item:
+    def __init__(self, n: int, delay: float):
+        self.n = n
+        self.delay = delay
+
+    async def init(self):
+        Item.running += 1
+        Item.peak = max(Item.peak, Item.running)
+        try:
+            await asyncio.sleep(self.delay)
+            return self
+
+        finally:
+            Item.running -= 1
+
+
+async def slow_listing(count: int):
+    for n in range(count):
+        yield Item(n, delay=0.01 * (count - n)) # Later items finish first
+
+
+@pytest.mark.asyncio
+async def test_hydration_stage_ordered():
+    Item.running = Item.peak = 0
+    results = [item.n async for item in hydration_stage(slow_listing(6), lambda item: item.init(), concurrency=3)]
+    assert results == list(range(6))
+    assert Item.peak == 3
+
+
+@pytest.mark.asyncio
+async def test_hydration_stage_as_completed():
+    Item.running = Item.peak = 0
+    results = [item.n async for item in hydration_stage(slow_listing(6), lambda item: item.init(), concurrency=6, ordered=False)]
+    assert results == list(reversed(range(6)))
+    assert Item.peak == 6
+
+
+@pytest.mark.asyncio
+async def test_hydration_stage_cancels_on_exit():
+    cancelled = []
+
+    async def hydrate(n: int) -> int:
+        try:
+            await asyncio.sleep(0 if n == 0 else 10)
+            return n
+
+        except asyncio.CancelledError:
+            cancelled.append(n)
+            raise
+
+    for ordered in (True, False):
+        cancelled.clear()
+        async with aclosing(hydration_stage(range(10), hydrate, concurrency=4, ordered=ordered)) as stream:
+            async for result in stream:
+                assert result == 0
+                break
+
+        # Whatever had started got cancelled and nothing is left running in the background
+        assert 0 not in cancelled and len(cancelled) <= 3
+        assert asyncio.all_tasks() == {asyncio.current_task()}
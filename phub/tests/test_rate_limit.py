@@ -0,0 +1,68 @@
+import pytest
+
+from phub.phub import send_request
+from phub.modules.rate_limit import RateLimiter, HostLimit, TokenBucket, set_rate_limiter, get_rate_limiter
+
+
+def test_token_bucket_refills(clock):
+    bucket = TokenBucket(rate=2, capacity=2, clock=clock)
+    bucket.take(2)
+    assert bucket.delay(1) == pytest.approx(0.5)
+
+    clock.now += 0.5
+    assert bucket.delay(1) == 0
+
+
+@pytest.mark.asyncio
+async def test_requests_per_second(make_clocked):
+    limiter, clock = make_clocked(RateLimiter({"www.pornhub.com": HostLimit(requests_per_second=4, burst=2)}))
+    for _ in range(6):
+        await limiter.acquire("https://www.pornhub.com/video")
+
+    # The burst of 2 goes through at once, the other 4 requests are spaced by 1 / 4 s
+    assert clock.now == pytest.approx(1.0)
+    assert limiter.stats()["www.pornhub.com"]["requests"] == 6
+
+
+@pytest.mark.asyncio
+async def test_hosts_are_independent(make_clocked):
+    limiter, clock = make_clocked(RateLimiter({"www.pornhub.com": HostLimit(requests_per_second=1, burst=1)}))
+    await limiter.acquire("https://www.pornhub.com/")
+    for _ in range(50):
+        await limiter.acquire("https://ev.phncdn.com/segment.ts") # No rule and no default: unlimited
+
+    assert clock.now == 0
+    await limiter.acquire("https://www.pornhub.com/")
+    assert clock.now == pytest.approx(1.0)
+
+
+@pytest.mark.asyncio
+async def test_bytes_per_second_and_patterns(make_clocked):
+    limiter, clock = make_clocked(RateLimiter({"*.phncdn.com": HostLimit(bytes_per_second=1000, bytes_burst=1000)}))
+    await limiter.acquire("https://ev.phncdn.com/1.ts")
+    limiter.consume("https://ev.phncdn.com/1.ts", 3000) # 2000 bytes in debt
+
+    await limiter.acquire("https://cv.phncdn.com/2.ts") # Same pattern, same budget
+    assert clock.now == pytest.approx(2.0)
+    assert list(limiter.stats()) == ["*.phncdn.com"]
+
+
+@pytest.mark.asyncio
+async def test_core_fetch_is_limited(make_core, make_clocked):
+    core = make_core(lambda url: "x" * 500)
+    limiter, clock = make_clocked(RateLimiter({}, default=HostLimit(requests_per_second=10, bytes_per_second=1000, burst=1, bytes_burst=500)))
+    set_rate_limiter(core, limiter)
+    set_rate_limiter(core, limiter) # Wrapping again must not limit twice
+
+    for _ in range(3):
+        await send_request(core, "https://www.pornhub.com/")
+
+    assert core.requested == ["https://www.pornhub.com/"] * 3
+    # The first response empties the byte burst, the second goes into debt, the third waits for it
+    assert clock.now == pytest.approx(0.5)
+    assert limiter.stats()["www.pornhub.com"]["bytes"] == 1500
+
+    set_rate_limiter(core, None)
+    assert get_rate_limiter(core) is None
+    await send_request(core, "https://www.pornhub.com/")
+    assert clock.now == pytest.approx(0.5)
@@ -0,0 +1,33 @@
+import gc
+
+from types import SimpleNamespace
+from phub.modules.registry import CoreRegistry
+from phub.modules.tokens import token_cache
+
+
+class Core:
+    pass
+
+
+def test_values_go_away_with_the_core():
+    registry = CoreRegistry()
+    core = Core()
+    registry.set(core, "value")
+    assert registry.get(core) == "value" and registry.setdefault(core, list) == "value"
+    registry.set(core, None)
+    assert registry.get(core) is None
+
+    registry.setdefault(core, list).append(1)
+    assert registry.get(core) == [1]
+    del core
+    gc.collect()
+    assert "cores=0" in repr(registry)
+
+
+def test_cores_without_weak_references():
+    registry = CoreRegistry()
+    core = SimpleNamespace()
+    assert registry.get(core) is None
+    registry.set(core, None)
+    assert registry.setdefault(core, list) is not registry.setdefault(core, list) # Usable, but not shared
+    assert token_cache(core).stats()["fetches"] == 0 # Used to raise TypeError
@@ -0,0 +1,186 @@
+import asyncio
+import logging
+import pytest
+
+from types import SimpleNamespace
+from base_api.modules.errors import BotProtectionDetected, NetworkingError, ResourceGone
+from phub.phub import iterate_listing, on_error
+from phub.modules.retry import (RetryPolicy, CircuitBreaker, retry_after, failure_kind, set_circuit_breaker,
+                                get_circuit_breaker, set_retry_policy)
+
+
+@pytest.fixture
+def make_policy(make_clocked):
+    def make(**kwargs):
+        policy, clock = make_clocked(RetryPolicy(**kwargs))
+        policy.random = lambda: 0.5
+        return policy, clock
+
+    return make
+
+
+@pytest.fixture
+def make_breaker(make_clocked):
+    return lambda **kwargs: make_clocked(CircuitBreaker(**kwargs))
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, headers: dict):
+        super().__init__(f"HTTP {status}")
+        self.response = SimpleNamespace(status_code=status, headers=headers)
+
+
+@pytest.mark.asyncio
+async def test_backoff_doubles_with_jitter_and_gives_up(make_policy):
+    policy, clock = make_policy(base_delay=1.0, max_delay=3.0)
+    decisions = [await policy("u", NetworkingError("down"), attempt) for attempt in range(1, 6)]
+    assert decisions == [True, True, True, True, False]
+    assert clock.slept == [0.5, 1.0, 1.5, 1.5] # Half of 1, 2, 4 -> 3 (capped), 3
+    assert policy.stats() == {"retries": 4, "gave_up": 1}
+
+
+@pytest.mark.asyncio
+async def test_attempts_per_error_class(make_policy):
+    policy, clock = make_policy(attempts={KeyError: 2}, default_attempts=4)
+    assert not await policy("u", ResourceGone("gone"), 1)
+    assert await policy("u", KeyError("x"), 1)
+    assert not await policy("u", KeyError("x"), 2)
+    assert await policy("u", ValueError("x"), 3)
+    assert not await policy("u", ValueError("x"), 4)
+    assert policy.max_attempts(type("Subclass", (NetworkingError,), {})("x")) == 5 # Most specific class wins
+
+
+@pytest.mark.asyncio
+async def test_retry_after_is_honoured(make_policy):
+    policy, clock = make_policy(max_retry_after=60)
+    assert retry_after(HTTPError(429, {"Retry-After": "7"})) == 7.0
+    assert retry_after(HTTPError(429, {})) is None
+    assert await policy("u", HTTPError(429, {"Retry-After": "7"}), 1)
+    assert await policy("u", HTTPError(429, {"Retry-After": "3600"}), 2)
+    assert clock.slept == [7.0, 60]
+
+
+def test_failure_kinds():
+    assert failure_kind(error=BotProtectionDetected("captcha")) == "bot"
+    assert failure_kind(error=NetworkingError("down")) == "network"
+    assert failure_kind(error=HTTPError(503, {})) == "network"
+    assert failure_kind(error=KeyError("x")) == "other"
+    assert failure_kind(SimpleNamespace(status_code=429)) == "network"
+    assert failure_kind("<html></html>") == "other"
+
+
+@pytest.mark.asyncio
+async def test_breaker_opens_after_a_burst_and_probes(make_breaker):
+    breaker, clock = make_breaker(threshold=3, window=10, cooldown=5)
+    for _ in range(2):
+        breaker.record_failure("network")
+
+    clock.now = 20.0 # The first two fall out of the window
+    breaker.record_failure("network")
+    assert breaker.state == "closed"
+    breaker.record_failure("network")
+    breaker.record_failure("network")
+    assert breaker.state == "open" and breaker.trips == 1
+
+    assert await breaker.wait() # Waited for the cooldown, this one is the probe
+    assert clock.now == 25.0 and breaker.state == "half_open"
+    breaker.record_failure("network", probe=True)
+    assert breaker.state == "open" and breaker.open_until == 35.0 # Twice the cooldown
+
+    assert await breaker.wait()
+    breaker.record_success(probe=True)
+    assert breaker.state == "closed" and not await breaker.wait()
+
+
+def test_bot_protection_trips_right_away(make_breaker):
+    breaker, _ = make_breaker(threshold=5)
+    breaker.record_failure("bot")
+    assert breaker.state == "open"
+
+    disabled, _ = make_breaker(threshold=0)
+    for _ in range(10):
+        disabled.record_failure("bot")
+    assert disabled.state == "closed"
+
+
+@pytest.mark.asyncio
+async def test_only_the_probe_runs_while_half_open(make_breaker, make_core, make_failing):
+    core = make_core(make_failing(2, NetworkingError("down")))
+    breaker, clock = make_breaker(threshold=2, cooldown=5)
+    set_circuit_breaker(core, breaker)
+    set_circuit_breaker(core, breaker) # Wrapped once
+    assert get_circuit_breaker(core) is breaker
+
+    for _ in range(2):
+        with pytest.raises(NetworkingError):
+            await core.fetch("https://www.pornhub.com/a")
+
+    assert breaker.state == "open"
+    results = await asyncio.gather(*(core.fetch(f"https://www.pornhub.com/{i}") for i in range(5)))
+    assert len(results) == 5 and breaker.state == "closed"
+    assert breaker.paused == 5
+    assert len(core.requested) == 7 # Nothing was sent while the breaker was open
+
+
+@pytest.mark.asyncio
+async def test_cancelled_probe_hands_over(make_breaker):
+    breaker, clock = make_breaker(threshold=1, cooldown=1)
+    breaker.record_failure("network")
+    assert await breaker.wait()
+    waiter = asyncio.create_task(breaker.wait())
+    await asyncio.sleep(0)
+    assert not waiter.done()
+    breaker.abandon_probe()
+    assert await waiter # The waiting request probes instead
+
+
+class Helper:
+    def __init__(self, core):
+        self.core = core
+        self.kwargs = {}
+
+    async def iterator(self, **kwargs):
+        self.kwargs = kwargs
+        return
+        yield
+
+
+@pytest.mark.asyncio
+async def test_listings_use_the_policy_of_the_client(make_core):
+    core = make_core()
+    helper = Helper(core)
+    policy = RetryPolicy()
+    set_retry_policy(core, policy)
+
+    [item async for item in iterate_listing(helper, ["p1"], extractor=lambda content, backend=None: [], on_video_error=on_error)]
+    assert helper.kwargs["on_video_error"] is policy and helper.kwargs["on_page_error"] is policy
+
+    async def mine(url, error, attempt):
+        return False
+
+    [item async for item in iterate_listing(helper, ["p1"], extractor=lambda content, backend=None: [], on_video_error=mine, on_page_error=mine)]
+    assert helper.kwargs["on_video_error"] is mine and helper.kwargs["on_page_error"] is mine
+
+
+@pytest.mark.asyncio
+async def test_summaries_use_the_policy_of_the_client(make_core, make_failing, make_policy):
+    core = make_core(make_failing(1, NetworkingError("HTTP 503"), then=lambda url: "a,b"))
+    helper = Helper(core)
+    helper.logger = logging.getLogger("test")
+    policy, clock = make_policy()
+    set_retry_policy(core, policy)
+    extractor = lambda content, backend=None: [f"https://www.pornhub.com/view_video.php?viewkey={key}" for key in content.split(",")]
+
+    summaries = [item async for item in iterate_listing(helper, ["p1"], extractor=extractor, summaries=True)]
+    assert [summary.video_id for summary in summaries] == ["a", "b"]
+    assert core.requested == ["p1", "p1"] and policy.retries == 1 and clock.slept
+
+    calls = []
+
+    async def mine(url, error, attempt):
+        calls.append(attempt)
+        return False
+
+    core.respond = make_failing(1, NetworkingError("HTTP 503"), then=lambda url: "c")
+    assert [item async for item in iterate_listing(helper, ["p2"], extractor=extractor, summaries=True, on_page_error=mine)] == []
+    assert calls == [1] and policy.retries == 1
@@ -0,0 +1,128 @@
+import pytest
+
+from types import SimpleNamespace
+from base_api.modules.errors import InvalidProxy, BotProtectionDetected
+from phub.phub import send_request
+from phub.modules.session_pool import SessionPool, set_session_pool, get_session_pool, classify_failure
+
+BEHAVIOR = {}
+
+
+class ProxyCore:
+    """A session behind a fake proxy, BEHAVIOR[proxy] decides what its requests do"""
+    def __init__(self, configuration):
+        self.configuration = configuration
+        self.session = None
+        self.urls = []
+
+    @property
+    def proxy(self) -> str | None:
+        return (self.configuration.proxies or {}).get("https")
+
+    def initialize_session(self):
+        self.session = SimpleNamespace(headers={}, cookies={})
+
+    async def fetch(self, url: str, **kwargs):
+        self.urls.append(url)
+        behavior = BEHAVIOR.get(self.proxy, "ok")
+        if behavior == "proxy":
+            raise InvalidProxy("Proxy error when trying a request, aborting!")
+
+        if behavior == "bot":
+            raise BotProtectionDetected("captcha")
+
+        return f"{self.proxy}:{url}"
+
+
+@pytest.fixture
+def make_pool(make_clocked):
+    def make(proxies: list, **kwargs):
+        pool, clock = make_clocked(SessionPool(proxies=proxies, **kwargs))
+        pool.open(ProxyCore(SimpleNamespace(proxies=None)), headers={"User-Agent": "test"}, cookies={"age": "1"})
+        return pool, clock
+
+    return make
+
+
+def test_sessions_get_proxies_headers_and_cookies(make_pool):
+    pool, _ = make_pool(["http://a", None, "http://b"], size=4)
+    assert [session.proxy for session in pool.sessions] == ["http://a", None, "http://b", "http://a"]
+    assert all(session.core.session.headers == {"User-Agent": "test"} for session in pool.sessions)
+    pool.share_cookies({"il": "logged in"})
+    assert all(session.core.session.cookies == {"age": "1", "il": "logged in"} for session in pool.sessions)
+
+
+def test_healthiest_session_is_chosen(make_pool):
+    pool, _ = make_pool(["http://a", "http://b", "http://c"])
+    slow, fast, flaky = pool.sessions
+    for _ in range(10):
+        pool.record_success(slow, 2.0)
+        pool.record_success(fast, 0.2)
+        pool.record_success(flaky, 0.2)
+
+    pool.record_failure(flaky, "network")
+    assert pool.choose() is fast
+    fast.in_flight = 20 # Busy sessions get less
+    assert pool.choose() is flaky
+
+
+@pytest.mark.asyncio
+async def test_proxy_errors_fail_over_and_quarantine(make_pool):
+    BEHAVIOR.clear()
+    BEHAVIOR["http://bad"] = "proxy"
+    pool, clock = make_pool(["http://bad", "http://good"], quarantine=10)
+    bad, good = pool.sessions
+    bad.latency = 0.1 # Looks best at first
+
+    assert await pool.fetch("https://www.pornhub.com/") == "http://good:https://www.pornhub.com/"
+    assert pool.failovers == 1 and bad.quarantined_until == 10
+    for _ in range(3):
+        await pool.fetch("https://www.pornhub.com/")
+
+    assert len(bad.core.urls) == 1 # Quarantined
+
+    BEHAVIOR["http://bad"] = "ok"
+    clock.now = 11
+    assert pool.available() == [bad, good] # Back in the rotation
+
+
+@pytest.mark.asyncio
+async def test_bot_detection_backoff(make_pool):
+    BEHAVIOR.clear()
+    BEHAVIOR["http://a"] = "bot"
+    pool, clock = make_pool(["http://a"], quarantine=10, failover=0)
+    session, = pool.sessions
+    for strike, quarantine in enumerate([10, 20, 40], start=1):
+        with pytest.raises(BotProtectionDetected):
+            await pool.fetch("https://www.pornhub.com/")
+
+        assert session.strikes == strike and session.quarantined_until == clock.now + quarantine
+        clock.now = session.quarantined_until
+
+    BEHAVIOR["http://a"] = "ok"
+    await pool.fetch("https://www.pornhub.com/")
+    assert session.strikes == 0 and session.bot_detections == 3
+    assert classify_failure(ValueError("bad json")) == "other"
+
+
+class PrimaryCore(ProxyCore):
+    def __init__(self, configuration=None):
+        super().__init__(configuration or SimpleNamespace(proxies=None))
+        self.initialize_session()
+
+
+@pytest.mark.asyncio
+async def test_only_plain_gets_are_pooled():
+    BEHAVIOR.clear()
+    core = PrimaryCore()
+    pool = SessionPool(proxies=["http://a"])
+    set_session_pool(core, pool)
+    set_session_pool(core, pool) # Wrapping again must not route twice
+
+    assert await send_request(core, "https://www.pornhub.com/") == "http://a:https://www.pornhub.com/"
+    assert await send_request(core, "https://www.pornhub.com/front/authenticate", method="POST", data={"x": 1}) == \
+           "None:https://www.pornhub.com/front/authenticate"
+
+    set_session_pool(core, None)
+    assert get_session_pool(core) is None
+    assert await send_request(core, "https://www.pornhub.com/") == "None:https://www.pornhub.com/"
@@ -0,0 +1,102 @@
+import os
+import pytest
+
+from base_api.base import BaseCore
+from base_api.modules.config import RuntimeConfig
+from phub import Client
+from phub.modules.session_store import SessionStore
+from phub.modules.http_cache import HTTPCache
+
+LOGIN_DATA = {"username": "someone", "avatar": "https://ei.phncdn.com/avatar.jpg", "premium_redirect_cookie": "0"}
+
+
+def test_store_round_trip(tmp_path):
+    store = SessionStore(str(tmp_path / "session.json"))
+    store.save("me@example.com", {"il": "v1", "platform": "pc"}, LOGIN_DATA)
+    assert oct(os.stat(store.path).st_mode & 0o777) == "0o600"
+
+    state = store.load("me@example.com")
+    assert state["account"] == LOGIN_DATA
+    assert {cookie["name"]: cookie["value"] for cookie in state["cookies"]} == {"il": "v1", "platform": "pc"}
+    assert store.load("someone-else@example.com") is None
+
+    store.clock = lambda: state["saved_at"] + store.max_age + 1
+    assert store.load("me@example.com") is None # Too old
+
+    store.clear()
+    store.clear()
+    assert SessionStore(store.path).load() is None
+
+
+def test_encrypted_store(tmp_path):
+    pytest.importorskip("cryptography")
+    path = str(tmp_path / "session.json")
+    SessionStore(path, secret="hunter2").save("me@example.com", {"il": "session-cookie-value"}, LOGIN_DATA)
+    with open(path, encoding="utf-8") as file:
+        assert "session-cookie-value" not in file.read() # Not "v1", the ciphertext contains that every now and then
+
+    assert SessionStore(path, secret="hunter2").load()["account"] == LOGIN_DATA
+    assert SessionStore(path, secret="wrong").load() is None
+    assert SessionStore(path).load() is None
+
+
+def make_client(path: str) -> Client:
+    store = SessionStore(path)
+    store.save("me@example.com", {"il": "v1"}, LOGIN_DATA)
+    return Client(core=BaseCore(), email="me@example.com", password="secret", session_store=store)
+
+
+@pytest.mark.asyncio
+async def test_client_restores_without_requests(tmp_path):
+    client = make_client(str(tmp_path / "session.json"))
+    requested = []
+
+    async def fetch(url: str, **kwargs):
+        requested.append(url)
+        raise AssertionError("no requests expected")
+
+    client.core.fetch = fetch
+    assert client.logged and client.account.name == "someone"
+    assert client.core.session.cookies.get("il") == "v1"
+    assert await client.login() is True
+    assert requested == []
+
+
+@pytest.mark.asyncio
+async def test_expired_session_logs_in_again(tmp_path):
+    client = make_client(str(tmp_path / "session.json"))
+    logins = []
+
+    async def fetch(url: str, **kwargs):
+        return '<script>var page_params = {"isLoggedIn": false};</script>'
+
+    async def login(force: bool = False, throw: bool = True) -> bool:
+        logins.append(force)
+        return True
+
+    client.core.fetch = fetch
+    client.core.configuration = RuntimeConfig() # The default config is shared between cores
+    client.core.configuration.http_cache = cache = HTTPCache(":memory:")
+    cache.store("https://www.pornhub.com/users/someone", '<script>var page_params = {"isLoggedIn": true};</script>')
+    client.login = login
+    assert await client.ensure_login() is True # Not from the page that was cached while the session was valid
+    assert logins == [True]
+    assert not os.path.exists(client.session_store.path)
+
+    assert await client.ensure_login() is False # Checked only once, the (fake) login didn't set anything
+    assert logins == [True]
+    cache.close()
+
+
+@pytest.mark.asyncio
+async def test_valid_session_is_checked_once(tmp_path):
+    client = make_client(str(tmp_path / "session.json"))
+    requested = []
+
+    async def fetch(url: str, **kwargs):
+        requested.append(url)
+        return '<script>var page_params = {"isLoggedIn": true};</script>'
+
+    client.core.fetch = fetch
+    assert await client.ensure_login() and await client.ensure_login()
+    assert requested == ["https://www.pornhub.com/users/someone"]
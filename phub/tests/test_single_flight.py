@@ -0,0 +1,41 @@
+import asyncio
+import pytest
+
+from phub.phub import get_html_content
+from phub.modules.errors import NotFound
+from phub.modules.single_flight import coalescing_stats, normalize_url, request_key
+
+
+def respond(url: str) -> str | Exception:
+    return NotFound(url) if "missing" in url else f"<html>{url}</html>"
+
+
+def test_normalize_url():
+    assert normalize_url("HTTPS://WWW.Pornhub.com:443/model/x?b=2&a=1#top") == "https://www.pornhub.com/model/x?a=1&b=2"
+    assert normalize_url("https://www.pornhub.com:8443") == "https://www.pornhub.com:8443/"
+    assert request_key("https://www.pornhub.com/a?x=1") != request_key("https://www.pornhub.com/a?x=1", method="POST")
+
+
+@pytest.mark.asyncio
+async def test_get_html_content_coalesces(make_core):
+    core = make_core(respond, delay=0.01)
+    urls = ["https://www.pornhub.com/model/x?b=2&a=1"] * 25 + ["https://WWW.pornhub.com/model/x?a=1&b=2#videos"] * 25
+    contents = await asyncio.gather(*(get_html_content(core, url) for url in urls))
+
+    assert len(core.requested) == 1
+    assert len(set(contents)) == 1
+    assert coalescing_stats(core)["html"] == {"leaders": 1, "coalesced": 49, "in_flight": 0}
+
+    # Finished requests are not cached
+    await get_html_content(core, urls[0])
+    assert len(core.requested) == 2
+
+
+@pytest.mark.asyncio
+async def test_get_html_content_shares_errors(make_core):
+    core = make_core(respond, delay=0.01)
+    results = await asyncio.gather(*(get_html_content(core, "https://www.pornhub.com/missing") for _ in range(5)),
+                                   return_exceptions=True)
+
+    assert len(core.requested) == 1
+    assert all(isinstance(result, NotFound) for result in results)
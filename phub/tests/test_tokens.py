@@ -0,0 +1,97 @@
+import json
+import asyncio
+import pytest
+
+from curl_cffi import Response
+from base_api.base import BaseCore
+from base_api.modules.config import RuntimeConfig
+from phub import Client
+from phub.phub import get_token
+from phub.modules.tokens import TokenCache, token_cache
+from phub.modules.http_cache import HTTPCache
+
+HOMEPAGE = '<script>var token = "{}";</script>'
+
+
+def json_response(data: dict) -> Response:
+    response = Response()
+    response.content = json.dumps(data).encode()
+    return response
+
+
+class SiteFetch:
+    """The homepage hands out a new token every time, the endpoints only accept the newest one"""
+    def __init__(self):
+        self.homepages = 0
+        self.requests: list[str] = []
+
+    @property
+    def token(self) -> str:
+        return f"token{self.homepages}"
+
+    async def __call__(self, url: str, **kwargs):
+        self.requests.append(url)
+        if url == "https://www.pornhub.com/":
+            await asyncio.sleep(0.01)
+            self.homepages += 1
+            return HOMEPAGE.format(self.token)
+
+        token = (kwargs.get("data") or kwargs.get("params") or {}).get("token")
+        if url.endswith("front/authenticate"):
+            return json_response({"success": int(token == self.token), "username": "someone", "avatar": "a.jpg",
+                                  "premium_redirect_cookie": "0"})
+
+        return json_response({"success": token == self.token})
+
+
+def test_token_cache_ttl():
+    cache = TokenCache(ttl=60)
+    cache.clock = lambda: 100.0
+    cache.offer("abc")
+    assert cache.fresh
+
+    cache.clock = lambda: 161.0
+    assert not cache.fresh
+    cache.offer(None) # Pages without a token change nothing
+    assert cache.token == "abc"
+
+
+@pytest.mark.asyncio
+async def test_token_is_fetched_once():
+    core = BaseCore()
+    core.fetch = fetch = SiteFetch()
+    tokens = await asyncio.gather(*(get_token(core) for _ in range(5))) # Concurrent callers share the homepage
+    tokens += [await get_token(core) for _ in range(5)]
+    assert set(tokens) == {"token1"} and fetch.homepages == 1
+    assert token_cache(core).stats()["fetches"] == 1
+
+    assert await get_token(core, refresh=True) == "token2"
+
+
+@pytest.mark.asyncio
+async def test_rejected_cached_token_is_refreshed():
+    client = Client(core=BaseCore(), email="me@example.com", password="secret")
+    client.core.fetch = fetch = SiteFetch()
+    token_cache(client.core).offer("stale") # e.g. from a playlist page of another session
+
+    assert await client.login() is True
+    assert fetch.homepages == 1 # The stale token was rejected once, then replaced
+
+    for _ in range(10):
+        assert await client.fix_recommendations() is True
+
+    # The login changed the session, so one new token for the consent, then nothing at all
+    assert fetch.homepages == 2
+    assert fetch.requests.count("https://www.pornhub.com/user/log_user_cookie_consent") == 1
+
+
+@pytest.mark.asyncio
+async def test_token_skips_the_http_cache():
+    client = Client(core=BaseCore(RuntimeConfig()), email="me@example.com", password="secret") # The default config is shared
+    client.core.fetch = fetch = SiteFetch()
+    client.core.configuration.http_cache = cache = HTTPCache(":memory:")
+    cache.store("https://www.pornhub.com/", HOMEPAGE.format("stale")) # The homepage of an earlier run
+
+    assert await client.login() is True
+    assert fetch.homepages == 1
+    cache.close()
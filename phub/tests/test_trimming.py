@@ -0,0 +1,85 @@
+import os
+import pytest
+
+from phub.phub import Video, Album, Playlist
+from phub.modules.errors import ContentReleased
+from phub.modules.trimming import TrimPolicy
+
+URL = "https://www.pornhub.com/view_video.php?viewkey=6512a1f6d1b2c"
+
+with open(os.path.join(os.path.dirname(__file__), "fixtures", "watch_page.html"), "r", encoding="utf-8") as file:
+    WATCH_PAGE = file.read()
+
+
+def test_policy_fields(make_core):
+    policy = TrimPolicy(fields={"BaseObject": ["title"], "Video": ["views"]})
+    assert policy.fields_for(Video(URL, core=make_core())) == ("views",)
+    assert TrimPolicy(fields=["title"]).fields_for(object()) == ("title",)
+    assert TrimPolicy(fields={"Pornstar": ["bio"]}).fields_for(object()) is None
+
+
+@pytest.mark.asyncio
+async def test_extract_then_release(make_core):
+    core = make_core(lambda url: WATCH_PAGE, trim_policy=TrimPolicy(fields={"Video": ["title", "views", "tags"]}))
+    video = Video(URL, core=core, force_scraping=True)
+    await video.init()
+
+    assert video.retained_bytes()["html_content"] == 0
+    assert video.retained_bytes()["soup"] == 0
+    assert video.title == 'Some video title with a "quote" and a brace } inside'
+    assert video.views == "1,234,567"
+    assert len(video.tags) == 3
+    assert video.is_hydrated
+
+    with pytest.raises(ContentReleased):
+        _ = video.likes
+
+    await video.refetch()
+    assert video.likes == "12K"
+    assert len(core.requested) == 2
+
+
+@pytest.mark.asyncio
+async def test_without_policy_keeps_content(make_core):
+    video = Video(URL, core=make_core(lambda url: WATCH_PAGE), force_scraping=True)
+    await video.init()
+    _ = video.soup
+    retained = video.retained_bytes()
+    assert retained["html_content"] >= len(WATCH_PAGE)
+    assert retained["soup"] > retained["html_content"]
+    assert retained["total"] == retained["html_content"] + retained["soup"] + retained["cached"]
+
+
+ALBUM_PAGE = ('<ul class="photosAlbumsListing albumViews preloadImage">'
+              '<div class="js_lazy_bkg photoAlbumListBlock" data-bkg="https://ei.phncdn.com/1.jpg"><a href="/photo/1"></a>'
+              '<span>90%</span><span>12</span></div></ul>')
+PLAYLIST_PAGE = ('<script>var token = "abc";</script>'
+                 '<a href="/view_video.php?viewkey=v1">One</a><a href="/view_video.php?viewkey=v2">Two</a>')
+
+
+@pytest.fixture
+def make_pages_core(make_core):
+    """Serves the album / playlist page and an empty API response for the videos"""
+    def make(page: str):
+        return make_core(lambda url: "{}" if "webmasters" in url else page, trim_policy=TrimPolicy(fields=["title"]),
+                         videos_concurrency=2, pages_concurrency=2)
+
+    return make
+
+
+@pytest.mark.asyncio
+async def test_listings_after_trimming(make_pages_core):
+    core = make_pages_core(ALBUM_PAGE)
+    album = await Album("https://www.pornhub.com/album/1", core=core).init()
+    assert album.has_content and album.retained_bytes()["html_content"] == 0
+    photos = [photo async for photo in album.get_photos(pages=1)]
+    assert [photo["url"] for photo in photos] == ["https://www.pornhub.com/photo/1"]
+    assert core.requested == ["https://www.pornhub.com/album/1"] * 2 # Fetched again for the listing
+
+    core = make_pages_core(PLAYLIST_PAGE)
+    playlist = await Playlist("https://www.pornhub.com/playlist/42", core=core).init()
+    videos = [video async for video in playlist.get_videos(pages=1)]
+    assert [video.video_id for video in videos] == ["v1", "v2"]
+    assert playlist.token == "abc"
+    with pytest.raises(ContentReleased):
+        _ = playlist.html_content # The listing didn't keep the page
@@ -0,0 +1,55 @@
+import os
+import json
+import pytest
+
+from bs4 import BeautifulSoup
+from phub.modules.backends import parser
+from phub.modules.consts import REGEX_VIDEO_FLASHVARS
+from phub.modules.watch_page import WatchPage, find_flashvars, parse_flashvars
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+@pytest.fixture(scope="module")
+def html_content() -> str:
+    with open(os.path.join(FIXTURES, "watch_page.html"), "r", encoding="utf-8") as file:
+        return file.read()
+
+
+def test_flashvars(html_content):
+    flashvars = parse_flashvars(html_content)
+    assert flashvars == json.loads(REGEX_VIDEO_FLASHVARS.search(html_content).group(1))
+    assert flashvars["video_title"] == 'Some video title with a "quote" and a brace } inside'
+    assert flashvars["nextVideo"]["title"] == "Next {video}"
+    assert len(flashvars["mediaDefinitions"]) == 5
+    assert find_flashvars(html_content).endswith('"disablePlaybackRate":false}')
+
+
+def test_flashvars_missing():
+    assert find_flashvars("<html><script>var flashvars = {};</script></html>") is None
+
+
+def test_watch_page_matches_full_soup(html_content):
+    soup = BeautifulSoup(html_content, parser)
+    page = WatchPage(html_content)
+
+    menu = soup.find("div", class_="video-actions-menu ctasActionMenu")
+    assert page.views == menu.find("div", class_="views").find("span").text == "1,234,567"
+    assert page.publish_date == menu.find("div", class_="videoInfo").text
+    assert page.likes == soup.find("span", class_="votesUp").text
+
+    assert page.categories == {thing.text: thing.get("href") for thing in soup.find(
+        "div", class_="categoriesWrapper").find_all("a", class_="gtm-event-video-underplayer item")}
+    assert list(page.categories) == ["Amateur", "Blowjob", "60FPS"]
+
+    assert page.tags == {thing.text: thing.get("href") for thing in soup.find(
+        "div", class_="tagsWrapper").find_all("a", class_="video_underplayer")}
+    assert len(page.tags) == 3
+
+    avatar = soup.find("div", class_="userAvatar")
+    assert page.author_url == f"https://www.pornhub.com{avatar.find('a').get('href')}"
+    assert page.author_thumbnail == avatar.find("img").get("src")
+
+
+def test_watch_page_missing_element():
+    assert WatchPage("<html><div class='other'></div></html>").find("div", "userAvatar") is None
@@ -0,0 +1,145 @@
+import os
+import logging
+import pytest
+
+from types import SimpleNamespace
+from unittest.mock import patch
+from contextlib import aclosing
+from phub.phub import crawl_queue, seed_page_url, run_crawl
+from phub.modules.consts import extractor_videos
+from phub.modules.listing import listing_key
+from phub.modules.work_queue import WorkQueue
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def test_lease_complete_and_retry(tmp_path):
+    queue = WorkQueue(str(tmp_path / "queue.sqlite"), max_attempts=2)
+    assert queue.add("page", "p1", {"page": 1})
+    assert not queue.add("page", "p1", {"page": 1}) # Already known
+    assert queue.add_many("video", [("a", None), ("b", None)]) == 2
+
+    first, second = queue.lease(limit=2)
+    assert (first.key, first.payload, first.attempts) == ("p1", {"page": 1}, 1)
+    queue.complete(first)
+    queue.fail(second, ValueError("timeout"))
+    assert queue.state("page", "p1") == "done" and queue.state("video", "a") == "pending"
+
+    retried, = queue.lease(kinds=["video"]) # "a" again, it is older than "b"
+    assert (retried.key, retried.attempts) == ("a", 2)
+    queue.fail(retried, "timeout")
+    assert queue.state("video", "a") == "failed"
+    assert queue.failures() == [("video", "a", "timeout")]
+    assert queue.counts() == {"page": {"done": 1}, "video": {"failed": 1, "pending": 1}}
+
+
+def test_expired_leases_and_restarts(tmp_path):
+    path = str(tmp_path / "queue.sqlite")
+    queue = WorkQueue(path, lease_seconds=60)
+    queue.clock = lambda: 1000.0
+    queue.add_many("video", [("a", None), ("b", None)])
+    assert [task.key for task in queue.lease(limit=1)] == ["a"]
+
+    queue.close() # The process dies with "a" in flight
+    restarted = WorkQueue(path, lease_seconds=60)
+    restarted.clock = lambda: 1030.0
+    assert [task.key for task in restarted.lease(limit=5)] == ["b"] # "a" is still leased
+
+    restarted.clock = lambda: 1061.0
+    assert [task.key for task in restarted.lease(limit=5)] == ["a"]
+    assert restarted.recover() == 2 and restarted.unfinished() == 2
+
+
+def search_pages(broken: int):
+    """respond() for the search: the first page has videos, page 2 fails `broken` times"""
+    with open(os.path.join(FIXTURES, "search_videos.html"), encoding="utf-8") as file:
+        first_page = file.read()
+
+    def respond(url: str):
+        nonlocal broken
+        if url.endswith("page=2") and broken:
+            broken -= 1
+            return ConnectionError("connection reset")
+
+        return first_page if url.endswith("page=1") else "<html></html>"
+
+    return respond
+
+
+@pytest.mark.asyncio
+async def test_crawl_queue_resumes(tmp_path, make_core):
+    path = str(tmp_path / "crawl.sqlite")
+    core = make_core(search_pages(broken=1))
+    client = SimpleNamespace(core=core, logger=logging.getLogger("test"))
+
+    # The first run dies after two videos
+    queue = WorkQueue(path)
+    async with aclosing(crawl_queue(client, queue, seeds=["cats"], pages=2, hydrate=False, concurrency=1)) as run:
+        first = []
+        async for summary in run:
+            first.append(summary.url)
+            if len(first) == 2:
+                break
+
+    queue.close()
+    queue = WorkQueue(path)
+    second = [summary.url async for summary in crawl_queue(client, queue, seeds=["cats"], pages=2, hydrate=False)]
+
+    keys = [listing_key(url) for url in first + second]
+    assert len(keys) == len(set(keys)) > 2 # Every video exactly once over both runs
+    assert core.requested.count(seed_page_url("cats", 1)) == 1 # The completed page wasn't fetched again
+    assert core.requested.count(seed_page_url("cats", 2)) == 2 # Failed once, retried
+    assert not queue.unfinished() and not queue.failures()
+
+
+@pytest.mark.asyncio
+async def test_crawl_queue_uses_the_extractor_backend(tmp_path, make_core):
+    core = make_core(search_pages(broken=0), extractor_backend="strainer")
+    client = SimpleNamespace(core=core, logger=logging.getLogger("test"))
+    backends = []
+    original = extractor_videos
+
+    def extractor(content: str, backend: str | None = None) -> list:
+        backends.append(backend)
+        return original(content, backend=backend)
+
+    queue = WorkQueue(str(tmp_path / "crawl.sqlite"))
+    with patch("phub.phub.extractor_videos", extractor):
+        summaries = [summary async for summary in crawl_queue(client, queue, seeds=["cats"], hydrate=False)]
+
+    assert summaries and backends == ["strainer"]
+    queue.close()
+
+
+@pytest.mark.asyncio
+async def test_crawl_queue_video_and_blank_seeds(tmp_path, make_core):
+    core = make_core()
+    client = SimpleNamespace(core=core, logger=logging.getLogger("test"))
+    queue = WorkQueue(str(tmp_path / "crawl.sqlite"))
+    video = "https://www.pornhub.com/view_video.php?viewkey=abc"
+    summaries = [summary async for summary in crawl_queue(client, queue, seeds=["", "  ", f" {video}\n"], hydrate=False)]
+
+    assert [summary.url for summary in summaries] == [video]
+    assert core.requested == [] # Neither a listing page for the video nor a search for ""
+    assert queue.counts() == {"video": {"done": 1}}
+    queue.close()
+
+
+@pytest.mark.asyncio
+async def test_crawl_queue_max_items_and_limit(tmp_path, make_core):
+    core = make_core(search_pages(broken=0))
+    client = SimpleNamespace(core=core, logger=logging.getLogger("test"))
+    path = str(tmp_path / "crawl.sqlite")
+    queue = WorkQueue(path)
+    summaries = [summary async for summary in crawl_queue(client, queue, seeds=["cats"], pages=2, hydrate=False, max_items=3)]
+    assert len(summaries) == 3
+    assert core.requested == [seed_page_url("cats", 1)] # Page 2 isn't needed for 3 videos
+    queue.close()
+
+    output = str(tmp_path / "out.jsonl")
+    with patch("phub.phub.Client", lambda **kwargs: SimpleNamespace(core=make_core(search_pages(broken=0)),
+                                                                    logger=logging.getLogger("test"))):
+        await run_crawl(["dogs", "--queue", str(tmp_path / "cli.sqlite"), "--limit", "2", "--output", output])
+
+    with open(output, encoding="utf-8") as file:
+        assert len(file.readlines()) == 2